@@ -4,16 +4,35 @@ LocalPackagesPaths('windows')
 from flask import Flask
 import os
 
+from src.secret_key import get_secret_key
+from src.server_session import init_server_session
+from src.fragment_cache import init_fragment_cache
+from src.template_cache import init_template_cache
+from src.static_assets import init_static_assets
+
 from blueprints.home import home
 from blueprints.lesxon import lesxon
 
 app = Flask(__name__, template_folder='templates')
-app.config['SECRET_KEY'] = os.urandom(24)
+# Same key in every worker process and across restarts (env SECRET_KEY or instance/secret_key)
+app.config['SECRET_KEY'] = get_secret_key(app.instance_path)
+
+# Session bodies live server-side (LRU + SQLite); the cookie only carries an id
+init_server_session(app)
 
 # Register blueprints
 app.register_blueprint(home.bp)
 app.register_blueprint(lesxon.bp)
 
+# {% cache %} tag for static fragments; added before any template is compiled
+init_fragment_cache(app)
+
+# TEMPLATE_MODE=production: indexed loader, shared bytecode cache, templates compiled at startup
+init_template_cache(app)
+
+# Fingerprinted, precompressed static files when `python build_assets.py` has written a manifest
+init_static_assets(app)
+
 if __name__ == '__main__':
     app.run(debug=True, host="0.0.0.0", port=1024)
 
@@ -0,0 +1,37 @@
+"""
+ASGI entry point: the Flask UI and the async data API in one deployment.
+
+    python asgi.py --workers 4 --port 1024
+    uvicorn asgi:application --workers 4 --port 1024
+
+/api/... is answered by the FastAPI routers (see src/data_api.py); every
+other path is dispatched to the Flask app through WSGIMiddleware.
+"""
+import argparse
+import logging
+import os
+
+# Production servers compile templates once at startup (set TEMPLATE_MODE=development to opt out)
+os.environ.setdefault('TEMPLATE_MODE', 'production')
+
+# app sets up the local package paths first
+from app import app as flask_app
+from src.data_api import DATA_API_CONFIG, create_asgi_app
+from blueprints.lesxon.routes import apiRoutes as lesxon_api
+
+application = create_asgi_app(flask_app, [lesxon_api.router])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the Flask UI and the async data API with uvicorn')
+    parser.add_argument('--host', default=DATA_API_CONFIG['host'], help='Bind address (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=DATA_API_CONFIG['port'], help='Bind port (default: 1024)')
+    parser.add_argument('--workers', type=int, default=DATA_API_CONFIG['workers'],
+                        help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+
+    import uvicorn
+    # uvloop and httptools are picked up automatically when installed
+    uvicorn.run('asgi:application', host=args.host, port=args.port, workers=args.workers,
+                proxy_headers=True, log_config=None)
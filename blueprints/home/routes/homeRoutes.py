@@ -4,10 +4,22 @@ import datetime
 import platform
 from pathlib import Path
 
-from flask import render_template, session, redirect, url_for, request, flash
+from flask import render_template, session, redirect, url_for, request, flash, jsonify
 
 from ..home import bp
-from ..src.navbar_helpers import get_navbar_context, create_default_permissions
+from ..src.navbar_helpers import get_navbar_context, create_default_permission_mask, create_action_permission_mask, get_permission_mask, migrate_session_user, get_navbar_cache_stats
+from src.fragment_cache import FRAGMENT_CACHE
+
+@bp.before_app_request
+def migrate_legacy_session():
+    # Static files never read the session (no Vary: Cookie on cacheable assets)
+    endpoint = request.endpoint or ''
+    if endpoint == 'static' or endpoint.endswith('.static'):
+        return
+    # Sessions created before the bitmask model carry a {permission: True} dict
+    user = session.get('user')
+    if user and 'permissions' in user:
+        session['user'] = migrate_session_user(user)
 
 @bp.route('/')
 def home():
@@ -75,8 +87,8 @@ def login():
         # Simulate authentication (replace with real authentication)
         if email == 'test@example.com' and password == 'password123':
             
-            # Create user permissions using centralized configuration - FULL ACCESS
-            userPermissions = create_default_permissions(['lesxon', 'autotrackr', 'products'])
+            # Create user permissions using centralized configuration - FULL ACCESS (SQL writes included)
+            userPermissions = create_default_permission_mask(['lesxon', 'autotrackr', 'products']) | create_action_permission_mask()
 
             user_data = {}
             user_data['user'] = email.split('@')[0]
@@ -84,8 +96,11 @@ def login():
             user_data['is_authenticated'] = True
             user_data['avatar'] = 'https://via.placeholder.com/24'
             user_data['notification_count'] = 5
-            user_data['permissions'] = userPermissions
+            user_data['permission_mask'] = userPermissions
 
+            # Fresh session id on authentication (server-side sessions only)
+            if hasattr(session, 'regenerate'):
+                session.regenerate()
             session['user'] = user_data
             session.permanent = remember
             
@@ -95,7 +110,7 @@ def login():
         elif email == 'limited@example.com' and password == 'password123':
             
             # Create user with LIMITED permissions - only autotrackr and products, NO lesxon
-            userPermissions = create_default_permissions(['lesxon', 'autotrackr', 'products'])
+            userPermissions = create_default_permission_mask(['lesxon', 'autotrackr', 'products'])
 
             user_data = {}
             user_data['user'] = email.split('@')[0]
@@ -103,8 +118,11 @@ def login():
             user_data['is_authenticated'] = True
             user_data['avatar'] = 'https://via.placeholder.com/24'
             user_data['notification_count'] = 3
-            user_data['permissions'] = userPermissions
+            user_data['permission_mask'] = userPermissions
 
+            # Fresh session id on authentication (server-side sessions only)
+            if hasattr(session, 'regenerate'):
+                session.regenerate()
             session['user'] = user_data
             session.permanent = remember
             
@@ -201,4 +219,20 @@ def logout():
     # Clear the user session
     session.clear()
     # Redirect to the home page
-    return redirect(url_for('home.home'))
\ No newline at end of file
+    return redirect(url_for('home.home'))
+
+# Render cache counters of this worker: nav items and {% cache %} fragments (hit rate per fragment)
+@bp.route('/stats/render-cache')
+def render_cache_stats():
+    # Operator data: only full-access users, who are the ones granted every action permission
+    user = session.get('user')
+    if not user:
+        return jsonify({'error': 'Inicia sesión para continuar'}), 401
+    required = create_action_permission_mask()
+    if get_permission_mask(user) & required != required:
+        return jsonify({'error': 'No tienes permisos para ver estas estadísticas'}), 403
+
+    return jsonify({
+        'navbar': get_navbar_cache_stats(),
+        'fragments': FRAGMENT_CACHE.stats(),
+    })
@@ -8,6 +8,10 @@ def build_unified_menu_config():
     """
     Construye el UNIFIED_MENU_CONFIG paso a paso.
     Mantiene exactamente la misma estructura de asignación individual.
+
+    Cada item declara un 'permission_bit' fijo: las sesiones guardan los
+    permisos como máscara de bits, así que un bit nunca se renumera ni se
+    reutiliza (los nuevos items toman el siguiente bit libre).
     
     Returns:
         dict: Configuración completa del menú unificado
@@ -33,6 +37,7 @@ def build_unified_menu_config():
     # Item: lesxon_view
     item_menu = {}
     item_menu['permission'] = 'lesxon_view'
+    item_menu['permission_bit'] = 0
     item_menu['display_name'] = 'View'
     item_menu['description'] = 'View data and reports'
     item_menu['url'] = '/lesxon/view'
@@ -45,6 +50,7 @@ def build_unified_menu_config():
     # Item: lesxon_download
     item_menu = {}
     item_menu['permission'] = 'lesxon_download'
+    item_menu['permission_bit'] = 1
     item_menu['display_name'] = 'Download'
     item_menu['description'] = 'Download files and datasets'
     item_menu['url'] = '/lesxon/download'
@@ -57,6 +63,7 @@ def build_unified_menu_config():
     # Item: lesxon_zip
     item_menu = {}
     item_menu['permission'] = 'lesxon_zip'
+    item_menu['permission_bit'] = 2
     item_menu['display_name'] = 'Zip'
     item_menu['description'] = 'Create and manage zip archives'
     item_menu['url'] = '/lesxon/zip'
@@ -75,6 +82,7 @@ def build_unified_menu_config():
     # Item: lesxon_transactions
     item_menu = {}
     item_menu['permission'] = 'lesxon_transactions'
+    item_menu['permission_bit'] = 3
     item_menu['display_name'] = 'Transactions'
     item_menu['description'] = 'Manage transaction data'
     item_menu['url'] = '/lesxon/transactions'
@@ -87,6 +95,7 @@ def build_unified_menu_config():
     # Item: lesxon_klines
     item_menu = {}
     item_menu['permission'] = 'lesxon_klines'
+    item_menu['permission_bit'] = 4
     item_menu['display_name'] = 'Klines'
     item_menu['description'] = 'View and analyze klines data'
     item_menu['url'] = '/lesxon/klines'
@@ -105,6 +114,7 @@ def build_unified_menu_config():
     # Item: lesxon_supabase
     item_menu = {}
     item_menu['permission'] = 'lesxon_supabase'
+    item_menu['permission_bit'] = 5
     item_menu['display_name'] = 'Supabase'
     item_menu['description'] = 'Access LesXon Supabase integration'
     item_menu['url'] = '/lesxon/supabase'
@@ -129,6 +139,7 @@ def build_unified_menu_config():
     # Item: autotrackr_service_orders
     item_menu = {}
     item_menu['permission'] = 'autotrackr_service_orders'
+    item_menu['permission_bit'] = 6
     item_menu['display_name'] = 'Service Orders'
     item_menu['description'] = 'Manage service orders'
     item_menu['url'] = '/autotrackr/service_orders'
@@ -147,6 +158,7 @@ def build_unified_menu_config():
     # Item: autotrackr_erm_model
     item_menu = {}
     item_menu['permission'] = 'autotrackr_erm_model'
+    item_menu['permission_bit'] = 7
     item_menu['display_name'] = 'ERM Model'
     item_menu['description'] = 'Access ERM model tools'
     item_menu['url'] = '/autotrackr/erm_model'
@@ -165,6 +177,7 @@ def build_unified_menu_config():
     # Item: autotrackr_supabase
     item_menu = {}
     item_menu['permission'] = 'autotrackr_supabase'
+    item_menu['permission_bit'] = 8
     item_menu['display_name'] = 'Supabase'
     item_menu['description'] = 'Access Autotrackr Supabase integration'
     item_menu['url'] = '/autotrackr/supabase'
@@ -189,6 +202,7 @@ def build_unified_menu_config():
     # Item: products_electronics
     item_menu = {}
     item_menu['permission'] = 'products_electronics'
+    item_menu['permission_bit'] = 9
     item_menu['display_name'] = 'Electronics'
     item_menu['description'] = 'Manage electronics catalog'
     item_menu['url'] = '/products/category/electronics'
@@ -201,6 +215,7 @@ def build_unified_menu_config():
     # Item: products_clothing
     item_menu = {}
     item_menu['permission'] = 'products_clothing'
+    item_menu['permission_bit'] = 10
     item_menu['display_name'] = 'Clothing'
     item_menu['description'] = 'Manage clothing catalog'
     item_menu['url'] = '/products/category/clothing'
@@ -213,6 +228,7 @@ def build_unified_menu_config():
     # Item: products_home_garden
     item_menu = {}
     item_menu['permission'] = 'products_home_garden'
+    item_menu['permission_bit'] = 11
     item_menu['display_name'] = 'Home & Garden'
     item_menu['description'] = 'Manage home & garden catalog'
     item_menu['url'] = '/products/category/home'
@@ -231,6 +247,7 @@ def build_unified_menu_config():
     # Item: products_new
     item_menu = {}
     item_menu['permission'] = 'products_new'
+    item_menu['permission_bit'] = 12
     item_menu['display_name'] = 'Add New Product'
     item_menu['description'] = 'Manage new product listings'
     item_menu['url'] = '/products/new'
@@ -243,6 +260,7 @@ def build_unified_menu_config():
     # Item: products_manage
     item_menu = {}
     item_menu['permission'] = 'products_manage'
+    item_menu['permission_bit'] = 13
     item_menu['display_name'] = 'Manage Products'
     item_menu['description'] = 'Full product management access'
     item_menu['url'] = '/products/manage'
@@ -261,6 +279,7 @@ def build_unified_menu_config():
     # Item: products_all
     item_menu = {}
     item_menu['permission'] = 'products_all'
+    item_menu['permission_bit'] = 14
     item_menu['display_name'] = 'All Products'
     item_menu['description'] = 'View all products'
     item_menu['url'] = '/products'
@@ -1,6 +1,9 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
 import os
+import threading
 from .menu_config_builder import get_menu_configuration
+from .permission_registry import build_permission_registry, get_user_permission_mask, migrate_user_permissions
 
 # ========== UNIFIED MENU CONFIGURATION (EXTERNALLY GENERATED) ==========
 UNIFIED_MENU_CONFIG = get_menu_configuration()
@@ -52,6 +55,13 @@ def get_notification_config() -> Dict[str, Any]:
         'notification_badge_threshold': int(os.getenv('NOTIFICATION_BADGE_THRESHOLD', '1'))
     }
 
+def get_navbar_cache_config() -> Dict[str, Any]:
+    """Gets navbar cache configuration from environment variables or defaults"""
+    return {
+        'navbar_cache_enabled': os.getenv('NAVBAR_CACHE_ENABLED', 'true').lower() == 'true',
+        'navbar_cache_size': max(int(os.getenv('NAVBAR_CACHE_SIZE', '256')), 1),
+    }
+
 def build_dynamic_navbar_config() -> Dict[str, Any]:
     """Builds complete navbar configuration dynamically"""
     config = {}
@@ -62,6 +72,8 @@ def build_dynamic_navbar_config() -> Dict[str, Any]:
 
 # Cache the configuration for performance
 DEFAULT_NAVBAR_CONFIG = build_dynamic_navbar_config()
+NOTIFICATION_CONFIG = get_notification_config()
+NAVBAR_CACHE_CONFIG = get_navbar_cache_config()
 
 def get_module_config_from_unified() -> Dict[str, Dict[str, Any]]:
     """Extracts module configuration dynamically from UNIFIED_MENU_CONFIG"""
@@ -182,20 +194,95 @@ def _extract_all_menu_data():
 # Calculated once instead of multiple loops
 MENU_PERMISSIONS, PERMISSION_ICONS, MODULE_MENU_STRUCTURE, _ITEM_LOOKUP = _extract_all_menu_data()
 
+# Grants that are not menu items: never part of a module mask, so module access never implies them
+ACTION_PERMISSIONS: Dict[str, int] = {
+    'lesxon_sql_write': 32,  # statements other than queries in the Supabase SQL console
+}
+
+# Stable bit index per permission and precomputed per-module masks
+PERMISSION_REGISTRY = build_permission_registry(UNIFIED_MENU_CONFIG, MENU_PERMISSIONS, ACTION_PERMISSIONS)
+
+# ========== NAV ITEMS CACHE ==========
+
+class NavItemsCache:
+    """
+    Bounded LRU cache of built nav_items.
+    Keyed on (current_route, permission fingerprint); cached lists are shared
+    between requests and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: 'OrderedDict[Tuple[Any, ...], List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        """Returns the cached nav_items for a key, or None on a miss"""
+        with self._lock:
+            nav_items = self._items.get(key)
+            if nav_items is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return nav_items
+
+    def put(self, key: Tuple[Any, ...], nav_items: List[Dict[str, Any]]) -> None:
+        """Stores nav_items, evicting the least recently used entries"""
+        with self._lock:
+            self._items[key] = nav_items
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drops every cached entry (counters are kept)"""
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+            }
+
+NAV_ITEMS_CACHE = NavItemsCache(NAVBAR_CACHE_CONFIG['navbar_cache_size'])
+
+def get_navbar_cache_stats() -> Dict[str, Any]:
+    """Gets hit/miss counters of the nav_items cache"""
+    return NAV_ITEMS_CACHE.stats()
+
 # ========== DYNAMIC CONFIGURATION REFRESH FUNCTIONS ==========
 
 def refresh_configuration():
     """Refreshes all dynamic configurations"""
-    global DEFAULT_NAVBAR_CONFIG, MODULE_CONFIG, MENU_PERMISSIONS, PERMISSION_ICONS, MODULE_MENU_STRUCTURE, _ITEM_LOOKUP
+    global DEFAULT_NAVBAR_CONFIG, NOTIFICATION_CONFIG, NAVBAR_CACHE_CONFIG, MODULE_CONFIG, MODULE_CHILDREN_CONFIG
+    global MENU_PERMISSIONS, PERMISSION_ICONS, MODULE_MENU_STRUCTURE, _ITEM_LOOKUP, PERMISSION_REGISTRY
     
     # Refresh navbar config
     DEFAULT_NAVBAR_CONFIG = build_dynamic_navbar_config()
+    NOTIFICATION_CONFIG = get_notification_config()
+    NAVBAR_CACHE_CONFIG = get_navbar_cache_config()
     
     # Refresh module config
     MODULE_CONFIG = get_module_config_from_unified()
     
     # Refresh menu data
     MENU_PERMISSIONS, PERMISSION_ICONS, MODULE_MENU_STRUCTURE, _ITEM_LOOKUP = _extract_all_menu_data()
+    PERMISSION_REGISTRY = build_permission_registry(UNIFIED_MENU_CONFIG, MENU_PERMISSIONS, ACTION_PERMISSIONS)
+    MODULE_CHILDREN_CONFIG = get_module_children_config()
+
+    # Built nav_items depend on everything above
+    NAV_ITEMS_CACHE.maxsize = NAVBAR_CACHE_CONFIG['navbar_cache_size']
+    NAV_ITEMS_CACHE.clear()
 
 def update_app_config(**kwargs):
     """Updates application configuration dynamically"""
@@ -225,15 +312,35 @@ def create_default_permissions(modules: Optional[List[str]] = None) -> Dict[str,
         for perm in MENU_PERMISSIONS[module]
     }
 
+def create_default_permission_mask(modules: Optional[List[str]] = None) -> int:
+    """Creates a permission bitmask for specified modules (stored in the session)"""
+    if modules is None:
+        return PERMISSION_REGISTRY.all_mask
+
+    mask = 0
+    for module in modules:
+        mask |= PERMISSION_REGISTRY.module_mask(module)
+    return mask
+
+def create_action_permission_mask(actions: Optional[List[str]] = None) -> int:
+    """Creates the mask of action permissions (all of them by default) to add to a user's grants"""
+    return PERMISSION_REGISTRY.mask_of(ACTION_PERMISSIONS if actions is None else actions)
+
+def get_permission_mask(user: Optional[Dict[str, Any]]) -> int:
+    """Gets the user's permission bitmask (legacy dict sessions are converted)"""
+    return get_user_permission_mask(user, PERMISSION_REGISTRY)
+
+def migrate_session_user(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts a legacy dict-shaped session user to the bitmask format"""
+    return migrate_user_permissions(user, PERMISSION_REGISTRY)
+
 def has_module_permissions(user: Optional[Dict[str, Any]], module_name: str) -> bool:
     """Checks if the user has at least one permission for a specific module"""
-    if not user or 'permissions' not in user:
-        return False
-    
-    user_permissions = user['permissions']
-    module_perms = MENU_PERMISSIONS.get(module_name, {})
-    
-    return any(user_permissions.get(perm, False) for perm in module_perms)
+    return PERMISSION_REGISTRY.has_any(get_permission_mask(user), module_name)
+
+def has_permission(user: Optional[Dict[str, Any]], permission: str) -> bool:
+    """Checks if the user holds a single permission (e.g. an action permission)"""
+    return PERMISSION_REGISTRY.has(get_permission_mask(user), permission)
 
 def check_module_dependencies(user: Optional[Dict[str, Any]], module_name: str) -> bool:
     """Checks if the user has permissions for all module dependencies"""
@@ -290,6 +397,7 @@ def generate_module_children_config(module_name: str) -> List[Dict[str, Any]]:
                     'url': config['url'],
                     'route': config['route'],
                     'permission': permission,
+                    'permission_bit': PERMISSION_REGISTRY.bit(permission),
                     'default_show': False,
                     'icon': config['icon']
                 }
@@ -353,7 +461,7 @@ def _build_menu_children(items_config: List[Dict[str, Any]],
     if not items_config:
         return []
     
-    user_permissions = user.get('permissions', {}) if user and 'permissions' in user else {}
+    permission_mask = get_permission_mask(user)
     children = []
 
     for item_config in items_config:
@@ -364,8 +472,8 @@ def _build_menu_children(items_config: List[Dict[str, Any]],
 
         # Check permissions
         required_perm = item_config.get('permission')
-        if required_perm and user_permissions:
-            show_item = user_permissions.get(required_perm, False)
+        if required_perm and permission_mask:
+            show_item = bool(permission_mask & item_config.get('permission_bit', 0))
         else:
             show_item = item_config.get('default_show', True) if required_perm else True
 
@@ -430,6 +538,25 @@ def generate_nav_items(current_route: Optional[str] = None,
     
     return nav_items
 
+def _permission_fingerprint(user: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """Reduces a user to the inputs generate_nav_items() actually depends on"""
+    if not user:
+        return (False,)
+    return (True, get_permission_mask(user))
+
+def get_cached_nav_items(current_route: Optional[str] = None,
+                         user: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Returns memoized nav_items for (current_route, permission fingerprint)"""
+    if not NAVBAR_CACHE_CONFIG['navbar_cache_enabled']:
+        return generate_nav_items(current_route, user)
+
+    key = (current_route, _permission_fingerprint(user))
+    nav_items = NAV_ITEMS_CACHE.get(key)
+    if nav_items is None:
+        nav_items = generate_nav_items(current_route, user)
+        NAV_ITEMS_CACHE.put(key, nav_items)
+    return nav_items
+
 # ========== OPTIMIZED MAIN FUNCTION ==========
 
 def get_navbar_context(current_route: Optional[str] = None, 
@@ -442,7 +569,7 @@ def get_navbar_context(current_route: Optional[str] = None,
 
     # Add user information if it exists
     if user:
-        notification_config = get_notification_config()
+        notification_config = NOTIFICATION_CONFIG
         
         context.update({
             'current_user': user,
@@ -453,8 +580,8 @@ def get_navbar_context(current_route: Optional[str] = None,
             ),
         })
 
-    # Generate navigation
-    context['nav_items'] = generate_nav_items(current_route, user)
+    # Generate navigation (memoized per route and permission fingerprint)
+    context['nav_items'] = get_cached_nav_items(current_route, user)
     context['has_module_permissions'] = has_module_permissions
     
     # Apply overrides
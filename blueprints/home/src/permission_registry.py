@@ -0,0 +1,122 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+# ========== PERMISSION BITSET REGISTRY ==========
+
+class PermissionRegistry:
+    """
+    Maps every menu permission to a stable bit index.
+
+    User grants are stored as a single integer mask and module access is
+    checked against precomputed per-module masks, so every check is one AND.
+    """
+
+    def __init__(self, menu_config: Dict[str, Any], menu_permissions: Dict[str, Dict[str, str]],
+                 action_bits: Optional[Dict[str, int]] = None):
+        # Action permissions are granted one by one and never belong to a module mask
+        self.bits = self._assign_bits(menu_config, action_bits or {})
+        self.module_masks = {
+            module_name: self.mask_of(module_perms)
+            for module_name, module_perms in menu_permissions.items()
+        }
+        self.all_mask = 0
+        for module_mask in self.module_masks.values():
+            self.all_mask |= module_mask
+
+    @staticmethod
+    def _assign_bits(menu_config: Dict[str, Any], action_bits: Dict[str, int]) -> Dict[str, int]:
+        """Collects the declared 'permission_bit' of every item (enabled or not) plus the action bits"""
+        bits = dict(action_bits)
+        owners = {bit: permission for permission, bit in action_bits.items()}
+        undeclared = []
+
+        for module_sections in menu_config.values():
+            if not isinstance(module_sections, dict):
+                continue
+            for section_config in module_sections.values():
+                if not isinstance(section_config, dict):
+                    continue
+                for config in section_config.get('items', {}).values():
+                    permission = config['permission']
+                    bit = config.get('permission_bit')
+                    if bit is None:
+                        undeclared.append(permission)
+                        continue
+                    if owners.setdefault(bit, permission) != permission:
+                        raise ValueError(f"Permission bit {bit} assigned to both '{owners[bit]}' and '{permission}'")
+                    bits[permission] = bit
+
+        # Items without an explicit bit take the next free ones, in declaration order
+        next_bit = max((bit for permission, bit in bits.items() if permission not in action_bits), default=-1) + 1
+        for permission in undeclared:
+            if permission not in bits:
+                while next_bit in owners:
+                    next_bit += 1
+                bits[permission] = next_bit
+                owners[next_bit] = permission
+                next_bit += 1
+
+        return bits
+
+    def bit(self, permission: str) -> int:
+        """Gets the single-bit mask of a permission (0 if unknown)"""
+        index = self.bits.get(permission)
+        return 1 << index if index is not None else 0
+
+    def mask_of(self, permissions: Iterable[str]) -> int:
+        """Builds a mask from an iterable of permission names"""
+        mask = 0
+        for permission in permissions:
+            mask |= self.bit(permission)
+        return mask
+
+    def mask_from_dict(self, permissions: Dict[str, bool]) -> int:
+        """Builds a mask from a legacy {permission: bool} dictionary"""
+        return self.mask_of(perm for perm, allowed in permissions.items() if allowed)
+
+    def permissions_of(self, mask: int) -> List[str]:
+        """Expands a mask back into permission names"""
+        return [perm for perm, index in self.bits.items() if mask >> index & 1]
+
+    def module_mask(self, module_name: str) -> int:
+        """Gets the precomputed mask of every enabled permission in a module"""
+        return self.module_masks.get(module_name, 0)
+
+    def has_any(self, mask: int, module_name: str) -> bool:
+        """Checks if a mask grants at least one permission of a module"""
+        return bool(mask & self.module_masks.get(module_name, 0))
+
+    def has(self, mask: int, permission: str) -> bool:
+        """Checks if a mask grants a single permission"""
+        return bool(mask & self.bit(permission))
+
+
+def build_permission_registry(menu_config: Dict[str, Any], menu_permissions: Dict[str, Dict[str, str]],
+                              action_bits: Optional[Dict[str, int]] = None) -> PermissionRegistry:
+    """Builds the registry from UNIFIED_MENU_CONFIG, the extracted MENU_PERMISSIONS and the action permissions"""
+    return PermissionRegistry(menu_config, menu_permissions, action_bits)
+
+
+def get_user_permission_mask(user: Optional[Dict[str, Any]], registry: PermissionRegistry) -> int:
+    """
+    Gets the permission mask of a session user.
+    Legacy dict-shaped sessions ('permissions': {perm: True}) are converted on the fly.
+    """
+    if not user:
+        return 0
+
+    mask = user.get('permission_mask')
+    if mask is not None:
+        return int(mask)
+
+    legacy_permissions = user.get('permissions')
+    if isinstance(legacy_permissions, dict):
+        return registry.mask_from_dict(legacy_permissions)
+
+    return 0
+
+
+def migrate_user_permissions(user: Dict[str, Any], registry: PermissionRegistry) -> Dict[str, Any]:
+    """Returns a copy of a legacy session user with 'permissions' replaced by 'permission_mask'"""
+    migrated = {key: value for key, value in user.items() if key != 'permissions'}
+    migrated['permission_mask'] = get_user_permission_mask(user, registry)
+    return migrated
@@ -0,0 +1,181 @@
+from typing import Any, Dict, Optional, Tuple
+import json
+import time
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse
+
+from src.data_api import DATA_API_CONFIG, call_blocking, require_module
+from ..src.kline_store import KLINE_STORE_CONFIG, slice_to_json, validate_series
+from ..src.kline_resampler import KLINE_RESAMPLER
+from ..src.kline_indicators import INDICATOR_SERVICE, indicators_to_json
+from ..src.kline_stream import KLINE_HUB, KLINE_STREAM_CONFIG
+from ..src.kline_patterns import KLINE_PATTERNS
+from ..src.transaction_store import TRANSACTION_STORE, TRANSACTION_STORE_CONFIG, parse_transaction_filters, page_to_json
+from ..src.download_jobs import DOWNLOAD_JOBS
+
+# Async twins of the JSON endpoints dashboards poll, served by asgi.py next to the Flask UI.
+# Same parameters and bodies as the /lesxon/... routes; blocking reads run on the data API thread pool.
+router = APIRouter(prefix='/api/lesxon', dependencies=[Depends(require_module('lesxon'))])
+
+def _int_arg(request: Request, name: str, default: Optional[int] = None) -> Optional[int]:
+    """Reads an integer query parameter; like Flask's type=int, an unparsable value counts as missing"""
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def _range_args(request: Request) -> Tuple[Optional[int], Optional[int], int]:
+    """Reads start/end/limit query parameters, raising HTTPException if limit is not valid"""
+    limit = _int_arg(request, 'limit', 100)
+    if limit is None or limit <= 0:
+        raise HTTPException(status_code=400, detail='limit must be a positive integer')
+    return _int_arg(request, 'start'), _int_arg(request, 'end'), min(limit, KLINE_STORE_CONFIG['max_query_rows'])
+
+# ========== KLINES ==========
+
+@router.get('/klines/data')
+async def klines_data(request: Request):
+    symbol = request.query_params.get('symbol', 'BTCUSDT')
+    interval = request.query_params.get('interval', '1h')
+    start_time, end_time, limit = _range_args(request)
+
+    try:
+        columns = await call_blocking(KLINE_RESAMPLER.query, symbol, interval, start_time, end_time, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        'symbol': symbol.strip().upper(),
+        'interval': interval,
+        'count': len(columns['open_time']),
+        'columns': slice_to_json(columns),
+    }
+
+@router.get('/klines/indicators')
+async def klines_indicators(request: Request):
+    symbol = request.query_params.get('symbol', 'BTCUSDT')
+    interval = request.query_params.get('interval', '1h')
+    names = [name for name in request.query_params.get('names', '').split(',') if name] or None
+    start_time, end_time, limit = _range_args(request)
+
+    try:
+        result = await call_blocking(INDICATOR_SERVICE.query, symbol, interval, names, start_time, end_time, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        'symbol': symbol.strip().upper(),
+        'interval': interval,
+        'count': len(result['candles']['open_time']),
+        'columns': slice_to_json(result['candles']),
+        'indicators': indicators_to_json(result['indicators']),
+    }
+
+@router.get('/klines/similar')
+async def klines_similar(request: Request):
+    k = _int_arg(request, 'k', 10)
+    if k is None or k <= 0:
+        raise HTTPException(status_code=400, detail='k must be a positive integer')
+    symbols = [name for name in request.query_params.get('symbols', '').split(',') if name]
+
+    try:
+        return await call_blocking(
+            KLINE_PATTERNS.search,
+            request.query_params.get('symbol', 'BTCUSDT'),
+            request.query_params.get('interval', '1h'),
+            end_time=_int_arg(request, 'end'),
+            k=k,
+            symbols=symbols,
+            backend=request.query_params.get('backend') or None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Live candles over SSE: /api/lesxon/klines/stream?symbol=BTCUSDT&interval=1h&since=<open_time of the last loaded candle>
+# Each 'kline' event is {"c": [closed rows], "f": forming row} (rows in KLINE_COLUMNS order) or {"r": 1} to reload.
+@router.get('/klines/stream')
+async def klines_stream(request: Request):
+    try:
+        symbol, interval = validate_series(request.query_params.get('symbol', 'BTCUSDT'),
+                                           request.query_params.get('interval', '1h'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    since = _int_arg(request, 'since')
+
+    async def events():
+        subscriber = await KLINE_HUB.subscribe(symbol, interval, since)
+        try:
+            while True:
+                update = await subscriber.next()
+                yield {'event': 'kline', 'data': json.dumps(update, separators=(',', ':'))}
+                # Rate cap: whatever arrives meanwhile is coalesced into the next event
+                await anyio.sleep(1 / KLINE_STREAM_CONFIG['max_rate'])
+        finally:
+            KLINE_HUB.unsubscribe(subscriber)
+
+    return EventSourceResponse(events(), ping=KLINE_STREAM_CONFIG['ping_interval'])
+
+# ========== TRANSACTIONS ==========
+
+@router.get('/transactions/data')
+async def transactions_data(request: Request):
+    filters, errors = parse_transaction_filters(request.query_params)
+    if errors:
+        return JSONResponse({'error': 'Filtros no válidos', 'errors': errors}, status_code=400)
+
+    order = request.query_params.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise HTTPException(status_code=400, detail='order must be asc or desc')
+    limit = _int_arg(request, 'limit', TRANSACTION_STORE_CONFIG['page_size'])
+    if limit is None or limit <= 0:
+        raise HTTPException(status_code=400, detail='limit must be a positive integer')
+
+    try:
+        page = await call_blocking(
+            TRANSACTION_STORE.query,
+            filters,
+            cursor=request.query_params.get('cursor') or None,
+            limit=min(limit, TRANSACTION_STORE_CONFIG['max_page_size']),
+            descending=order == 'desc',
+            with_total=request.query_params.get('total') == '1',
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail='cursor no válido')
+
+    result = page_to_json(page)
+    result['count'] = len(result['columns']['id'])
+    result['order'] = order
+    return result
+
+# ========== DOWNLOAD JOBS ==========
+
+def _job_version(job: Dict[str, Any]) -> str:
+    """What a poller has already seen of a job: its status and progress"""
+    return f"{job['status']}:{job['rows']}"
+
+@router.get('/download/jobs')
+async def download_jobs(request: Request):
+    return {'jobs': await call_blocking(DOWNLOAD_JOBS.recent, _int_arg(request, 'limit', 20) or 20)}
+
+# Long poll: /api/lesxon/download/jobs/<id>?version=running:1200&wait=20 answers as soon as the job
+# moves past that version, or with its current state after `wait` seconds. Waiting holds no thread.
+@router.get('/download/jobs/{job_id}')
+async def download_job_status(job_id: str, request: Request):
+    seen = request.query_params.get('version')
+    wait = min(max(_int_arg(request, 'wait', 0) or 0, 0), DATA_API_CONFIG['max_wait'])
+    deadline = time.monotonic() + wait
+
+    while True:
+        job = await call_blocking(DOWNLOAD_JOBS.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail='Descarga no encontrada')
+        if (seen is None or _job_version(job) != seen or job['status'] not in ('queued', 'running')
+                or time.monotonic() >= deadline):
+            return {**job, 'version': _job_version(job)}
+        await anyio.sleep(DATA_API_CONFIG['poll_interval'])
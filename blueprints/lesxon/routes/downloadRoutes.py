@@ -1,8 +1,12 @@
-from flask import render_template,current_app, session
-import datetime
+from flask import render_template,current_app, session, request, jsonify, Response, stream_with_context, send_file, get_template_attribute
+import os
 
 from ..lesxon import bp
 from ...home.src.navbar_helpers import get_navbar_context
+from ..src.export_streams import build_export, parse_date_range
+from ..src.download_jobs import DOWNLOAD_JOBS, normalize_job_params
+from ..src.download_history import DOWNLOAD_HISTORY, DOWNLOAD_HISTORY_CONFIG, track_stream
+from src.access_control import require_module
 
 # Ruta para la página principal
 @bp.route('/lesxon/download')
@@ -18,38 +22,113 @@ def download():
         user=session.get('user')
     )
 
-    # TODO: Replace with actual data from Supabase or other DB
-    download_history = [
-        {
-            "id": "1",
-            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "type": "K-Lines",
-            "symbol": "BTCUSDT",
-            "format": "CSV",
-            "size": "2.5 MB",
-            "status": "Completado",
-            "filename": "btc_klines_20240115.csv"
-        },
-        {
-            "id": "2",
-            "date": (datetime.datetime.now() - datetime.timedelta(hours=1)).strftime("%Y-%m-%d %H:%M"),
-            "type": "Trades",
-            "symbol": "ETHUSDT",
-            "format": "JSON",
-            "size": "1.8 MB",
-            "status": "Completado",
-            "filename": "eth_trades_20240115.json"
-        },
-        {
-            "id": "3",
-            "date": (datetime.datetime.now() - datetime.timedelta(hours=2)).strftime("%Y-%m-%d %H:%M"),
-            "type": "Ticker",
-            "symbol": "ADAUSDT",
-            "format": "XLSX",
-            "size": "0.5 MB",
-            "status": "Error",
-            "filename": "ada_ticker_20240115.xlsx"
-        }
-    ]
-
-    return render_template('lesxon_download.html', **navbar_context, parameter=parameter, download_history=download_history)          
+    try:
+        download_history = _history_page()
+    except ValueError as e:
+        download_history = DOWNLOAD_HISTORY.page(per_page=DOWNLOAD_HISTORY_CONFIG['per_page'])
+        parameter['history_error'] = str(e)
+
+    return render_template('lesxon_download.html', **navbar_context, parameter=parameter,
+                           download_history=download_history, download_jobs=DOWNLOAD_JOBS.recent())
+
+def _history_page():
+    """History page for the filters in the query string (dates are inclusive YYYY-MM-DD)"""
+    date_from, date_to = parse_date_range(request.args.get('date_from', '').strip(),
+                                          request.args.get('date_to', '').strip())
+    history = DOWNLOAD_HISTORY.page(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', DOWNLOAD_HISTORY_CONFIG['per_page'], type=int),
+        date_from=date_from / 1000 if date_from is not None else None,
+        date_to=date_to / 1000 if date_to is not None else None,
+        symbol=request.args.get('symbol', '').strip().upper(),
+        status=request.args.get('status', ''),
+        data_type=request.args.get('data_type', ''),
+    )
+    # Keep the date filters in the pagination links
+    for name in ('date_from', 'date_to'):
+        if request.args.get(name):
+            history['filters'][name] = request.args[name]
+    return history
+
+# Streamed export: /lesxon/download/export?data_type=klines&symbol=BTCUSDT&start_date=...&end_date=...&format=csv&compress=1
+@bp.route('/lesxon/download/export')
+@require_module('lesxon')
+def download_export():
+    try:
+        params = normalize_job_params(request.args)
+        export = build_export(
+            data_type=params['data_type'],
+            symbol=params['symbol'],
+            start_date=params['start_date'],
+            end_date=params['end_date'],
+            export_format=params['format'],
+            compress=params['compress'],
+            interval=params['interval'],
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Rows are generated, encoded and sent chunk by chunk: memory stays flat
+    stream = track_stream(DOWNLOAD_HISTORY, export.stream, params['data_type'], params['symbol'],
+                          params['format'], export.filename, params)
+    return Response(
+        stream_with_context(stream),
+        mimetype=export.mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{export.filename}"'},
+    )
+
+
+# Background jobs: POST queues an export (identical requests share one job), GET polls progress
+@bp.route('/lesxon/download/jobs', methods=['GET', 'POST'])
+@require_module('lesxon')
+def download_jobs():
+    if request.method == 'GET':
+        jobs = DOWNLOAD_JOBS.recent(request.args.get('limit', 20, type=int))
+        if request.args.get('view') == 'html':
+            # Polled by the status card: re-rendered with the same macro as the page
+            return get_template_attribute('_download_macros.html', 'download_jobs_list')(jobs)
+        return jsonify({'jobs': jobs})
+
+    try:
+        job, created = DOWNLOAD_JOBS.submit(request.get_json(silent=True) or request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(job), 202 if created else 200
+
+@bp.route('/lesxon/download/jobs/<job_id>')
+@require_module('lesxon')
+def download_job_status(job_id):
+    job = DOWNLOAD_JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Descarga no encontrada'}), 404
+    return jsonify(job)
+
+@bp.route('/lesxon/download/jobs/<job_id>/file')
+@require_module('lesxon')
+def download_job_file(job_id):
+    job = DOWNLOAD_JOBS.artifact(job_id)
+    if job is None:
+        return jsonify({'error': 'El archivo ya no está disponible'}), 404
+    return send_file(os.path.abspath(job['artifact']), mimetype=job['mimetype'],
+                     as_attachment=True, download_name=job['filename'])
+
+# History: JSON pages for the same filters as the page, deletion of single entries or completed ones
+@bp.route('/lesxon/download/history')
+@require_module('lesxon')
+def download_history():
+    try:
+        return jsonify(_history_page())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/lesxon/download/history/<int:entry_id>', methods=['DELETE'])
+@require_module('lesxon')
+def download_history_delete(entry_id):
+    if not DOWNLOAD_HISTORY.delete_entry(entry_id):
+        return jsonify({'error': 'Entrada no encontrada'}), 404
+    return jsonify({'deleted': 1})
+
+@bp.route('/lesxon/download/history/completed', methods=['DELETE'])
+@require_module('lesxon')
+def download_history_clean():
+    return jsonify({'deleted': DOWNLOAD_HISTORY.delete_status('completed')})
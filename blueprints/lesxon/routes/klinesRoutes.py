@@ -1,7 +1,12 @@
-from flask import render_template,current_app, session
+from flask import render_template,current_app, session, request, jsonify
 
 from ..lesxon import bp
 from ...home.src.navbar_helpers import get_navbar_context
+from ..src.kline_store import KLINE_COLUMNS, KLINE_STORE_CONFIG, slice_to_json
+from ..src.kline_resampler import KLINE_RESAMPLER
+from ..src.kline_indicators import INDICATOR_DEFINITIONS, INDICATOR_SERVICE, indicators_to_json
+from ..src.kline_patterns import KLINE_PATTERNS
+from src.access_control import require_module
 
 # Ruta para la página principal
 @bp.route('/lesxon/klines')
@@ -17,4 +22,80 @@ def klines():
         user=session.get('user')
     )
 
-    return render_template('lesxon_klines.html', **navbar_context, parameter=parameter)          
+    return render_template('lesxon_klines.html', **navbar_context, parameter=parameter, indicators=INDICATOR_DEFINITIONS,
+                           kline_columns=list(KLINE_COLUMNS))          
+
+def _parse_range_args():
+    """Reads start/end/limit query parameters, raising ValueError if limit is not valid"""
+    start_time = request.args.get('start', type=int)
+    end_time = request.args.get('end', type=int)
+    limit = request.args.get('limit', 100, type=int)
+    if limit is None or limit <= 0:
+        raise ValueError('limit must be a positive integer')
+    return start_time, end_time, min(limit, KLINE_STORE_CONFIG['max_query_rows'])
+
+# JSON slice of a series (non-1m intervals are derived from 1m): /lesxon/klines/data?symbol=BTCUSDT&interval=1h&start=...&end=...&limit=100
+@bp.route('/lesxon/klines/data')
+@require_module('lesxon')
+def klines_data():
+    symbol = request.args.get('symbol', 'BTCUSDT')
+    interval = request.args.get('interval', '1h')
+
+    try:
+        start_time, end_time, limit = _parse_range_args()
+        columns = KLINE_RESAMPLER.query(symbol, interval, start_time, end_time, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'symbol': symbol.strip().upper(),
+        'interval': interval,
+        'count': len(columns['open_time']),
+        'columns': slice_to_json(columns),
+    })
+
+# Candles plus indicator values: /lesxon/klines/indicators?symbol=BTCUSDT&interval=1h&names=sma_20,rsi_14
+@bp.route('/lesxon/klines/indicators')
+@require_module('lesxon')
+def klines_indicators():
+    symbol = request.args.get('symbol', 'BTCUSDT')
+    interval = request.args.get('interval', '1h')
+    names = [name for name in request.args.get('names', '').split(',') if name] or None
+
+    try:
+        start_time, end_time, limit = _parse_range_args()
+        result = INDICATOR_SERVICE.query(symbol, interval, names, start_time, end_time, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'symbol': symbol.strip().upper(),
+        'interval': interval,
+        'count': len(result['candles']['open_time']),
+        'columns': slice_to_json(result['candles']),
+        'indicators': indicators_to_json(result['indicators']),
+    })
+
+# Most similar earlier windows to the one ending at `end` (default: latest candle):
+# /lesxon/klines/similar?symbol=BTCUSDT&interval=1h&k=10&symbols=ETHUSDT,SOLUSDT&backend=ivf
+@bp.route('/lesxon/klines/similar')
+@require_module('lesxon')
+def klines_similar():
+    k = request.args.get('k', 10, type=int)
+    if k is None or k <= 0:
+        return jsonify({'error': 'k must be a positive integer'}), 400
+    symbols = [name for name in request.args.get('symbols', '').split(',') if name]
+
+    try:
+        result = KLINE_PATTERNS.search(
+            request.args.get('symbol', 'BTCUSDT'),
+            request.args.get('interval', '1h'),
+            end_time=request.args.get('end', type=int),
+            k=k,
+            symbols=symbols,
+            backend=request.args.get('backend') or None,
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(result)
@@ -1,7 +1,11 @@
-from flask import render_template,current_app, session
+from flask import render_template,current_app, session, request, jsonify, Response, stream_with_context
+from sqlalchemy.exc import SQLAlchemyError
 
 from ..lesxon import bp
-from ...home.src.navbar_helpers import get_navbar_context
+from ...home.src.navbar_helpers import get_navbar_context, has_permission
+from ..src.sql_console import DATABASE, SQL_CONSOLE, SQL_CONSOLE_CONFIG, SQL_OUTPUT_FORMATS
+from ..src.query_cache import QUERY_CACHE
+from src.access_control import require_module
 
 # Ruta para la página principal
 @bp.route('/lesxon/supabase')
@@ -17,4 +21,57 @@ def supabase():
         user=session.get('user')
     )
 
-    return render_template('lesxon_supabase.html', **navbar_context, parameter=parameter)          
+    return render_template('lesxon_supabase.html', **navbar_context, parameter=parameter,
+                           cache_stats=QUERY_CACHE.stats())
+
+def _database_error(e: SQLAlchemyError) -> str:
+    """Driver message of a database error, without SQLAlchemy's statement dump"""
+    return str(getattr(e, 'orig', None) or e).strip()
+
+# Connection check: one round trip plus the pool state
+@bp.route('/lesxon/supabase/status')
+@require_module('lesxon')
+def supabase_status():
+    try:
+        return jsonify({'connected': True, **DATABASE.status(), 'cache': QUERY_CACHE.stats()})
+    except SQLAlchemyError as e:
+        return jsonify({'connected': False, 'error': _database_error(e), 'cache': QUERY_CACHE.stats()}), 503
+
+# SQL console: rows come from a server-side cursor in batches and are encoded as they arrive.
+# Statements other than queries need the 'lesxon_sql_write' action permission
+@bp.route('/lesxon/supabase/query', methods=['POST'])
+@require_module('lesxon')
+def supabase_query():
+    values = request.get_json(silent=True) or request.form
+    output_format = values.get('output_format', 'table')
+    if output_format not in SQL_OUTPUT_FORMATS:
+        return jsonify({'error': f"Formato no soportado: {output_format}"}), 400
+    try:
+        limit = int(values.get('query_limit', 100))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Límite de resultados no válido'}), 400
+
+    try:
+        output = SQL_CONSOLE.run(values.get('sql_query', ''), limit, output_format,
+                                 read_only=not has_permission(session.get('user'), 'lesxon_sql_write'))
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except SQLAlchemyError as e:
+        return jsonify({'error': _database_error(e)}), 400
+
+    if output.rowcount is not None:
+        return jsonify({'rowcount': output.rowcount})
+
+    headers = {
+        'X-Query-Limit': str(min(max(limit, 1), SQL_CONSOLE_CONFIG['max_rows'])),
+        'X-Cache': 'HIT' if output.cached else 'MISS',
+    }
+    if output_format == 'csv' and values.get('download'):
+        headers['Content-Disposition'] = 'attachment; filename="query.csv"'
+    return Response(
+        stream_with_context(output.stream),
+        mimetype=SQL_OUTPUT_FORMATS[output_format],
+        headers=headers,
+    )
@@ -1,109 +1,144 @@
-from flask import render_template, current_app, request, flash, session
-from datetime import datetime
+from flask import render_template, current_app, request, flash, session, jsonify
 
 from ..lesxon import bp
-from ...home.src.navbar_helpers import get_navbar_context
+from ...home.src.navbar_helpers import get_navbar_context, is_module_accessible
+from ..src.transaction_store import (
+    TRANSACTION_STORE, TRANSACTION_STORE_CONFIG, parse_transaction_filters, page_to_json, page_to_rows
+)
+from ..src.transaction_rollups import TRANSACTION_ROLLUPS, series_to_json, totals_to_json
+from ..src.transaction_import import detect_format, import_transactions
+from src.access_control import require_module
 
 # Ruta para la página principal
 @bp.route('/lesxon/transactions', methods=['GET', 'POST'])
 def transactions():
+    navbar_context = get_navbar_context(
+        current_route='lesxon.transactions',
+        user=session.get('user')
+    )
+
     if request.method == 'POST':
-        # Get form data
-        symbol = request.form.get('symbol', '').strip().upper()
-        start_date = request.form.get('start_date', '').strip()
-        end_date = request.form.get('end_date', '').strip()
-        transaction_type = request.form.get('transaction_type', '').strip()
-        min_amount = request.form.get('min_amount', '').strip()
-        max_amount = request.form.get('max_amount', '').strip()
-        
-        # Validation
-        errors = {}
-        
-        if symbol and len(symbol) < 3:
-            errors['symbol'] = 'El símbolo debe tener al menos 3 caracteres'
-            
-        if start_date and end_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-                if start_dt > end_dt:
-                    errors['end_date'] = 'La fecha fin debe ser posterior a la fecha inicio'
-            except ValueError:
-                errors['start_date'] = 'Formato de fecha inválido'
-                
-        if min_amount:
-            try:
-                min_val = float(min_amount)
-                if min_val < 0:
-                    errors['min_amount'] = 'El monto mínimo no puede ser negativo'
-            except ValueError:
-                errors['min_amount'] = 'Ingresa un monto válido'
-                
-        if max_amount:
-            try:
-                max_val = float(max_amount)
-                if max_val < 0:
-                    errors['max_amount'] = 'El monto máximo no puede ser negativo'
-                if min_amount and float(min_amount) > max_val:
-                    errors['max_amount'] = 'El monto máximo debe ser mayor al mínimo'
-            except ValueError:
-                errors['max_amount'] = 'Ingresa un monto válido'
-        
+        # The rendered page carries ledger rows: same rule as /lesxon/transactions/data
+        if not is_module_accessible(session.get('user'), 'lesxon'):
+            return render_template('lesxon_transactions.html', error='No tienes permisos para este módulo',
+                                   **navbar_context), 403
+
+        filters, errors = parse_transaction_filters(request.form)
         if errors:
-            navbar_context = get_navbar_context(
-                current_route='lesxon.transactions',
-                user=session.get('user')
-            )
             return render_template('lesxon_transactions.html', errors=errors, **navbar_context)
-        
-        # Simulate search results (replace with real database query)
-        transactions = [
-            [
-                '<span class="text-muted">2024-07-26 10:30:00</span>',
-                f'<span class="badge badge-primary">{symbol or "BTCUSDT"}</span>',
-                '<span class="badge badge-success"><i class="fas fa-arrow-up mr-1"></i>Compra</span>',
-                '<span class="font-weight-bold text-success">$1,500.00</span>',
-                '<span class="text-muted">$62,500.00</span>',
-                '<div class="btn-group btn-group-sm" role="group">' +
-                '<button class="btn btn-outline-primary" title="Ver detalles"><i class="fas fa-eye"></i></button>' +
-                '<button class="btn btn-outline-info" title="Exportar"><i class="fas fa-download"></i></button>' +
-                '</div>'
-            ],
-            [
-                '<span class="text-muted">2024-07-25 15:45:00</span>',
-                f'<span class="badge badge-primary">{symbol or "ETHUSDT"}</span>',
-                '<span class="badge badge-danger"><i class="fas fa-arrow-down mr-1"></i>Venta</span>',
-                '<span class="font-weight-bold text-danger">$950.00</span>',
-                '<span class="text-muted">$3,100.00</span>',
-                '<div class="btn-group btn-group-sm" role="group">' +
-                '<button class="btn btn-outline-primary" title="Ver detalles"><i class="fas fa-eye"></i></button>' +
-                '<button class="btn btn-outline-info" title="Exportar"><i class="fas fa-download"></i></button>' +
-                '</div>'
-            ]
-        ]
-        
-        total_transactions = 150  # Simulated total
-        page = 1
-        per_page = 10
-
-        success = f'Búsqueda completada. Se encontraron {len(transactions)} resultados.'
-        navbar_context = get_navbar_context(
-            current_route='lesxon.transactions',
-            user=session.get('user')
-        )
+
+        # First page rendered server-side; later pages come from /lesxon/transactions/data
+        per_page = TRANSACTION_STORE_CONFIG['page_size']
+        page = TRANSACTION_STORE.query(filters, limit=per_page, with_total=True)
+        transactions = page_to_rows(page)
+
+        success = f'Búsqueda completada. Se encontraron {page["total"]} resultados.'
         return render_template(
-            'lesxon_transactions.html', 
-            success=success, 
+            'lesxon_transactions.html',
+            success=success,
             transactions=transactions,
-            total_transactions=total_transactions,
-            page=page,
+            total_transactions=page['total'],
+            next_cursor=page['next_cursor'],
+            page=1,
             per_page=per_page,
             **navbar_context
         )
 
     # GET request - show transactions page
-    navbar_context = get_navbar_context(
-        current_route='lesxon.transactions',
-        user=session.get('user')
-    )
-    return render_template('lesxon_transactions.html', **navbar_context)          
+    return render_template('lesxon_transactions.html', **navbar_context)
+
+# Keyset page as typed columns: /lesxon/transactions/data?symbol=BTCUSDT&min_amount=100&cursor=...&limit=10&order=desc
+@bp.route('/lesxon/transactions/data')
+@require_module('lesxon')
+def transactions_data():
+    filters, errors = parse_transaction_filters(request.args)
+    if errors:
+        return jsonify({'error': 'Filtros no válidos', 'errors': errors}), 400
+
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'order must be asc or desc'}), 400
+    limit = request.args.get('limit', TRANSACTION_STORE_CONFIG['page_size'], type=int)
+    if limit is None or limit <= 0:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, TRANSACTION_STORE_CONFIG['max_page_size'])
+
+    try:
+        page = TRANSACTION_STORE.query(
+            filters,
+            cursor=request.args.get('cursor') or None,
+            limit=limit,
+            descending=order == 'desc',
+            # Counting walks every matching row, so the table only asks for it on the first page
+            with_total=request.args.get('total') == '1',
+        )
+    except ValueError:
+        return jsonify({'error': 'cursor no válido'}), 400
+
+    result = page_to_json(page)
+    result['count'] = len(result['columns']['id'])
+    result['order'] = order
+    return jsonify(result)
+
+# Bulk import of a CSV or JSON-lines upload: validated in chunks, valid rows inserted in batches
+@bp.route('/lesxon/transactions/import', methods=['POST'])
+@require_module('lesxon')
+def transactions_import():
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'Selecciona un archivo CSV o JSONL'}), 400
+
+    try:
+        import_format = detect_format(upload.filename, request.form.get('format') or None)
+        result = import_transactions(upload.stream, import_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    status = 400 if 'error' in result else 200
+    return jsonify(result), status
+
+# Per-symbol totals read from the rollup tiers (type and amount filters do not apply): /lesxon/transactions/summary?symbol=BTCUSDT&start_date=2024-01-01
+@bp.route('/lesxon/transactions/summary')
+@require_module('lesxon')
+def transactions_summary():
+    filters, errors = parse_transaction_filters(request.args)
+    if errors:
+        return jsonify({'error': 'Filtros no válidos', 'errors': errors}), 400
+
+    symbols = [filters['symbol']] if 'symbol' in filters else TRANSACTION_STORE.symbols()
+    summary = []
+    overall = None
+    for symbol in symbols:
+        if not len(TRANSACTION_STORE.partition(symbol)):
+            continue
+        totals = TRANSACTION_ROLLUPS.totals(symbol, filters.get('start_time'), filters.get('end_time'))
+        overall = totals if overall is None else {column: overall[column] + value for column, value in totals.items()}
+        summary.append({'symbol': symbol, **totals_to_json(totals)})
+
+    return jsonify({
+        'symbols': summary,
+        'total': totals_to_json(overall) if overall is not None else None,
+    })
+
+# Buckets of one rollup tier for a symbol: /lesxon/transactions/rollups?symbol=BTCUSDT&tier=1d&start_date=2024-01-01
+@bp.route('/lesxon/transactions/rollups')
+@require_module('lesxon')
+def transactions_rollups():
+    filters, errors = parse_transaction_filters(request.args)
+    if errors:
+        return jsonify({'error': 'Filtros no válidos', 'errors': errors}), 400
+    if 'symbol' not in filters:
+        return jsonify({'error': 'symbol is required'}), 400
+
+    tier = request.args.get('tier', '1d')
+    try:
+        columns = TRANSACTION_ROLLUPS.series(filters['symbol'], tier, filters.get('start_time'), filters.get('end_time'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'symbol': filters['symbol'],
+        'tier': tier,
+        'count': len(columns['bucket']),
+        'columns': series_to_json(columns),
+    })
@@ -1,7 +1,12 @@
-from flask import render_template,current_app, session
+from flask import render_template,current_app, session, request, jsonify, Response, stream_with_context, send_file
+from werkzeug.utils import secure_filename
+import os
 
 from ..lesxon import bp
 from ...home.src.navbar_helpers import get_navbar_context
+from ..src.zip_builder import ZIP_BUILDER, ZIP_BUILDER_CONFIG, list_source_files, parse_compression_level
+from ..src.zip_inspector import ZIP_INSPECTOR, ZIP_INSPECTOR_CONFIG, entry_to_dict
+from src.access_control import require_module
 
 # Ruta para la página principal
 @bp.route('/lesxon/zip')
@@ -17,4 +22,138 @@ def zip():
         user=session.get('user')
     )
 
-    return render_template('lesxon_zip.html', **navbar_context, parameter=parameter)          
+    source_files = list_source_files(ZIP_BUILDER_CONFIG['source_dir'])
+    archives = ZIP_INSPECTOR.archives()
+
+    return render_template('lesxon_zip.html', **navbar_context, parameter=parameter,
+                           source_files=source_files, archives=archives,
+                           max_upload_bytes=ZIP_INSPECTOR_CONFIG['max_upload_bytes'])
+
+# Streamed archive of the selected files: members are deflated in parallel and sent in order
+@bp.route('/lesxon/zip/create', methods=['POST'])
+@require_module('lesxon')
+def zip_create():
+    if request.form.get('password_protect') and request.form.get('zip_password'):
+        # Legacy ZipCrypto is trivially breakable and AES needs a crypto dependency we do not ship
+        return jsonify({'error': 'La protección con contraseña no está disponible'}), 400
+
+    zip_name = secure_filename(request.form.get('zip_name', '').strip()) or 'archivo'
+    if zip_name.lower().endswith('.zip'):
+        zip_name = zip_name[:-4]
+
+    try:
+        level = parse_compression_level(request.form.get('compression_level', '6'))
+        members = ZIP_BUILDER.members(ZIP_BUILDER_CONFIG['source_dir'], request.form.getlist('files[]'), level)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return Response(
+        stream_with_context(ZIP_BUILDER.stream(members, level)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{zip_name}.zip"'},
+    )
+
+# Local archives: listed from the central directory only, members streamed on demand
+@bp.route('/lesxon/zip/archives', methods=['GET', 'POST'])
+@require_module('lesxon')
+def zip_archives():
+    if request.method == 'GET':
+        return jsonify({'archives': ZIP_INSPECTOR.archives()})
+
+    # Checked before request.files spools the body; chunked uploads without a length are refused
+    if request.content_length is None:
+        return jsonify({'error': 'La subida debe indicar su tamaño'}), 411
+    if request.content_length > ZIP_INSPECTOR_CONFIG['max_upload_bytes']:
+        return jsonify({'error': 'El archivo supera el tamaño máximo permitido'}), 413
+
+    upload = request.files.get('archive')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'Selecciona un archivo ZIP'}), 400
+
+    name = secure_filename(upload.filename)
+    if not name.lower().endswith('.zip'):
+        return jsonify({'error': 'Solo se admiten archivos ZIP'}), 400
+
+    target = os.path.join(ZIP_INSPECTOR.archive_dir, name)
+    if os.path.exists(target) and request.form.get('overwrite') != '1':
+        return jsonify({'error': f"Ya existe un archivo '{name}'", 'exists': True}), 409
+
+    # Validated under its .part name: an invalid upload never replaces an existing archive
+    os.makedirs(ZIP_INSPECTOR.archive_dir, exist_ok=True)
+    partial = target + '.part'
+    upload.save(partial)
+    try:
+        entries = len(ZIP_INSPECTOR.listing(name + '.part').entries)
+    except ValueError as e:
+        os.remove(partial)
+        return jsonify({'error': str(e)}), 400
+    os.replace(partial, target)
+    return jsonify({'name': name, 'entries': entries}), 201
+
+@bp.route('/lesxon/zip/archives/<archive>', methods=['GET', 'DELETE'])
+@require_module('lesxon')
+def zip_archive(archive):
+    try:
+        path = ZIP_INSPECTOR.path(archive)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+    if request.method == 'DELETE':
+        os.remove(path)
+        return jsonify({'deleted': archive})
+    return send_file(os.path.abspath(path), mimetype='application/zip', as_attachment=True, download_name=archive)
+
+@bp.route('/lesxon/zip/archives/<archive>/entries')
+@require_module('lesxon')
+def zip_archive_entries(archive):
+    try:
+        listing = ZIP_INSPECTOR.listing(archive)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+    prefix = request.args.get('prefix', '')
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 500, type=int), 1), 5000)
+    entries = [entry for entry in listing.entries if entry.name.startswith(prefix)] if prefix else listing.entries
+
+    return jsonify({
+        'archive': archive,
+        'total': len(entries),
+        'offset': offset,
+        'entries': [entry_to_dict(entry) for entry in entries[offset:offset + limit]],
+    })
+
+# One member, whole or a byte range (Range header, e.g. a preview of the first KB)
+@bp.route('/lesxon/zip/archives/<archive>/entries/<path:member>')
+@require_module('lesxon')
+def zip_archive_member(archive, member):
+    try:
+        entry = ZIP_INSPECTOR.entry(archive, member)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+    start, end, status = 0, entry.file_size, 200
+    headers = {'Accept-Ranges': 'bytes'}
+    byte_range = request.range.range_for_length(entry.file_size) if request.range else None
+    if byte_range is not None:
+        start, end = byte_range
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{end - 1}/{entry.file_size}'
+    headers['Content-Length'] = str(end - start)
+
+    if request.args.get('inline') == '1':
+        mimetype = 'text/plain; charset=utf-8'
+    else:
+        mimetype = 'application/octet-stream'
+        headers['Content-Disposition'] = f'attachment; filename="{secure_filename(os.path.basename(member)) or "archivo"}"'
+
+    return Response(stream_with_context(ZIP_INSPECTOR.extract(archive, entry, start, end)),
+                    status=status, mimetype=mimetype, headers=headers)
+
+@bp.route('/lesxon/zip/archives/<archive>/verify')
+@require_module('lesxon')
+def zip_archive_verify(archive):
+    try:
+        return jsonify(ZIP_INSPECTOR.verify(archive))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
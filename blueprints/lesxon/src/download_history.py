@@ -0,0 +1,218 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+from datetime import datetime
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# ========== DOWNLOAD HISTORY CONFIGURATION ==========
+
+def get_download_history_config() -> Dict[str, Any]:
+    """Gets download history configuration from environment variables or defaults"""
+    data_dir = os.getenv('DOWNLOAD_DATA_DIR', os.path.join('data', 'downloads'))
+    return {
+        'db_path': os.getenv('DOWNLOAD_HISTORY_DB_PATH', os.path.join(data_dir, 'history.sqlite3')),
+        'per_page': int(os.getenv('DOWNLOAD_HISTORY_PER_PAGE', '25')),
+    }
+
+# Filters accepted by page(); each one is served by its own (column, created) index
+HISTORY_FILTERS = ('symbol', 'status', 'data_type')
+
+# ========== HISTORY STORE ==========
+
+class DownloadHistory:
+    """
+    Download history in a local SQLite file shared by every worker process.
+
+    Sizes are stored as integer bytes and every filterable column is indexed
+    together with `created`, so a page is an index range scan. Running totals
+    (files, bytes, successes, errors) live in a one-row table updated in the
+    same transaction as each write, so the unfiltered summary is a single read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS download_history ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, data_type TEXT NOT NULL, '
+            'symbol TEXT NOT NULL, format TEXT NOT NULL, status TEXT NOT NULL, '
+            'size_bytes INTEGER NOT NULL DEFAULT 0, rows INTEGER, filename TEXT, job_id TEXT, '
+            'params TEXT, error TEXT)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS download_history_created ON download_history (created)')
+        for column in HISTORY_FILTERS:
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS download_history_{column} ON download_history ({column}, created)'
+            )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS download_history_totals ('
+            'id INTEGER PRIMARY KEY CHECK (id = 1), files INTEGER NOT NULL, bytes INTEGER NOT NULL, '
+            'successes INTEGER NOT NULL, errors INTEGER NOT NULL)'
+        )
+        connection.execute('INSERT OR IGNORE INTO download_history_totals VALUES (1, 0, 0, 0, 0)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (SQLite connections must not cross fork())"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _adjust_totals(self, connection: sqlite3.Connection, sign: int, where: str = '',
+                       args: Tuple[Any, ...] = ()) -> None:
+        """Adds (sign=1) or subtracts (sign=-1) the aggregates of the matching rows"""
+        files, size, successes, errors = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(status = 'completed'), 0), "
+            f"COALESCE(SUM(status = 'error'), 0) FROM download_history {where}", args
+        ).fetchone()
+        connection.execute(
+            'UPDATE download_history_totals SET files = files + ?, bytes = bytes + ?, '
+            'successes = successes + ?, errors = errors + ? WHERE id = 1',
+            (sign * files, sign * size, sign * successes, sign * errors)
+        )
+
+    def record(self, data_type: str, symbol: str, export_format: str, status: str,
+               size_bytes: int = 0, rows: Optional[int] = None, filename: Optional[str] = None,
+               job_id: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> int:
+        """Appends one entry and updates the running totals; returns the entry id"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = connection.execute(
+                'INSERT INTO download_history (created, data_type, symbol, format, status, size_bytes, '
+                'rows, filename, job_id, params, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (time.time(), data_type, symbol, export_format, status, int(size_bytes), rows,
+                 filename, job_id, json.dumps(params) if params is not None else None, error)
+            )
+            self._adjust_totals(connection, 1, 'WHERE id = ?', (cursor.lastrowid,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return cursor.lastrowid
+
+    def delete(self, where: str, args: Tuple[Any, ...] = ()) -> int:
+        """Deletes the entries matching a WHERE clause and updates the running totals"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._adjust_totals(connection, -1, where, args)
+            deleted = connection.execute(f'DELETE FROM download_history {where}', args).rowcount
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return deleted
+
+    def delete_entry(self, entry_id: int) -> int:
+        """Deletes one entry"""
+        return self.delete('WHERE id = ?', (entry_id,))
+
+    def delete_status(self, status: str) -> int:
+        """Deletes every entry with a status (e.g. clearing completed downloads)"""
+        return self.delete('WHERE status = ?', (status,))
+
+    def totals(self) -> Dict[str, int]:
+        """Gets the running totals without scanning the history"""
+        row = self._connection().execute(
+            'SELECT files, bytes, successes, errors FROM download_history_totals WHERE id = 1'
+        ).fetchone()
+        return dict(row)
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Gets one entry"""
+        row = self._connection().execute('SELECT * FROM download_history WHERE id = ?', (entry_id,)).fetchone()
+        return _entry_to_dict(row) if row is not None else None
+
+    def page(self, page: int = 1, per_page: int = 25, date_from: Optional[float] = None,
+             date_to: Optional[float] = None, **filters: Optional[str]) -> Dict[str, Any]:
+        """
+        Gets one page of entries (newest first) plus the summary of everything
+        matching the filters: the running totals when unfiltered, else one
+        indexed aggregate query.
+        """
+        clauses, args = [], []
+        for column in HISTORY_FILTERS:
+            if filters.get(column):
+                clauses.append(f'{column} = ?')
+                args.append(filters[column])
+        if date_from is not None:
+            clauses.append('created >= ?')
+            args.append(date_from)
+        if date_to is not None:
+            clauses.append('created < ?')
+            args.append(date_to)
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+        connection = self._connection()
+        if clauses:
+            row = connection.execute(
+                "SELECT COUNT(*) AS files, COALESCE(SUM(size_bytes), 0) AS bytes, "
+                "COALESCE(SUM(status = 'completed'), 0) AS successes, "
+                f"COALESCE(SUM(status = 'error'), 0) AS errors FROM download_history {where}", args
+            ).fetchone()
+            summary = dict(row)
+        else:
+            summary = self.totals()
+
+        per_page = max(per_page, 1)
+        pages = max(math.ceil(summary['files'] / per_page), 1)
+        page = min(max(page, 1), pages)
+        rows = connection.execute(
+            f'SELECT * FROM download_history {where} ORDER BY created DESC, id DESC LIMIT ? OFFSET ?',
+            (*args, per_page, (page - 1) * per_page)
+        ).fetchall()
+
+        return {
+            'items': [_entry_to_dict(row) for row in rows],
+            'page': page,
+            'pages': pages,
+            'per_page': per_page,
+            'summary': summary,
+            'filters': {column: filters[column] for column in HISTORY_FILTERS if filters.get(column)},
+        }
+
+
+def _entry_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    entry = dict(row)
+    entry['params'] = json.loads(entry['params']) if entry['params'] else None
+    entry['date'] = datetime.fromtimestamp(entry['created']).strftime('%Y-%m-%d %H:%M')
+    return entry
+
+def track_stream(history: DownloadHistory, stream: Iterator[bytes], data_type: str, symbol: str,
+                 export_format: str, filename: str, params: Dict[str, Any]) -> Iterator[bytes]:
+    """Passes a download stream through and records it in the history once it ends"""
+    size = 0
+    try:
+        for chunk in stream:
+            size += len(chunk)
+            yield chunk
+    except GeneratorExit:
+        # The server closes the generator when the client goes away mid-download
+        history.record(data_type, symbol, export_format, 'error', size, filename=filename,
+                       params=params, error='Descarga interrumpida por el cliente')
+        raise
+    except Exception as e:
+        history.record(data_type, symbol, export_format, 'error', size, filename=filename,
+                       params=params, error=str(e))
+        raise
+    history.record(data_type, symbol, export_format, 'completed', size, filename=filename, params=params)
+
+# Shared per-process history over the shared database
+DOWNLOAD_HISTORY_CONFIG = get_download_history_config()
+DOWNLOAD_HISTORY = DownloadHistory(DOWNLOAD_HISTORY_CONFIG['db_path'])
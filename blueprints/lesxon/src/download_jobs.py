@@ -0,0 +1,435 @@
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from .download_history import DOWNLOAD_HISTORY, DownloadHistory
+from .export_streams import EXPORT_FORMATS, EXPORT_SOURCES, build_export, parse_date_range
+
+logger = logging.getLogger(__name__)
+
+# ========== DOWNLOAD JOBS CONFIGURATION ==========
+
+def get_download_jobs_config() -> Dict[str, Any]:
+    """Gets background download configuration from environment variables or defaults"""
+    data_dir = os.getenv('DOWNLOAD_DATA_DIR', os.path.join('data', 'downloads'))
+    return {
+        'data_dir': data_dir,
+        'db_path': os.getenv('DOWNLOAD_DB_PATH', os.path.join(data_dir, 'jobs.sqlite3')),
+        'workers': int(os.getenv('DOWNLOAD_WORKERS', '2')),
+        'max_artifact_bytes': int(os.getenv('DOWNLOAD_MAX_ARTIFACT_BYTES', str(2 * 1024 ** 3))),
+        'progress_interval': float(os.getenv('DOWNLOAD_PROGRESS_INTERVAL', '0.5')),
+        'poll_interval': float(os.getenv('DOWNLOAD_POLL_INTERVAL', '2')),
+    }
+
+# Job lifecycle: queued -> running -> completed | error; completed -> expired when evicted
+
+# Request fields that identify a job; identical submissions share one job
+JOB_PARAMS = ('data_type', 'symbol', 'start_date', 'end_date', 'format', 'compress', 'interval')
+
+def normalize_job_params(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates a download request and returns its canonical parameters (raises ValueError)"""
+    params = {
+        'data_type': str(values.get('data_type') or 'klines'),
+        'symbol': str(values.get('symbol') or 'BTCUSDT').strip().upper(),
+        'start_date': str(values.get('start_date') or '').strip(),
+        'end_date': str(values.get('end_date') or '').strip(),
+        'format': str(values.get('format') or 'csv'),
+        'compress': str(values.get('compress', '')).lower() in ('1', 'true', 'on'),
+        'interval': str(values.get('interval') or '1m'),
+    }
+    if params['data_type'] not in EXPORT_SOURCES:
+        raise ValueError(f"No hay datos disponibles para el tipo '{params['data_type']}'")
+    if params['format'] not in EXPORT_FORMATS:
+        raise ValueError(f"Formato no soportado: '{params['format']}'")
+    # XLSX is never gzipped, so the flag must not split otherwise identical jobs
+    if params['format'] == 'xlsx':
+        params['compress'] = False
+    parse_date_range(params['start_date'], params['end_date'])
+    return params
+
+def job_key(params: Dict[str, Any]) -> str:
+    """Stable hash of the parameters that identify a job"""
+    canonical = json.dumps([params[name] for name in JOB_PARAMS], separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+# ========== PERSISTENT QUEUE ==========
+
+class DownloadJobStore:
+    """
+    Jobs table in a local SQLite file shared by every worker process.
+    Claiming runs inside BEGIN IMMEDIATE so two processes never take the same job.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS download_jobs ('
+            'id TEXT PRIMARY KEY, job_key TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, '
+            'rows INTEGER NOT NULL DEFAULT 0, total_rows INTEGER, bytes INTEGER NOT NULL DEFAULT 0, '
+            'filename TEXT, mimetype TEXT, artifact TEXT, error TEXT, owner_pid INTEGER, '
+            'range_end INTEGER, created REAL NOT NULL, started REAL, finished REAL, accessed REAL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS download_jobs_key ON download_jobs (job_key, status)')
+        connection.execute('CREATE INDEX IF NOT EXISTS download_jobs_status ON download_jobs (status, created)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (SQLite connections must not cross fork())"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def submit(self, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queues a job unless an identical one is queued, running, or completed with
+        a still valid artifact. Returns (job, created).
+        """
+        key = job_key(params)
+        _, range_end = parse_date_range(params['start_date'], params['end_date'])
+        now = time.time()
+
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            # A completed artifact is only reusable if its range had fully elapsed when it was built
+            existing = connection.execute(
+                "SELECT * FROM download_jobs WHERE job_key = ? AND (status IN ('queued', 'running') "
+                "OR (status = 'completed' AND range_end IS NOT NULL AND finished * 1000 >= range_end)) "
+                "ORDER BY created DESC LIMIT 1", (key,)
+            ).fetchone()
+            if existing is not None and existing['status'] == 'completed' and not os.path.exists(existing['artifact'] or ''):
+                connection.execute(
+                    "UPDATE download_jobs SET status = 'expired', artifact = NULL WHERE id = ?", (existing['id'],)
+                )
+            elif existing is not None:
+                connection.execute('COMMIT')
+                return dict(existing), False
+
+            job_id = secrets.token_hex(8)
+            connection.execute(
+                "INSERT INTO download_jobs (id, job_key, params, status, range_end, created) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, key, json.dumps(params), range_end, now)
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return self.get(job_id), True
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically takes the oldest queued job for this process"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                "SELECT * FROM download_jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE download_jobs SET status = 'running', owner_pid = ?, started = ?, "
+                    "rows = 0, bytes = 0, error = NULL WHERE id = ?",
+                    (os.getpid(), time.time(), row['id'])
+                )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return dict(row) if row is not None else None
+
+    def requeue_orphans(self) -> int:
+        """Puts back jobs left running by a process that no longer exists"""
+        connection = self._connection()
+        running = connection.execute(
+            "SELECT id, owner_pid FROM download_jobs WHERE status = 'running'"
+        ).fetchall()
+        orphans = [row['id'] for row in running if not _pid_alive(row['owner_pid'])]
+        for job_id in orphans:
+            connection.execute(
+                "UPDATE download_jobs SET status = 'queued', owner_pid = NULL WHERE id = ? AND status = 'running'",
+                (job_id,)
+            )
+        return len(orphans)
+
+    def progress(self, job_id: str, rows: int, total_bytes: int, total_rows: Optional[int]) -> None:
+        """Publishes progress of a running job"""
+        self._connection().execute(
+            'UPDATE download_jobs SET rows = ?, bytes = ?, total_rows = ? WHERE id = ?',
+            (rows, total_bytes, total_rows, job_id)
+        )
+
+    def finish(self, job_id: str, artifact: str, filename: str, mimetype: str,
+               rows: int, total_bytes: int) -> None:
+        """Marks a job completed with its artifact"""
+        now = time.time()
+        self._connection().execute(
+            "UPDATE download_jobs SET status = 'completed', artifact = ?, filename = ?, mimetype = ?, "
+            "rows = ?, total_rows = ?, bytes = ?, finished = ?, accessed = ? WHERE id = ?",
+            (artifact, filename, mimetype, rows, rows, total_bytes, now, now, job_id)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Marks a job failed"""
+        self._connection().execute(
+            "UPDATE download_jobs SET status = 'error', error = ?, finished = ? WHERE id = ?",
+            (error, time.time(), job_id)
+        )
+
+    def touch(self, job_id: str) -> None:
+        """Records an artifact download (eviction is least recently used first)"""
+        self._connection().execute('UPDATE download_jobs SET accessed = ? WHERE id = ?', (time.time(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Gets one job row"""
+        row = self._connection().execute('SELECT * FROM download_jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Gets active jobs first, then the most recently created ones"""
+        rows = self._connection().execute(
+            "SELECT * FROM download_jobs ORDER BY status IN ('queued', 'running') DESC, created DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def evict(self, max_bytes: int, keep: Optional[str] = None) -> List[str]:
+        """
+        Deletes least recently used artifacts (except `keep`) until the retained
+        total fits max_bytes. Evicted jobs stay in the table as 'expired'.
+        Returns the evicted job ids.
+        """
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT id, artifact, bytes FROM download_jobs WHERE status = 'completed' ORDER BY accessed"
+        ).fetchall()
+        total = sum(row['bytes'] for row in rows)
+        evicted = []
+        for row in rows:
+            if total <= max_bytes:
+                break
+            if row['id'] == keep:
+                continue
+            try:
+                os.remove(row['artifact'])
+            except OSError:
+                pass
+            connection.execute(
+                "UPDATE download_jobs SET status = 'expired', artifact = NULL WHERE id = ? AND status = 'completed'",
+                (row['id'],)
+            )
+            total -= row['bytes']
+            evicted.append(row['id'])
+        return evicted
+
+# ========== WORKER POOL ==========
+
+class DownloadJobQueue:
+    """
+    Runs queued exports on a bounded thread pool, writing each one to an artifact file.
+    Every finished or failed job is recorded in the download history.
+
+    Threads are started lazily in the process that first uses the queue, so a
+    prefork master can import this module without leaking threads into its
+    workers. At most `workers` jobs are claimed per process; the rest wait in
+    the persistent queue where any worker process can pick them up.
+    """
+
+    def __init__(self, store: DownloadJobStore, history: DownloadHistory, artifacts_dir: str, workers: int = 2,
+                 max_artifact_bytes: int = 2 * 1024 ** 3, progress_interval: float = 0.5,
+                 poll_interval: float = 2.0):
+        self.store = store
+        self.history = history
+        self.artifacts_dir = artifacts_dir
+        self.workers = max(workers, 1)
+        self.max_artifact_bytes = max_artifact_bytes
+        self.progress_interval = progress_interval
+        self.poll_interval = poll_interval
+
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._slots = threading.Semaphore(self.workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._slots = threading.Semaphore(self.workers)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='download-job')
+            os.makedirs(self.artifacts_dir, exist_ok=True)
+            requeued = self.store.requeue_orphans()
+            if requeued:
+                logger.info("Requeued %s interrupted download jobs", requeued)
+            threading.Thread(target=self._dispatch, name='download-dispatcher', daemon=True).start()
+
+    def _dispatch(self) -> None:
+        """Claims queued jobs while this process has free slots"""
+        while True:
+            while self._slots.acquire(blocking=False):
+                try:
+                    job = self.store.claim()
+                except sqlite3.Error:
+                    logger.exception("Could not claim a download job")
+                    job = None
+                if job is None:
+                    self._slots.release()
+                    break
+                self._executor.submit(self._run, job)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job['id']
+        params = json.loads(job['params'])
+        partial = os.path.join(self.artifacts_dir, f"{job_id}.part")
+        progress = {'rows': 0, 'bytes': 0}
+
+        def count_rows(count: int) -> None:
+            progress['rows'] += count
+
+        try:
+            export = build_export(
+                data_type=params['data_type'],
+                symbol=params['symbol'],
+                start_date=params['start_date'],
+                end_date=params['end_date'],
+                export_format=params['format'],
+                compress=params['compress'],
+                on_rows=count_rows,
+                interval=params['interval'],
+            )
+            artifact = os.path.join(self.artifacts_dir, f"{job_id}_{export.filename}")
+            published = time.monotonic()
+            self.store.progress(job_id, 0, 0, export.total_rows)
+
+            with open(partial, 'wb') as output:
+                for chunk in export.stream:
+                    output.write(chunk)
+                    progress['bytes'] += len(chunk)
+                    if time.monotonic() - published >= self.progress_interval:
+                        self.store.progress(job_id, progress['rows'], progress['bytes'], export.total_rows)
+                        published = time.monotonic()
+
+            os.replace(partial, artifact)
+            self.store.finish(job_id, artifact, export.filename, export.mimetype,
+                              progress['rows'], progress['bytes'])
+            self.history.record(params['data_type'], params['symbol'], params['format'], 'completed',
+                                progress['bytes'], rows=progress['rows'], filename=export.filename,
+                                job_id=job_id, params=params)
+            self.store.evict(self.max_artifact_bytes, keep=job_id)
+        except Exception as e:
+            logger.exception("Download job %s failed", job_id)
+            self.store.fail(job_id, str(e))
+            self.history.record(params['data_type'], params['symbol'], params['format'], 'error',
+                                job_id=job_id, params=params, error=str(e))
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+
+    def submit(self, values: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Validates and queues a download; returns (job, created)"""
+        params = normalize_job_params(values)
+        self._ensure_started()
+        job, created = self.store.submit(params)
+        if created:
+            self._wakeup.set()
+        return job_to_dict(job), created
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Gets the public view of a job"""
+        self._ensure_started()
+        job = self.store.get(job_id)
+        return job_to_dict(job) if job is not None else None
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Gets the public view of the most relevant jobs"""
+        self._ensure_started()
+        return [job_to_dict(job) for job in self.store.recent(limit)]
+
+    def artifact(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Gets a completed job whose artifact is still on disk, marking it as used"""
+        job = self.store.get(job_id)
+        if job is None or job['status'] != 'completed' or not os.path.exists(job['artifact'] or ''):
+            return None
+        self.store.touch(job_id)
+        return job
+
+
+def job_to_dict(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public JSON view of a job row, with percentage and ETA derived from its progress"""
+    params = json.loads(job['params'])
+    rows, total_rows = job['rows'], job['total_rows']
+
+    percent = None
+    eta_seconds = None
+    if job['status'] == 'completed':
+        percent = 100.0
+    elif job['status'] == 'running' and total_rows:
+        percent = round(min(rows / total_rows, 1.0) * 100, 1)
+        if rows and job['started']:
+            elapsed = time.time() - job['started']
+            eta_seconds = round(elapsed * (total_rows - rows) / rows, 1)
+
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'params': params,
+        'rows': rows,
+        'total_rows': total_rows,
+        'bytes': job['bytes'],
+        'percent': percent,
+        'eta_seconds': eta_seconds,
+        'filename': job['filename'],
+        'error': job['error'],
+        'created': job['created'],
+        'started': job['started'],
+        'finished': job['finished'],
+    }
+
+# Shared per-process queue over the shared jobs database
+DOWNLOAD_JOBS_CONFIG = get_download_jobs_config()
+DOWNLOAD_JOBS = DownloadJobQueue(
+    DownloadJobStore(DOWNLOAD_JOBS_CONFIG['db_path']),
+    DOWNLOAD_HISTORY,
+    os.path.join(DOWNLOAD_JOBS_CONFIG['data_dir'], 'artifacts'),
+    workers=DOWNLOAD_JOBS_CONFIG['workers'],
+    max_artifact_bytes=DOWNLOAD_JOBS_CONFIG['max_artifact_bytes'],
+    progress_interval=DOWNLOAD_JOBS_CONFIG['progress_interval'],
+    poll_interval=DOWNLOAD_JOBS_CONFIG['poll_interval'],
+)
@@ -0,0 +1,257 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+import csv
+import io
+import json
+import os
+import zipfile
+import zlib
+
+import numpy as np
+
+from .kline_store import KLINE_COLUMNS
+from .kline_resampler import KLINE_RESAMPLER
+
+# ========== EXPORT CONFIGURATION ==========
+
+def get_export_config() -> Dict[str, Any]:
+    """Gets export configuration from environment variables or defaults"""
+    return {
+        'batch_rows': int(os.getenv('EXPORT_BATCH_ROWS', '5000')),
+        'gzip_level': int(os.getenv('EXPORT_GZIP_LEVEL', '6')),
+    }
+
+EXPORT_CONFIG = get_export_config()
+
+EXPORT_FORMATS: Dict[str, Dict[str, str]] = {
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'json': {'mimetype': 'application/json', 'extension': 'json'},
+    'xlsx': {'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'extension': 'xlsx'},
+}
+
+class RowBatches(NamedTuple):
+    """What a data source returns: column names, batches of row tuples and (if known) the row count"""
+    header: List[str]
+    batches: Iterator[List[Sequence[Any]]]
+    total: Optional[int] = None
+
+
+class Export(NamedTuple):
+    """A validated export ready to be streamed"""
+    stream: Iterator[bytes]
+    mimetype: str
+    filename: str
+    total_rows: Optional[int]
+
+# ========== DATA SOURCES ==========
+
+# data_type -> function(symbol, start_time, end_time, **options) returning RowBatches
+EXPORT_SOURCES: Dict[str, Callable[..., RowBatches]] = {}
+
+def register_export_source(data_type: str) -> Callable[[Callable[..., RowBatches]], Callable[..., RowBatches]]:
+    """Decorator that makes a row source available to the export endpoint"""
+    def decorator(source: Callable[..., RowBatches]) -> Callable[..., RowBatches]:
+        EXPORT_SOURCES[data_type] = source
+        return source
+    return decorator
+
+def iter_column_batches(columns: Dict[str, np.ndarray], lo: int, hi: int,
+                        batch_rows: int) -> Iterator[List[Sequence[Any]]]:
+    """Yields rows [lo, hi) of columnar arrays in fixed-size batches of tuples"""
+    names = list(columns)
+    for start in range(lo, hi, batch_rows):
+        stop = min(start + batch_rows, hi)
+        yield list(zip(*(columns[name][start:stop].tolist() for name in names)))
+
+@register_export_source('klines')
+def kline_rows(symbol: str, start_time: Optional[int], end_time: Optional[int],
+               interval: str = '1m', **options: Any) -> RowBatches:
+    """Streams stored (or derived) candles of a symbol in a time range"""
+    columns = KLINE_RESAMPLER.columns(symbol, interval)
+    open_time = columns['open_time']
+    lo = int(np.searchsorted(open_time, start_time, side='left')) if start_time is not None else 0
+    hi = int(np.searchsorted(open_time, end_time, side='left')) if end_time is not None else len(open_time)
+    return RowBatches(list(KLINE_COLUMNS), iter_column_batches(columns, lo, hi, EXPORT_CONFIG['batch_rows']), hi - lo)
+
+def parse_date_range(start_date: str, end_date: str) -> Tuple[Optional[int], Optional[int]]:
+    """Converts inclusive YYYY-MM-DD form dates to a [start, end) range in UTC milliseconds"""
+    def to_ms(value: str) -> int:
+        day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        return int(day.timestamp() * 1000)
+
+    start_time = to_ms(start_date) if start_date else None
+    end_time = to_ms(end_date) + 86_400_000 if end_date else None
+    if start_time is not None and end_time is not None and start_time >= end_time:
+        raise ValueError('La fecha fin debe ser posterior a la fecha inicio')
+    return start_time, end_time
+
+# ========== STREAMING ENCODERS ==========
+
+def csv_stream(header: List[str], batches: Iterable[List[Sequence[Any]]]) -> Iterator[bytes]:
+    """Encodes batches as CSV, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def json_stream(header: List[str], batches: Iterable[List[Sequence[Any]]]) -> Iterator[bytes]:
+    """Encodes batches as one JSON array of objects, emitted incrementally"""
+    separator = '['
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = ','.join(json.dumps(dict(zip(header, row)), separators=(',', ':')) for row in batch)
+        yield (separator + chunk).encode('utf-8')
+        separator = ','
+    yield (']' if separator == ',' else '[]').encode('utf-8')
+
+
+class _StreamSink(io.RawIOBase):
+    """Non-seekable file object that collects writes until the generator drains them"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile needs offsets, never seeks on an unseekable stream
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Data" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value!r}</v></c>' if value == value else '<c/>'
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+def _xlsx_row(row: Sequence[Any]) -> str:
+    return '<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>'
+
+def xlsx_stream(header: List[str], batches: Iterable[List[Sequence[Any]]]) -> Iterator[bytes]:
+    """
+    Builds an XLSX workbook on the fly: the sheet XML is generated row batch by
+    row batch inside a zip written to a non-seekable sink (data descriptors,
+    ZIP64 when needed), so nothing is staged in memory or on disk.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+            yield sink.drain()
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(header)
+            ).encode('utf-8'))
+            for batch in batches:
+                sheet.write(''.join(_xlsx_row(row) for row in batch).encode('utf-8'))
+                data = sink.drain()
+                if data:
+                    yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+EXPORT_ENCODERS: Dict[str, Callable[[List[str], Iterable[List[Sequence[Any]]]], Iterator[bytes]]] = {
+    'csv': csv_stream,
+    'json': json_stream,
+    'xlsx': xlsx_stream,
+}
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compresses a byte stream on the fly into a single gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+# ========== EXPORT PIPELINE ==========
+
+def _report_rows(batches: Iterable[List[Sequence[Any]]], on_rows: Callable[[int], None]) -> Iterator[List[Sequence[Any]]]:
+    for batch in batches:
+        yield batch
+        on_rows(len(batch))
+
+def build_export(data_type: str, symbol: str, start_date: str = '', end_date: str = '',
+                 export_format: str = 'csv', compress: bool = False,
+                 on_rows: Optional[Callable[[int], None]] = None, **options: Any) -> Export:
+    """
+    Validates an export request and returns the byte stream to send.
+    on_rows, if given, is called with the size of every batch once it is encoded.
+    Raises ValueError for unknown types/formats or invalid dates before any byte is sent.
+    """
+    if data_type not in EXPORT_SOURCES:
+        raise ValueError(f"No hay datos disponibles para el tipo '{data_type}'")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato no soportado: '{export_format}'")
+
+    start_time, end_time = parse_date_range(start_date, end_date)
+    rows = EXPORT_SOURCES[data_type](symbol, start_time, end_time, **options)
+    batches = _report_rows(rows.batches, on_rows) if on_rows else rows.batches
+
+    spec = EXPORT_FORMATS[export_format]
+    stream = EXPORT_ENCODERS[export_format](rows.header, batches)
+    mimetype = spec['mimetype']
+    filename = f"{symbol.strip().lower()}_{data_type}_{start_date or 'all'}_{end_date or 'now'}.{spec['extension']}"
+
+    # XLSX is already a deflated zip container
+    if compress and export_format != 'xlsx':
+        stream = gzip_stream(stream, EXPORT_CONFIG['gzip_level'])
+        mimetype = 'application/gzip'
+        filename += '.gz'
+
+    return Export(stream, mimetype, filename, rows.total)
@@ -0,0 +1,420 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import copy
+import math
+import os
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .kline_store import validate_series
+from .kline_resampler import KLINE_RESAMPLER, KlineResampler
+
+# ========== INDICATOR REGISTRY ==========
+
+# Indicator type -> class implementing it (see register_indicator)
+INDICATOR_TYPES: Dict[str, type] = {}
+
+def register_indicator(type_name: str) -> Callable[[type], type]:
+    """Class decorator that makes an indicator type available to INDICATOR_DEFINITIONS"""
+    def decorator(cls: type) -> type:
+        INDICATOR_TYPES[type_name] = cls
+        return cls
+    return decorator
+
+# Declarative list of the indicators offered on the klines page.
+# New entries only need a registered 'type' and its parameters.
+INDICATOR_DEFINITIONS: List[Dict[str, Any]] = [
+    {'name': 'sma_20', 'type': 'sma', 'period': 20, 'label': 'SMA 20', 'panel': 'price'},
+    {'name': 'sma_50', 'type': 'sma', 'period': 50, 'label': 'SMA 50', 'panel': 'price'},
+    {'name': 'ema_12', 'type': 'ema', 'period': 12, 'label': 'EMA 12', 'panel': 'price'},
+    {'name': 'ema_26', 'type': 'ema', 'period': 26, 'label': 'EMA 26', 'panel': 'price'},
+    {'name': 'bb_20', 'type': 'bollinger', 'period': 20, 'stddev': 2.0, 'label': 'Bollinger 20/2', 'panel': 'price'},
+    {'name': 'vwap', 'type': 'vwap', 'label': 'VWAP (daily)', 'panel': 'price'},
+    {'name': 'rsi_14', 'type': 'rsi', 'period': 14, 'label': 'RSI 14', 'panel': 'oscillator'},
+    {'name': 'atr_14', 'type': 'atr', 'period': 14, 'label': 'ATR 14', 'panel': 'oscillator'},
+]
+
+def get_indicator_config() -> Dict[str, Any]:
+    """Gets indicator pipeline configuration from environment variables or defaults"""
+    return {
+        'pipeline_cache_size': int(os.getenv('KLINES_INDICATOR_CACHE_SIZE', '32')),
+    }
+
+# ========== VECTORIZED RECURRENCES ==========
+
+def _ema_block_size(alpha: float) -> int:
+    """Largest block whose decay powers stay well inside float64 range"""
+    return max(1, int(345.0 / -math.log(1.0 - alpha)))  # decay ** -block <= 1e150
+
+def ema_filter(values: np.ndarray, alpha: float, carry: float) -> np.ndarray:
+    """
+    y[i] = alpha * x[i] + (1 - alpha) * y[i - 1], with y[-1] = carry.
+    Solved in closed form per block with scaled cumulative sums, so the Python
+    loop runs once per block instead of once per candle.
+    """
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return np.array(values, dtype=np.float64)
+
+    out = np.empty(len(values), dtype=np.float64)
+    block = _ema_block_size(alpha)
+
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        steps = np.arange(1, len(chunk) + 1, dtype=np.float64)
+        powers = decay ** steps                          # decay^(k+1)
+        scaled = np.cumsum(chunk / powers)               # sum x_i * decay^-(i+1)
+        out[start:start + len(chunk)] = powers * (carry + alpha * scaled)
+        carry = out[start + len(chunk) - 1]
+
+    return out
+
+def _seeded_ema(values: np.ndarray, alpha: float, period: int, state: Dict[str, Any]) -> np.ndarray:
+    """
+    EMA seeded with the SMA of the first `period` values (TA-Lib/Wilder convention).
+    state carries 'seed_sum', 'seen' and 'value' between calls.
+    """
+    out = np.full(len(values), np.nan)
+    if state['value'] is None:
+        needed = period - state['seen']
+        head = values[:needed]
+        state['seed_sum'] += float(np.sum(head))
+        state['seen'] += len(head)
+        if state['seen'] < period:
+            return out
+        state['value'] = state['seed_sum'] / period
+        out[len(head) - 1] = state['value']
+        rest_start = len(head)
+    else:
+        rest_start = 0
+
+    rest = values[rest_start:]
+    if len(rest):
+        out[rest_start:] = ema_filter(rest, alpha, state['value'])
+        state['value'] = float(out[-1])
+    return out
+
+def _rolling_window(values: np.ndarray, period: int, state: Dict[str, Any]) -> Tuple[np.ndarray, int]:
+    """
+    Prepends the carried tail so rolling windows span call boundaries.
+    Returns the sliding windows (one per value that has a full window) and
+    the number of leading values that still lack one.
+    """
+    joined = np.concatenate((state['tail'], values))
+    state['tail'] = joined[-(period - 1):] if period > 1 else joined[:0]
+    if len(joined) < period:
+        return np.empty((0, period)), len(values)
+    windows = sliding_window_view(joined, period)[-len(values):] if len(values) else np.empty((0, period))
+    missing = max(0, len(values) - len(windows))
+    return windows, missing
+
+# ========== INDICATORS ==========
+
+class Indicator:
+    """
+    Base class. update() consumes new candles, mutates its small carried state
+    and returns one array per output for exactly those candles.
+    """
+
+    outputs: Tuple[str, ...] = ('value',)
+
+    def __init__(self, **params: Any):
+        self.params = params
+
+    def initial_state(self) -> Dict[str, Any]:
+        return {}
+
+    def update(self, state: Dict[str, Any], candles: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+
+@register_indicator('sma')
+class SMA(Indicator):
+    def initial_state(self):
+        return {'tail': np.empty(0)}
+
+    def update(self, state, candles):
+        period = self.params['period']
+        source = np.asarray(candles[self.params.get('source', 'close')], dtype=np.float64)
+        windows, missing = _rolling_window(source, period, state)
+        out = np.full(len(source), np.nan)
+        out[missing:] = windows.mean(axis=1)
+        return {'value': out}
+
+
+@register_indicator('ema')
+class EMA(Indicator):
+    def initial_state(self):
+        return {'seed_sum': 0.0, 'seen': 0, 'value': None}
+
+    def update(self, state, candles):
+        period = self.params['period']
+        source = np.asarray(candles[self.params.get('source', 'close')], dtype=np.float64)
+        return {'value': _seeded_ema(source, 2.0 / (period + 1), period, state)}
+
+
+@register_indicator('bollinger')
+class Bollinger(Indicator):
+    outputs = ('middle', 'upper', 'lower')
+
+    def initial_state(self):
+        return {'tail': np.empty(0)}
+
+    def update(self, state, candles):
+        period = self.params['period']
+        width = self.params.get('stddev', 2.0)
+        source = np.asarray(candles[self.params.get('source', 'close')], dtype=np.float64)
+        windows, missing = _rolling_window(source, period, state)
+
+        middle = np.full(len(source), np.nan)
+        deviation = np.full(len(source), np.nan)
+        middle[missing:] = windows.mean(axis=1)
+        deviation[missing:] = windows.std(axis=1)
+        return {'middle': middle, 'upper': middle + width * deviation, 'lower': middle - width * deviation}
+
+
+@register_indicator('rsi')
+class RSI(Indicator):
+    def initial_state(self):
+        return {
+            'prev_close': None,
+            'gain': {'seed_sum': 0.0, 'seen': 0, 'value': None},
+            'loss': {'seed_sum': 0.0, 'seen': 0, 'value': None},
+        }
+
+    def update(self, state, candles):
+        period = self.params['period']
+        close = np.asarray(candles['close'], dtype=np.float64)
+        out = np.full(len(close), np.nan)
+        if not len(close):
+            return {'value': out}
+
+        # The very first candle has no change; later calls use the carried close
+        if state['prev_close'] is None:
+            changes, offset = np.diff(close), 1
+        else:
+            changes, offset = np.diff(close, prepend=state['prev_close']), 0
+        state['prev_close'] = float(close[-1])
+
+        alpha = 1.0 / period  # Wilder smoothing
+        avg_gain = _seeded_ema(np.clip(changes, 0, None), alpha, period, state['gain'])
+        avg_loss = _seeded_ema(np.clip(-changes, 0, None), alpha, period, state['loss'])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        rsi = np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, rsi)
+        out[offset:] = rsi
+        return {'value': out}
+
+
+@register_indicator('atr')
+class ATR(Indicator):
+    def initial_state(self):
+        return {'prev_close': None, 'rma': {'seed_sum': 0.0, 'seen': 0, 'value': None}}
+
+    def update(self, state, candles):
+        period = self.params['period']
+        high = np.asarray(candles['high'], dtype=np.float64)
+        low = np.asarray(candles['low'], dtype=np.float64)
+        close = np.asarray(candles['close'], dtype=np.float64)
+        if not len(close):
+            return {'value': np.empty(0)}
+
+        prev_close = np.empty(len(close))
+        prev_close[0] = state['prev_close'] if state['prev_close'] is not None else np.nan
+        prev_close[1:] = close[:-1]
+        state['prev_close'] = float(close[-1])
+
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return {'value': _seeded_ema(true_range, 1.0 / period, period, state['rma'])}
+
+
+@register_indicator('vwap')
+class VWAP(Indicator):
+    """Session VWAP of the typical price, reset at every UTC day"""
+
+    def initial_state(self):
+        return {'day': None, 'pv': 0.0, 'volume': 0.0}
+
+    def update(self, state, candles):
+        session_ms = self.params.get('session_ms', 86_400_000)
+        open_time = np.asarray(candles['open_time'])
+        if not len(open_time):
+            return {'value': np.empty(0)}
+
+        typical = (np.asarray(candles['high']) + np.asarray(candles['low']) + np.asarray(candles['close'])) / 3.0
+        volume = np.asarray(candles['volume'], dtype=np.float64)
+        day = open_time // session_ms
+
+        # Cumulative sums restarted at every session boundary
+        starts = np.concatenate(([0], np.flatnonzero(day[1:] != day[:-1]) + 1))
+        lengths = np.diff(np.append(starts, len(day)))
+        cum_pv = np.cumsum(typical * volume)
+        cum_volume = np.cumsum(volume)
+        pv_before = np.repeat(np.concatenate(([0.0], cum_pv[starts[1:] - 1])), lengths)
+        volume_before = np.repeat(np.concatenate(([0.0], cum_volume[starts[1:] - 1])), lengths)
+        session_pv = cum_pv - pv_before
+        session_volume = cum_volume - volume_before
+
+        # Carry the running session from the previous call
+        if state['day'] == int(day[0]):
+            first = slice(0, lengths[0])
+            session_pv[first] += state['pv']
+            session_volume[first] += state['volume']
+
+        state['day'] = int(day[-1])
+        state['pv'] = float(session_pv[-1])
+        state['volume'] = float(session_volume[-1])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {'value': np.where(session_volume > 0, session_pv / session_volume, np.nan)}
+
+# ========== INCREMENTAL PIPELINE ==========
+
+def build_indicators(definitions: List[Dict[str, Any]]) -> Dict[str, Indicator]:
+    """Instantiates indicators from declarative definitions"""
+    indicators = {}
+    for definition in definitions:
+        params = {key: value for key, value in definition.items() if key not in ('name', 'type', 'label', 'panel')}
+        indicators[definition['name']] = INDICATOR_TYPES[definition['type']](**params)
+    return indicators
+
+
+class IndicatorPipeline:
+    """
+    Indicator outputs of one (symbol, interval) in growable buffers.
+
+    Closed candles are committed once into the carried state, so appending N
+    candles costs O(N). The last candle may still be forming: its values are
+    computed on a throwaway copy of the state and never committed.
+    """
+
+    def __init__(self, indicators: Dict[str, Indicator]):
+        self.indicators = indicators
+        self.states = {name: indicator.initial_state() for name, indicator in indicators.items()}
+        self.committed = 0
+        self.first_open_time: Optional[int] = None
+        self.buffers: Dict[str, np.ndarray] = {
+            f"{name}.{output}": np.empty(0)
+            for name, indicator in indicators.items() for output in indicator.outputs
+        }
+        self.last: Dict[str, float] = {}
+
+    def _reset(self) -> None:
+        self.__init__(self.indicators)
+
+    def _append(self, at: int, outputs: Dict[str, np.ndarray]) -> None:
+        for key, values in outputs.items():
+            buffer = self.buffers[key]
+            needed = at + len(values)
+            if needed > len(buffer):
+                grown = np.empty(max(needed, 2 * len(buffer), 64))
+                grown[:at] = buffer[:at]
+                self.buffers[key] = buffer = grown
+            buffer[at:needed] = values
+
+    @staticmethod
+    def _flatten(name: str, result: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return {f"{name}.{output}": values for output, values in result.items()}
+
+    def update(self, candles: Dict[str, np.ndarray]) -> int:
+        """Commits newly closed candles and recomputes the forming one; returns series length"""
+        length = len(candles['open_time'])
+        first = int(candles['open_time'][0]) if length else None
+        if self.committed and (length <= self.committed or first != self.first_open_time):
+            # Series shrank or was rewritten: start over
+            self._reset()
+        self.first_open_time = first
+
+        closed = max(length - 1, 0)
+        if closed > self.committed:
+            new = {column: values[self.committed:closed] for column, values in candles.items()}
+            for name, indicator in self.indicators.items():
+                self._append(self.committed, self._flatten(name, indicator.update(self.states[name], new)))
+            self.committed = closed
+
+        if length:
+            forming = {column: np.array(values[length - 1:length]) for column, values in candles.items()}
+            self.last = {}
+            for name, indicator in self.indicators.items():
+                scratch = copy.deepcopy(self.states[name])
+                for key, values in self._flatten(name, indicator.update(scratch, forming)).items():
+                    self.last[key] = float(values[0])
+        return length
+
+    def values(self, lo: int, hi: int, length: int) -> Dict[str, np.ndarray]:
+        """Gets outputs for candle rows [lo, hi) including the forming candle"""
+        result = {}
+        for key, buffer in self.buffers.items():
+            values = np.empty(hi - lo)
+            committed_hi = min(hi, self.committed)
+            if committed_hi > lo:
+                values[:committed_hi - lo] = buffer[lo:committed_hi]
+            if hi == length and hi > lo:
+                values[-1] = self.last.get(key, np.nan)
+            result[key] = values
+        return result
+
+
+class IndicatorService:
+    """Bounded LRU of IndicatorPipelines over the resampler"""
+
+    def __init__(self, resampler: KlineResampler, definitions: List[Dict[str, Any]], maxsize: int = 32):
+        self.resampler = resampler
+        self.definitions = {definition['name']: definition for definition in definitions}
+        self.maxsize = max(maxsize, 1)
+        self._pipelines: 'OrderedDict[Tuple[str, str], IndicatorPipeline]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pipeline(self, symbol: str, interval: str) -> IndicatorPipeline:
+        key = (symbol, interval)
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            pipeline = IndicatorPipeline(build_indicators(list(self.definitions.values())))
+            self._pipelines[key] = pipeline
+        self._pipelines.move_to_end(key)
+        while len(self._pipelines) > self.maxsize:
+            self._pipelines.popitem(last=False)
+        return pipeline
+
+    def query(self, symbol: str, interval: str, names: Optional[List[str]] = None,
+              start_time: Optional[int] = None, end_time: Optional[int] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """Gets candles plus indicator values for a time-range slice"""
+        unknown = [name for name in names or [] if name not in self.definitions]
+        if unknown:
+            raise ValueError(f"Unknown indicators: {', '.join(unknown)}")
+        selected = names if names is not None else list(self.definitions)
+
+        candles = self.resampler.columns(symbol, interval)
+        open_time = candles['open_time']
+        lo = int(np.searchsorted(open_time, start_time, side='left')) if start_time is not None else 0
+        hi = int(np.searchsorted(open_time, end_time, side='left')) if end_time is not None else len(open_time)
+        if limit is not None and hi - lo > limit:
+            if start_time is not None and end_time is None:
+                hi = lo + limit
+            else:
+                lo = hi - limit
+
+        with self._lock:
+            pipeline = self._pipeline(*validate_series(symbol, interval))
+            length = pipeline.update(candles)
+            values = pipeline.values(lo, hi, length)
+
+        return {
+            'candles': {column: series[lo:hi] for column, series in candles.items()},
+            'indicators': {key: series for key, series in values.items() if key.split('.')[0] in selected},
+        }
+
+def indicators_to_json(values: Dict[str, np.ndarray]) -> Dict[str, List[Optional[float]]]:
+    """Converts indicator arrays to lists with NaN (warm-up) as null"""
+    return {
+        key: [None if value != value else value for value in series.tolist()]
+        for key, series in values.items()
+    }
+
+# Shared per-process indicator service
+INDICATOR_SERVICE = IndicatorService(KLINE_RESAMPLER, INDICATOR_DEFINITIONS,
+                                     get_indicator_config()['pipeline_cache_size'])
@@ -0,0 +1,460 @@
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from .kline_store import validate_series
+from .kline_resampler import KLINE_RESAMPLER, KlineResampler
+from .sql_console import DATABASE, DatabaseEngine
+
+# ========== PATTERN SEARCH CONFIGURATION ==========
+
+# flat: exact scan; ivf: k-means inverted lists (exact until ivf_min_vectors); pgvector: HNSW index in Postgres
+PATTERN_BACKENDS: Tuple[str, ...] = ('flat', 'ivf', 'pgvector')
+
+def get_pattern_config() -> Dict[str, Any]:
+    """Gets kline pattern search configuration from environment variables or defaults"""
+    return {
+        'window': int(os.getenv('KLINES_PATTERN_WINDOW', '32')),        # returns per vector
+        'horizon': int(os.getenv('KLINES_PATTERN_HORIZON', '8')),       # candles of "what happened next"
+        # ivf trades recall for speed and only pays off on large series: opt-in
+        'backend': os.getenv('KLINES_PATTERN_BACKEND', 'flat'),
+        'max_k': int(os.getenv('KLINES_PATTERN_MAX_K', '50')),
+        'ivf_min_vectors': int(os.getenv('KLINES_PATTERN_IVF_MIN_VECTORS', '20000')),
+        'ivf_lists': int(os.getenv('KLINES_PATTERN_IVF_LISTS', '0')),   # 0: sqrt(vectors)
+        'ivf_probes': int(os.getenv('KLINES_PATTERN_IVF_PROBES', '8')),
+        'build_chunk_rows': int(os.getenv('KLINES_PATTERN_BUILD_CHUNK_ROWS', '65536')),
+        'pg_batch_rows': int(os.getenv('KLINES_PATTERN_PG_BATCH_ROWS', '5000')),
+        'pg_ef_search': int(os.getenv('KLINES_PATTERN_PG_EF_SEARCH', '100')),
+    }
+
+# ========== WINDOW VECTORS ==========
+
+def window_vectors(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    One vector per run of `window` consecutive log returns (window + 1 closes),
+    z-normalized and scaled to unit length: the dot product of two vectors is
+    the correlation of their return shapes, whatever the price level or
+    volatility. Row j covers candles j .. j + window.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) <= window:
+        return np.empty((0, window), dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.nan_to_num(np.diff(np.log(close)), nan=0.0, posinf=0.0, neginf=0.0)
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+    centered = windows - windows.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    # Flat windows (no price change) stay zero vectors and match nothing
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0).astype(np.float32)
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first"""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+def train_centroids(vectors: np.ndarray, lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of unit vectors; returns unit centroids"""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), lists * 64), replace=False)]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # A list that lost every member keeps its previous centroid
+        centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+    return centroids.astype(np.float32)
+
+# ========== IN-PROCESS INDEX ==========
+
+class PatternIndex:
+    """
+    Window vectors of one series in a growable float32 matrix, searched by
+    brute-force matrix-vector product, plus optional IVF lists: vectors are
+    clustered into ~sqrt(n) lists, each holding the ascending row numbers of
+    its members, and a query only gathers and scores the members of its
+    `probes` nearest lists. New vectors join their nearest list; the lists
+    are retrained when the index has doubled (automatically only with the
+    'ivf' backend, once there are ivf_min_vectors).
+    """
+
+    def __init__(self, window: int, config: Dict[str, Any]):
+        self.window = window
+        self.config = config
+        self.length = 0
+        self.vectors = np.empty((0, window), dtype=np.float32)
+        # (centroids, member rows of each list), replaced as a whole so searches see a consistent pair
+        self.ivf: Optional[Tuple[np.ndarray, List[np.ndarray]]] = None
+        self.trained_at = 0
+
+    @property
+    def nbytes(self) -> int:
+        lists = sum(members.nbytes for members in self.ivf[1]) if self.ivf is not None else 0
+        return self.vectors.nbytes + lists
+
+    def reset(self) -> None:
+        self.length = self.trained_at = 0
+        self.ivf = None
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        chunk = self.config['build_chunk_rows']
+        return np.concatenate([np.argmax(vectors[at:at + chunk] @ centroids.T, axis=1)
+                               for at in range(0, len(vectors), chunk)] or [np.empty(0, dtype=np.int64)]).astype(np.int32)
+
+    @staticmethod
+    def _group(assignments: np.ndarray, first_row: int, lists: int) -> List[np.ndarray]:
+        """Rows first_row.. grouped by list, ascending within each list"""
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(lists + 1))
+        return [(order[bounds[at]:bounds[at + 1]] + first_row).astype(np.int32) for at in range(lists)]
+
+    def add(self, vectors: np.ndarray) -> None:
+        """Appends vectors, doubling capacity when needed, and keeps the IVF lists current"""
+        needed = self.length + len(vectors)
+        if needed > len(self.vectors):
+            grown = np.empty((max(needed, 2 * len(self.vectors), 1024), self.window), dtype=np.float32)
+            grown[:self.length] = self.vectors[:self.length]
+            self.vectors = grown
+        self.vectors[self.length:needed] = vectors
+
+        if self.ivf is not None and len(vectors):
+            centroids, members = self.ivf
+            added = self._group(self._assign(vectors, centroids), self.length, len(centroids))
+            # Only the lists that gained rows are copied; searches keep reading the old ones meanwhile
+            self.ivf = (centroids, [np.concatenate((old, new)) if len(new) else old
+                                    for old, new in zip(members, added)])
+        self.length = needed
+
+        if (self.config['backend'] == 'ivf' and needed >= self.config['ivf_min_vectors']
+                and needed >= 2 * self.trained_at):
+            self.train()
+
+    def train(self) -> None:
+        """(Re)builds the IVF lists over every vector"""
+        vectors = self.vectors[:self.length]
+        lists = max(min(self.config['ivf_lists'] or int(np.sqrt(self.length)), self.length), 1)
+        centroids = train_centroids(vectors, lists)
+        self.ivf = (centroids, self._group(self._assign(vectors, centroids), 0, len(centroids)))
+        self.trained_at = self.length
+
+    def search(self, query: np.ndarray, k: int, limit: int, probes: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows among the first `limit` by dot product with the query.
+        probes=None uses the IVF lists when trained; probes=0 forces the exact scan.
+        Returns (rows, scores), best first.
+        """
+        vectors, ivf = self.vectors, self.ivf
+        limit = min(limit, self.length)
+        if limit <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        probes = self.config['ivf_probes'] if probes is None else probes
+        if ivf is None or probes <= 0 or probes >= len(ivf[0]):
+            scores = vectors[:limit] @ query
+            rows = _top_k(scores, k)
+            return rows, scores[rows]
+
+        centroids, members = ivf
+        # Only the probed lists are read; rows past `limit` are cut from each (rows are ascending)
+        candidates = np.concatenate([members[at][:np.searchsorted(members[at], limit)]
+                                     for at in _top_k(centroids @ query, probes)])
+        scores = vectors[candidates] @ query
+        top = _top_k(scores, k)
+        return candidates[top], scores[top]
+
+
+class SeriesPatterns:
+    """Pattern index of one (symbol, interval), fed with the windows of its closed candles"""
+
+    def __init__(self, window: int, config: Dict[str, Any]):
+        self.index = PatternIndex(window, config)
+        self.first_open_time: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def update(self, close: np.ndarray, open_time: np.ndarray) -> None:
+        """
+        Indexes the windows that end on a closed candle and are not indexed yet.
+        The last candle may still be forming, so its window waits for the next one.
+        """
+        window = self.index.window
+        rows = len(open_time) - 1 - window
+        first = int(open_time[0]) if len(open_time) else None
+        if first != self.first_open_time or rows < self.index.length:
+            # Series replaced or truncated: start over
+            self.index.reset()
+            self.first_open_time = first
+
+        chunk = self.index.config['build_chunk_rows']
+        for at in range(self.index.length, rows, chunk):
+            end = min(at + chunk, rows)
+            self.index.add(window_vectors(close[at:end + window], window))
+
+# ========== POSTGRES (PGVECTOR) BACKEND ==========
+
+def _vector_literal(vector: np.ndarray) -> str:
+    return '[' + ','.join(f'{value:.6g}' for value in vector.tolist()) + ']'
+
+
+class PgVectorPatterns:
+    """
+    The same window vectors in a Postgres table with the pgvector extension and
+    an HNSW index on inner product. Rows are keyed by the open_time of the
+    window's last candle, so syncing only inserts windows newer than the last one.
+    Schema and rows are written by `python patterns.py --sync-pgvector` only;
+    searches read whatever was synced last.
+    """
+
+    def __init__(self, database: DatabaseEngine, window: int, batch_rows: int, ef_search: int):
+        self.database = database
+        self.window = window
+        self.batch_rows = batch_rows
+        self.ef_search = ef_search
+        self.table = f'kline_patterns_{window}'
+        self._ready = False
+
+    def ensure_schema(self) -> None:
+        if self._ready:
+            return
+        with self.database.engine.begin() as connection:
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS vector'))
+            connection.execute(text(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                f'symbol TEXT NOT NULL, "interval" TEXT NOT NULL, end_time BIGINT NOT NULL, '
+                f'embedding vector({self.window}) NOT NULL, PRIMARY KEY (symbol, "interval", end_time))'
+            ))
+            connection.execute(text(
+                f'CREATE INDEX IF NOT EXISTS {self.table}_embedding ON {self.table} '
+                f'USING hnsw (embedding vector_ip_ops)'
+            ))
+        self._ready = True
+
+    def ready(self) -> bool:
+        """Whether the table exists, without creating anything"""
+        if not self._ready:
+            with self.database.engine.connect() as connection:
+                self._ready = bool(connection.execute(
+                    text('SELECT to_regclass(:table) IS NOT NULL'), {'table': self.table}).scalar())
+        return self._ready
+
+    def sync(self, symbol: str, interval: str, close: np.ndarray, open_time: np.ndarray) -> int:
+        """Inserts the windows of closed candles the table does not have yet; returns rows inserted"""
+        self.ensure_schema()
+        with self.database.engine.connect() as connection:
+            last = connection.execute(
+                text(f'SELECT max(end_time) FROM {self.table} WHERE symbol = :symbol AND "interval" = :interval'),
+                {'symbol': symbol, 'interval': interval},
+            ).scalar()
+
+        closed = len(open_time) - 1
+        start = 0 if last is None else max(int(np.searchsorted(open_time, last, side='right')) - self.window, 0)
+        inserted = 0
+        for at in range(start, closed - self.window, self.batch_rows):
+            end = min(at + self.batch_rows, closed - self.window)
+            vectors = window_vectors(close[at:end + self.window], self.window)
+            rows = [{'symbol': symbol, 'interval': interval, 'end_time': int(open_time[at + offset + self.window]),
+                     'embedding': _vector_literal(vector)} for offset, vector in enumerate(vectors)]
+            with self.database.engine.begin() as connection:
+                connection.execute(text(
+                    f'INSERT INTO {self.table} (symbol, "interval", end_time, embedding) '
+                    f'VALUES (:symbol, :interval, :end_time, CAST(:embedding AS vector)) ON CONFLICT DO NOTHING'
+                ), rows)
+            inserted += len(rows)
+        return inserted
+
+    def search(self, symbol: str, interval: str, query: np.ndarray, k: int, before: Optional[int]) -> List[Tuple[int, float]]:
+        """(end_time, score) of the top-k windows ending at or before `before`, best first"""
+        if not self.ready():
+            raise ValueError(f"La tabla {self.table} no existe: ejecuta `python patterns.py <symbols> <interval> --sync-pgvector`")
+        with self.database.engine.begin() as connection:
+            # Candidates the HNSW walk keeps; the WHERE filter applies to them, so it must exceed k
+            connection.execute(text(f'SET LOCAL hnsw.ef_search = {max(int(self.ef_search), 1)}'))
+            rows = connection.execute(text(
+                f'SELECT end_time, -(embedding <#> CAST(:query AS vector)) AS score FROM {self.table} '
+                f'WHERE symbol = :symbol AND "interval" = :interval AND (CAST(:before AS BIGINT) IS NULL OR end_time <= :before) '
+                f'ORDER BY embedding <#> CAST(:query AS vector) LIMIT :k'
+            ), {'query': _vector_literal(query), 'symbol': symbol, 'interval': interval, 'before': before, 'k': k}).fetchall()
+        return [(int(row[0]), float(row[1])) for row in rows]
+
+# ========== SEARCH SERVICE ==========
+
+class KlinePatternSearch:
+    """
+    "Find similar setups": the last `window` returns up to a chosen candle are
+    matched against every earlier window of the same series (and optionally of
+    other symbols) and the top-k are returned with what happened next.
+    In-process indexes are built on first use and extended as candles arrive.
+    """
+
+    def __init__(self, resampler: KlineResampler, config: Dict[str, Any], database: Optional[DatabaseEngine] = None):
+        self.resampler = resampler
+        self.config = config
+        self.window = config['window']
+        self.pgvector = (PgVectorPatterns(database, self.window, config['pg_batch_rows'], config['pg_ef_search'])
+                         if database else None)
+        self._series: Dict[Tuple[str, str], SeriesPatterns] = {}
+        self._lock = threading.Lock()
+
+    def _series_index(self, symbol: str, interval: str) -> Tuple[SeriesPatterns, Dict[str, np.ndarray]]:
+        """Gets the series columns and its index brought up to date with them"""
+        key = validate_series(symbol, interval)
+        columns = self.resampler.columns(*key)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = SeriesPatterns(self.window, self.config)
+        with series.lock:
+            series.update(columns['close'], columns['open_time'])
+        return series, columns
+
+    def _hit(self, symbol: str, columns: Dict[str, np.ndarray], row: int, score: float) -> Dict[str, Any]:
+        end = row + self.window
+        close, horizon = columns['close'], self.config['horizon']
+        ahead = float(close[end + horizon] / close[end] - 1) if end + horizon < len(close) and close[end] else None
+        return {
+            'symbol': symbol,
+            'start_time': int(columns['open_time'][row]),
+            'end_time': int(columns['open_time'][end]),
+            'score': round(float(score), 4),
+            'next_return': ahead,
+        }
+
+    def search(self, symbol: str, interval: str, end_time: Optional[int] = None, k: int = 10,
+               symbols: Optional[List[str]] = None, backend: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Top-k windows most similar to the one ending at the candle open at
+        end_time (default: the latest, even if still forming). Windows of the
+        same series that overlap the query are excluded. Raises ValueError.
+        """
+        backend = backend or self.config['backend']
+        if backend not in PATTERN_BACKENDS or (backend == 'pgvector' and self.pgvector is None):
+            raise ValueError(f"Unknown pattern backend '{backend}'")
+        k = max(1, min(k, self.config['max_k']))
+        symbol, interval = validate_series(symbol, interval)
+
+        if backend == 'pgvector':
+            series, columns = None, self.resampler.columns(symbol, interval)
+        else:
+            series, columns = self._series_index(symbol, interval)
+        open_time = columns['open_time']
+        end = len(open_time) - 1 if end_time is None else int(np.searchsorted(open_time, end_time, side='right')) - 1
+        if end < self.window:
+            raise ValueError(f'Se necesitan al menos {self.window + 1} velas para buscar patrones')
+        query = window_vectors(columns['close'][end - self.window:end + 1], self.window)[0]
+        if not query.any():
+            raise ValueError('La ventana seleccionada no tiene variación de precio')
+
+        started = time.perf_counter()
+        hits = []
+        others = [name.strip().upper() for name in symbols or []]
+        for other in [symbol] + [name for name in others if name and name != symbol]:
+            # Same series: only windows that end where the query window starts, or earlier
+            before = end - self.window if other == symbol else None
+            if backend == 'pgvector':
+                other, _ = validate_series(other, interval)
+                other_columns = columns if other == symbol else self.resampler.columns(other, interval)
+                # Read-only on the request path: windows newer than the last --sync-pgvector are not found
+                matches = self.pgvector.search(other, interval, query, k,
+                                               int(open_time[before]) if before is not None else None)
+                rows = np.searchsorted(other_columns['open_time'], [match[0] for match in matches]) - self.window
+                scored = zip(rows.tolist(), [match[1] for match in matches])
+            else:
+                other_series, other_columns = (series, columns) if other == symbol else self._series_index(other, interval)
+                limit = before - self.window + 1 if before is not None else other_series.index.length
+                rows, scores = other_series.index.search(query, k, limit, probes=0 if backend == 'flat' else None)
+                scored = zip(rows.tolist(), scores.tolist())
+            hits.extend(self._hit(other, other_columns, row, score) for row, score in scored)
+
+        hits = sorted(hits, key=lambda hit: -hit['score'])[:k]
+        outcomes = [hit['next_return'] for hit in hits if hit['next_return'] is not None]
+        return {
+            'symbol': symbol,
+            'interval': interval,
+            'window': self.window,
+            'horizon': self.config['horizon'],
+            'start_time': int(open_time[end - self.window]),
+            'end_time': int(open_time[end]),
+            'backend': backend,
+            'matches': hits,
+            'outcome': {
+                'mean_return': float(np.mean(outcomes)) if outcomes else None,
+                'positive_share': float(np.mean(np.asarray(outcomes) > 0)) if outcomes else None,
+            },
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def benchmark(self, symbol: str, interval: str, queries: int = 100, k: int = 10,
+                  probes: Tuple[int, ...] = (1, 4, 8, 16, 32), include_pgvector: bool = False) -> Dict[str, Any]:
+        """
+        Recall@k and latency of the approximate backends against the exact scan,
+        for random query windows of one series (queries exclude overlapping windows).
+        """
+        started = time.perf_counter()
+        series, columns = self._series_index(symbol, interval)
+        index = series.index
+        build_seconds = time.perf_counter() - started
+        if index.ivf is None and index.length:
+            # Trained on demand when the configured backend is not ivf
+            index.train()
+
+        rng = np.random.default_rng(0)
+        lowest = 2 * self.window + k
+        if index.length <= lowest:
+            raise ValueError('Serie demasiado corta para el benchmark')
+        rows = rng.choice(np.arange(lowest, index.length), size=min(queries, index.length - lowest), replace=False)
+
+        def measure(run) -> Dict[str, Any]:
+            latencies, recalls = [], []
+            for row in rows:
+                exact = set(index.search(index.vectors[row], k, row - self.window + 1, probes=0)[0].tolist())
+                started = time.perf_counter()
+                found = run(row)
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(exact & set(found)) / max(len(exact), 1))
+            return {
+                'recall': round(float(np.mean(recalls)), 4),
+                'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+                'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+            }
+
+        result = {
+            'vectors': index.length,
+            'lists': len(index.ivf[0]) if index.ivf is not None else 0,
+            'build_seconds': round(build_seconds, 3),
+            'index_bytes': index.nbytes,
+            'flat': measure(lambda row: index.search(index.vectors[row], k, row - self.window + 1, probes=0)[0].tolist()),
+        }
+        for probe in probes:
+            result[f'ivf_probes_{probe}'] = measure(
+                lambda row, probe=probe: index.search(index.vectors[row], k, row - self.window + 1, probes=probe)[0].tolist())
+
+        if include_pgvector and self.pgvector is not None:
+            symbol, interval = validate_series(symbol, interval)
+            self.pgvector.sync(symbol, interval, columns['close'], columns['open_time'])
+            open_time = columns['open_time']
+
+            def pg_rows(row: int) -> List[int]:
+                # Row j ends at candle j + window; keep windows ending where the query window starts
+                matches = self.pgvector.search(symbol, interval, index.vectors[row], k, int(open_time[row]))
+                return (np.searchsorted(open_time, [end_time for end_time, _ in matches]) - self.window).tolist()
+            result['pgvector'] = measure(pg_rows)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'series': len(self._series),
+                'vectors': sum(series.index.length for series in self._series.values()),
+                'bytes': sum(series.index.nbytes for series in self._series.values()),
+            }
+
+# Shared per-process search over the shared resampler
+KLINE_PATTERN_CONFIG = get_pattern_config()
+KLINE_PATTERNS = KlinePatternSearch(KLINE_RESAMPLER, KLINE_PATTERN_CONFIG, DATABASE)
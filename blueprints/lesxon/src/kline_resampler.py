@@ -0,0 +1,193 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+
+import numpy as np
+
+from .kline_store import KLINE_COLUMNS, KLINE_INTERVALS, KLINE_STORE, KlineStore, validate_series
+
+# ========== RESAMPLER CONFIGURATION ==========
+
+# Interval kept on disk; every other interval is derived from it
+BASE_INTERVAL = '1m'
+
+def get_resampler_config() -> Dict[str, Any]:
+    """Gets resampler configuration from environment variables or defaults"""
+    return {
+        'cache_bytes': int(os.getenv('KLINES_DERIVED_CACHE_BYTES', str(256 * 1024 * 1024))),
+    }
+
+# ========== VECTORIZED BUCKET REDUCTION ==========
+
+def resample_columns(columns: Dict[str, np.ndarray], interval_ms: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Reduces base candles into interval_ms buckets without Python per-candle loops.
+    Returns the derived columns and the base index where each derived candle starts.
+    """
+    open_time = np.asarray(columns['open_time'])
+    if not len(open_time):
+        return {column: np.empty(0, dtype=dtype) for column, dtype in KLINE_COLUMNS.items()}, np.empty(0, dtype=np.int64)
+
+    bucket = open_time - open_time % interval_ms
+    starts = np.concatenate(([0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1))
+    ends = np.append(starts[1:], len(open_time)) - 1
+
+    derived = {
+        'open_time': bucket[starts],
+        'open': np.asarray(columns['open'])[starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': np.asarray(columns['close'])[ends],
+        'volume': np.add.reduceat(columns['volume'], starts),
+        'trades': np.add.reduceat(columns['trades'], starts),
+    }
+    return derived, starts
+
+# ========== DERIVED SERIES CACHE ==========
+
+class DerivedSeries:
+    """
+    Derived candles of one (symbol, interval) in growable column buffers.
+    Tracks how much of the base series it has consumed so new base candles
+    only re-reduce the last (possibly still forming) bucket plus the new ones.
+    """
+
+    def __init__(self, interval_ms: int):
+        self.interval_ms = interval_ms
+        self.length = 0
+        self.base_consumed = 0
+        self.last_start = 0  # base index where the last derived candle starts
+        self.buffers = {column: np.empty(0, dtype=dtype) for column, dtype in KLINE_COLUMNS.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+    def _write(self, at: int, derived: Dict[str, np.ndarray]) -> None:
+        """Writes derived candles starting at row `at`, doubling capacity when needed"""
+        needed = at + len(derived['open_time'])
+        for column, buffer in self.buffers.items():
+            if needed > len(buffer):
+                grown = np.empty(max(needed, 2 * len(buffer), 64), dtype=buffer.dtype)
+                grown[:at] = buffer[:at]
+                self.buffers[column] = buffer = grown
+            buffer[at:needed] = derived[column]
+        self.length = needed
+
+    def update(self, base: Dict[str, np.ndarray]) -> None:
+        """Brings the derived series up to date with the base columns"""
+        base_length = len(base['open_time'])
+        if base_length == self.base_consumed:
+            return
+
+        if base_length < self.base_consumed:
+            # Base series was rewritten: start over
+            self.length = self.base_consumed = self.last_start = 0
+
+        # Re-reduce from the start of the last derived bucket, which may have grown
+        offset = self.last_start if self.length else 0
+        tail = {column: values[offset:base_length] for column, values in base.items()}
+        derived, starts = resample_columns(tail, self.interval_ms)
+
+        self._write(self.length - 1 if self.length else 0, derived)
+        self.last_start = offset + int(starts[-1])
+        self.base_consumed = base_length
+
+    def slice(self, start_time: Optional[int] = None, end_time: Optional[int] = None,
+              limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Gets a copied time-range slice (buffers are updated in place)"""
+        open_time = self.buffers['open_time'][:self.length]
+        lo = int(np.searchsorted(open_time, start_time, side='left')) if start_time is not None else 0
+        hi = int(np.searchsorted(open_time, end_time, side='left')) if end_time is not None else self.length
+
+        if limit is not None and hi - lo > limit:
+            if start_time is not None and end_time is None:
+                hi = lo + limit
+            else:
+                lo = hi - limit
+
+        return {column: buffer[lo:hi].copy() for column, buffer in self.buffers.items()}
+
+
+class KlineResampler:
+    """
+    Serves any interval from the base 1-minute series.
+    Derived series live in an LRU bounded by total bytes and are updated
+    incrementally when base candles are appended.
+    """
+
+    def __init__(self, store: KlineStore, max_bytes: int):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[Tuple[str, str], DerivedSeries]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _derived(self, symbol: str, interval: str, base: Dict[str, np.ndarray]) -> DerivedSeries:
+        key = (symbol, interval)
+        derived = self._cache.get(key)
+        if derived is None:
+            self.misses += 1
+            derived = DerivedSeries(KLINE_INTERVALS[interval])
+            self._cache[key] = derived
+        else:
+            self.hits += 1
+        self._cache.move_to_end(key)
+
+        derived.update(base)
+        self._evict(keep=key)
+        return derived
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        total = sum(derived.nbytes for derived in self._cache.values())
+        for key in list(self._cache):
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                total -= self._cache.pop(key).nbytes
+
+    def query(self, symbol: str, interval: str, start_time: Optional[int] = None,
+              end_time: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Gets a time-range slice of any interval, deriving it from the base series"""
+        symbol, interval = validate_series(symbol, interval)
+        base_series = self.store.series(symbol, BASE_INTERVAL)
+
+        if interval == BASE_INTERVAL or not len(base_series):
+            # Base interval, or only a separately stored series exists
+            return self.store.query(symbol, interval, start_time, end_time, limit)
+
+        base = base_series.columns()
+        with self._lock:
+            return self._derived(symbol, interval, base).slice(start_time, end_time, limit)
+
+    def columns(self, symbol: str, interval: str) -> Dict[str, np.ndarray]:
+        """
+        Gets the whole series as views. Only the last candle of a derived series
+        can still change (it is rewritten in place while its bucket is forming).
+        """
+        symbol, interval = validate_series(symbol, interval)
+        base_series = self.store.series(symbol, BASE_INTERVAL)
+
+        if interval == BASE_INTERVAL or not len(base_series):
+            return self.store.series(symbol, interval).columns()
+
+        base = base_series.columns()
+        with self._lock:
+            derived = self._derived(symbol, interval, base)
+            return {column: buffer[:derived.length] for column, buffer in derived.buffers.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and cache occupancy"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'series': len(self._cache),
+                'bytes': sum(derived.nbytes for derived in self._cache.values()),
+                'max_bytes': self.max_bytes,
+            }
+
+# Shared per-process resampler over the shared store
+KLINE_RESAMPLER = KlineResampler(KLINE_STORE, get_resampler_config()['cache_bytes'])
@@ -0,0 +1,211 @@
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import re
+import threading
+
+import numpy as np
+
+# ========== KLINE STORE CONFIGURATION ==========
+
+# Columns kept per (symbol, interval), one append-only binary file each
+KLINE_COLUMNS: Dict[str, np.dtype] = {
+    'open_time': np.dtype('<i8'),   # ms since epoch, strictly increasing
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+    'trades': np.dtype('<i8'),
+}
+
+# Interval name -> length in milliseconds
+KLINE_INTERVALS: Dict[str, int] = {
+    '1m': 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '1h': 60 * 60_000,
+    '4h': 4 * 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+}
+
+# Binance kline CSV layout: column index of each stored field
+BINANCE_CSV_COLUMNS: Dict[str, int] = {
+    'open_time': 0, 'open': 1, 'high': 2, 'low': 3, 'close': 4, 'volume': 5, 'trades': 8,
+}
+
+_SYMBOL_PATTERN = re.compile(r'^[A-Z0-9]{3,20}$')
+
+def get_kline_store_config() -> Dict[str, Any]:
+    """Gets kline store configuration from environment variables or defaults"""
+    return {
+        'data_dir': os.getenv('KLINES_DATA_DIR', os.path.join('data', 'klines')),
+        'max_query_rows': int(os.getenv('KLINES_MAX_QUERY_ROWS', '5000')),
+    }
+
+def validate_series(symbol: str, interval: str) -> Tuple[str, str]:
+    """Normalizes a (symbol, interval) pair, raising ValueError if it is not valid"""
+    symbol = (symbol or '').strip().upper()
+    if not _SYMBOL_PATTERN.match(symbol):
+        raise ValueError(f"Invalid symbol '{symbol}'")
+    if interval not in KLINE_INTERVALS:
+        raise ValueError(f"Invalid interval '{interval}'")
+    return symbol, interval
+
+# ========== COLUMNAR STORE ==========
+
+class KlineSeries:
+    """
+    OHLCV columns of one (symbol, interval) as append-only files opened with np.memmap.
+    Readers get zero-copy views; a new memmap is opened only when the files have grown.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._length = -1
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _stored_length(self) -> int:
+        """Rows fully written to every column (a torn append is ignored)"""
+        lengths = []
+        for column, dtype in KLINE_COLUMNS.items():
+            try:
+                lengths.append(os.path.getsize(self._path(column)) // dtype.itemsize)
+            except OSError:
+                return 0
+        return min(lengths)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Gets read-only memmapped views of every column"""
+        length = self._stored_length()
+        with self._lock:
+            if length != self._length:
+                self._columns = {
+                    column: (np.memmap(self._path(column), dtype=dtype, mode='r', shape=(length,))
+                             if length else np.empty(0, dtype=dtype))
+                    for column, dtype in KLINE_COLUMNS.items()
+                }
+                self._length = length
+            return self._columns
+
+    def __len__(self) -> int:
+        return len(self.columns()['open_time'])
+
+    def last_open_time(self) -> Optional[int]:
+        """Gets the open_time of the newest stored candle"""
+        open_time = self.columns()['open_time']
+        return int(open_time[-1]) if len(open_time) else None
+
+    def append(self, rows: Dict[str, Any]) -> int:
+        """
+        Appends candles given as a dict of equally sized column arrays.
+        Candles not newer than the last stored one are skipped; returns rows written.
+        """
+        arrays = {column: np.asarray(rows[column], dtype=dtype) for column, dtype in KLINE_COLUMNS.items()}
+        open_time = arrays['open_time']
+        if any(len(values) != len(open_time) for values in arrays.values()):
+            raise ValueError('All kline columns must have the same length')
+        if len(open_time) > 1 and np.any(np.diff(open_time) <= 0):
+            raise ValueError('open_time must be strictly increasing')
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            length = self._stored_length()
+            if length:
+                dtype = KLINE_COLUMNS['open_time']
+                last = np.fromfile(self._path('open_time'), dtype=dtype, count=1,
+                                   offset=(length - 1) * dtype.itemsize)[0]
+                start = int(np.searchsorted(open_time, last, side='right'))
+            else:
+                start = 0
+            if start >= len(open_time):
+                return 0
+
+            for column, dtype in KLINE_COLUMNS.items():
+                path = self._path(column)
+                # Drop a torn tail left by an interrupted append before writing
+                if os.path.exists(path) and os.path.getsize(path) != length * dtype.itemsize:
+                    os.truncate(path, length * dtype.itemsize)
+                with open(path, 'ab') as column_file:
+                    column_file.write(arrays[column][start:].tobytes())
+
+            return len(open_time) - start
+
+    def slice(self, start_time: Optional[int] = None, end_time: Optional[int] = None,
+              limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Gets the candles with start_time <= open_time < end_time as memmap views.
+        Bounds are found by binary search on the sorted open_time column. With a
+        limit, the newest candles are kept unless only start_time is given.
+        """
+        columns = self.columns()
+        open_time = columns['open_time']
+
+        lo = int(np.searchsorted(open_time, start_time, side='left')) if start_time is not None else 0
+        hi = int(np.searchsorted(open_time, end_time, side='left')) if end_time is not None else len(open_time)
+
+        if limit is not None and hi - lo > limit:
+            if start_time is not None and end_time is None:
+                hi = lo + limit
+            else:
+                lo = hi - limit
+
+        return {column: values[lo:hi] for column, values in columns.items()}
+
+
+class KlineStore:
+    """Directory of KlineSeries laid out as <data_dir>/<SYMBOL>/<interval>/<column>.bin"""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._series: Dict[Tuple[str, str], KlineSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, symbol: str, interval: str) -> KlineSeries:
+        """Gets the (cached) series handle of a symbol and interval"""
+        key = validate_series(symbol, interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = KlineSeries(os.path.join(self.data_dir, *key))
+                self._series[key] = series
+            return series
+
+    def symbols(self) -> List[str]:
+        """Lists the symbols with stored data"""
+        if not os.path.isdir(self.data_dir):
+            return []
+        return sorted(name for name in os.listdir(self.data_dir) if _SYMBOL_PATTERN.match(name))
+
+    def append(self, symbol: str, interval: str, rows: Dict[str, Any]) -> int:
+        """Appends candles to a series; returns rows written"""
+        return self.series(symbol, interval).append(rows)
+
+    def import_csv(self, symbol: str, interval: str, path: str) -> int:
+        """Appends a Binance kline CSV dump (header optional) without building Python lists"""
+        with open(path) as csv_file:
+            has_header = not csv_file.readline()[:1].isdigit()
+        table = np.loadtxt(path, delimiter=',', skiprows=1 if has_header else 0,
+                           usecols=tuple(BINANCE_CSV_COLUMNS.values()), ndmin=2)
+        rows = {column: table[:, index] for index, column in enumerate(BINANCE_CSV_COLUMNS)}
+        # Newer Binance dumps use microsecond timestamps
+        if len(rows['open_time']) and rows['open_time'][0] > 10 ** 14:
+            rows['open_time'] = rows['open_time'] // 1000
+        return self.append(symbol, interval, rows)
+
+    def query(self, symbol: str, interval: str, start_time: Optional[int] = None,
+              end_time: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Gets a time-range slice of a series as zero-copy column views"""
+        return self.series(symbol, interval).slice(start_time, end_time, limit)
+
+
+def slice_to_json(columns: Dict[str, np.ndarray]) -> Dict[str, List[Any]]:
+    """Converts only the selected slice to plain Python lists for JSON encoding"""
+    return {column: values.tolist() for column, values in columns.items()}
+
+# Shared per-process store
+KLINE_STORE_CONFIG = get_kline_store_config()
+KLINE_STORE = KlineStore(KLINE_STORE_CONFIG['data_dir'])
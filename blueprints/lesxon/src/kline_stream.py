@@ -0,0 +1,213 @@
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+from collections import deque
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+from src.data_api import call_blocking
+from .kline_store import KLINE_COLUMNS, KLINE_INTERVALS, validate_series
+from .kline_resampler import KLINE_RESAMPLER, KlineResampler
+
+logger = logging.getLogger('kline_stream')
+
+# ========== KLINE STREAM CONFIGURATION ==========
+
+def get_kline_stream_config() -> Dict[str, Any]:
+    """Gets live kline stream configuration from environment variables or defaults"""
+    return {
+        # How often each (symbol, interval) channel reads the store, whatever its number of viewers
+        'poll_interval': float(os.getenv('KLINES_STREAM_POLL_INTERVAL', '1')),
+        # Events per second sent to one client at most; updates in between are coalesced
+        'max_rate': float(os.getenv('KLINES_STREAM_MAX_RATE', '2')),
+        # Updates buffered per client before new ones are folded into the newest
+        'queue_size': int(os.getenv('KLINES_STREAM_QUEUE_SIZE', '8')),
+        # Closed candles one update may carry; past that the client is told to reload the slice
+        'max_closed': int(os.getenv('KLINES_STREAM_MAX_CLOSED', '500')),
+        'ping_interval': int(os.getenv('KLINES_STREAM_PING_INTERVAL', '15')),
+    }
+
+# ========== DELTAS ==========
+
+# An update as sent to the browser: {'c': [closed candle rows], 'f': forming candle row or None},
+# or {'r': 1} when the client has fallen too far behind and must reload. Rows follow KLINE_COLUMNS order.
+RESYNC: Dict[str, Any] = {'r': 1}
+
+class KlineDelta(NamedTuple):
+    """What changed in a series after a given closed candle"""
+    closed: List[List[Any]]
+    forming: Optional[List[Any]]
+    last_closed: Optional[int]
+    overflow: bool = False
+
+
+def _rows(columns: Dict[str, np.ndarray], lo: int, hi: int) -> List[List[Any]]:
+    return [list(row) for row in zip(*(columns[column][lo:hi].tolist() for column in KLINE_COLUMNS))]
+
+def read_delta(resampler: KlineResampler, symbol: str, interval: str, after: Optional[int],
+               now_ms: int, max_closed: int) -> KlineDelta:
+    """
+    Reads the candles closed after open_time `after` (none if None) and the
+    candle still forming at now_ms: the last one, while its interval has not
+    elapsed. Only the rows that changed are copied out of the series.
+    """
+    columns = resampler.columns(symbol, interval)
+    open_time = columns['open_time']
+    length = len(open_time)
+    forming_at = length - 1 if length and int(open_time[-1]) + KLINE_INTERVALS[interval] > now_ms else length
+    last_closed = int(open_time[forming_at - 1]) if forming_at else None
+    forming = _rows(columns, forming_at, length)[0] if forming_at < length else None
+
+    if after is None:
+        return KlineDelta([], forming, last_closed)
+    lo = int(np.searchsorted(open_time[:forming_at], after, side='right'))
+    if forming_at - lo > max_closed:
+        return KlineDelta([], forming, last_closed, overflow=True)
+    return KlineDelta(_rows(columns, lo, forming_at), forming, last_closed)
+
+def merge_updates(older: Dict[str, Any], newer: Dict[str, Any], max_closed: int) -> Dict[str, Any]:
+    """Folds two consecutive updates into one: closed candles add up, the newer forming candle wins"""
+    if older.get('r') or newer.get('r'):
+        return RESYNC
+    closed = older['c'] + newer['c']
+    if len(closed) > max_closed:
+        return RESYNC
+    return {'c': closed, 'f': newer['f']}
+
+# ========== SUBSCRIBERS ==========
+
+class KlineSubscriber:
+    """
+    One open stream. Updates wait in a bounded queue; when it is full the new
+    update is merged into the newest queued one, so a slow client skips the
+    intermediate forming candles but never loses a closed one.
+    """
+
+    def __init__(self, key: Tuple[str, str], queue_size: int, max_closed: int):
+        self.key = key
+        self.queue_size = max(queue_size, 1)
+        self.max_closed = max_closed
+        self.dropped = 0
+        self._updates: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, update: Dict[str, Any]) -> None:
+        if len(self._updates) >= self.queue_size:
+            self._updates[-1] = merge_updates(self._updates[-1], update, self.max_closed)
+            self.dropped += 1
+        else:
+            self._updates.append(update)
+        self._ready.set()
+
+    async def next(self) -> Dict[str, Any]:
+        """Waits for updates and returns everything queued as one coalesced update"""
+        while not self._updates:
+            self._ready.clear()
+            await self._ready.wait()
+        update = self._updates.popleft()
+        while self._updates:
+            update = merge_updates(update, self._updates.popleft(), self.max_closed)
+        return update
+
+
+class KlineChannel:
+    """Viewers of one (symbol, interval) and the state last broadcast to them"""
+
+    def __init__(self, key: Tuple[str, str]):
+        self.key = key
+        self.subscribers: Set[KlineSubscriber] = set()
+        self.last_closed: Optional[int] = None
+        self.forming: Optional[List[Any]] = None
+        self.started = False
+        self.task: Optional[asyncio.Task] = None
+
+    def advance(self, delta: KlineDelta) -> Optional[Dict[str, Any]]:
+        """Moves the channel to a freshly read delta; returns the update to broadcast, if anything changed"""
+        update = None
+        if delta.overflow:
+            update = RESYNC
+        elif delta.closed or (self.started and delta.forming != self.forming):
+            update = {'c': delta.closed, 'f': delta.forming}
+        self.started = True
+        self.last_closed = delta.last_closed
+        self.forming = delta.forming
+        return update
+
+# ========== FAN-OUT HUB ==========
+
+class KlineHub:
+    """
+    Per-process fan-out of live klines. Each (symbol, interval) with at least
+    one viewer has a single task reading the store every poll_interval and
+    pushing the delta to every subscriber; the task stops with its last viewer.
+    """
+
+    def __init__(self, resampler: KlineResampler, config: Dict[str, Any]):
+        self.resampler = resampler
+        self.config = config
+        self._channels: Dict[Tuple[str, str], KlineChannel] = {}
+
+    def _read(self, key: Tuple[str, str], after: Optional[int]) -> Any:
+        return call_blocking(read_delta, self.resampler, key[0], key[1], after,
+                             int(time.time() * 1000), self.config['max_closed'])
+
+    async def subscribe(self, symbol: str, interval: str, since: Optional[int] = None) -> KlineSubscriber:
+        """
+        Joins the channel of a series. The first update catches the client up
+        from open_time `since` (inclusive, usually its last loaded candle).
+        """
+        key = validate_series(symbol, interval)
+        subscriber = KlineSubscriber(key, self.config['queue_size'], self.config['max_closed'])
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = KlineChannel(key)
+            channel.task = asyncio.get_running_loop().create_task(self._run(channel))
+        # Joined before the catch-up read, so no broadcast can fall between the two
+        channel.subscribers.add(subscriber)
+        try:
+            delta = await self._read(key, since - 1 if since is not None else None)
+        except BaseException:
+            # Failed or cancelled (client gone): the caller never gets the subscriber to unsubscribe
+            self.unsubscribe(subscriber)
+            raise
+        subscriber.offer(RESYNC if delta.overflow else {'c': delta.closed, 'f': delta.forming})
+        return subscriber
+
+    def unsubscribe(self, subscriber: KlineSubscriber) -> None:
+        channel = self._channels.get(subscriber.key)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            del self._channels[subscriber.key]
+            channel.task.cancel()
+
+    async def _run(self, channel: KlineChannel) -> None:
+        while True:
+            try:
+                update = channel.advance(await self._read(channel.key, channel.last_closed))
+            except (OSError, ValueError):
+                # e.g. a series still being written for the first time: try again next tick
+                update = None
+            except Exception:
+                # Anything else must not end the task, or its viewers would wait forever
+                logger.exception("Kline stream %s/%s: reading the store failed", *channel.key)
+                update = None
+            if update is not None:
+                for subscriber in list(channel.subscribers):
+                    subscriber.offer(update)
+            await asyncio.sleep(self.config['poll_interval'])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'channels': len(self._channels),
+            'subscribers': sum(len(channel.subscribers) for channel in self._channels.values()),
+            'dropped': sum(subscriber.dropped for channel in self._channels.values()
+                           for subscriber in channel.subscribers),
+        }
+
+# Shared per-process hub (one per ASGI worker)
+KLINE_STREAM_CONFIG = get_kline_stream_config()
+KLINE_HUB = KlineHub(KLINE_RESAMPLER, KLINE_STREAM_CONFIG)
@@ -0,0 +1,216 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from collections import OrderedDict
+import os
+import re
+import threading
+import time
+
+# ========== QUERY CACHE CONFIGURATION ==========
+
+def get_query_cache_config() -> Dict[str, Any]:
+    """Gets SQL console result cache configuration from environment variables or defaults"""
+    return {
+        'max_bytes': int(os.getenv('SQL_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        'max_entry_bytes': int(os.getenv('SQL_CACHE_MAX_ENTRY_BYTES', str(8 * 1024 * 1024))),
+        'ttl': float(os.getenv('SQL_CACHE_TTL', '300')),
+        # Per-table version files shared by every worker process
+        'version_dir': os.getenv('SQL_CACHE_VERSION_DIR', os.path.join('instance', 'sql_cache_versions')),
+    }
+
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_IDENTIFIER = r'((?:"(?:[^"]|"")+"|[a-z_][\w$]*)(?:\.(?:"(?:[^"]|"")+"|[a-z_][\w$]*))?)'
+_TABLE_LIST = re.compile(r'\b(from|join)\s+(?:only\s+)?')
+_TABLE = re.compile(_IDENTIFIER + r'\s*')
+_LIST_SEPARATOR = re.compile(r',\s*(?:only\s+)?')
+# Words that end a FROM item rather than alias it
+_NOT_ALIAS = ('where|join|inner|left|right|full|cross|natural|on|using|group|order|limit|offset|union|'
+              'intersect|except|having|window|fetch|for|lateral|returning|tablesample|as')
+_ALIAS = re.compile(r'(?:as\s+)?(?!(?:' + _NOT_ALIAS + r')\b)(?:"(?:[^"]|"")+"|[a-z_][\w$]*)\s*')
+_WRITE_TABLE = re.compile(
+    r'^(?:insert\s+into|update(?:\s+only)?|delete\s+from(?:\s+only)?|truncate(?:\s+table)?(?:\s+only)?|'
+    r'merge\s+into|alter\s+table(?:\s+if\s+exists)?(?:\s+only)?|drop\s+table(?:\s+if\s+exists)?|'
+    r'create\s+(?:unlogged\s+|temp\s+|temporary\s+)?table(?:\s+if\s+not\s+exists)?|copy)\s+' + _IDENTIFIER
+)
+# Every table version snapshot includes this one; bumping it drops every entry
+_ALL_TABLES = '*'
+
+# ========== SQL ANALYSIS ==========
+
+def normalize_sql(sql: str) -> str:
+    """Canonical text of a statement: no comments, single spaces, lower case outside quoted text"""
+    parts = _QUOTED.split(_COMMENT.sub(' ', sql or ''))
+    normalized = ''.join(part if index % 2 else re.sub(r'\s+', ' ', part.lower())
+                         for index, part in enumerate(parts))
+    return normalized.strip().rstrip(';').strip()
+
+def _table_name(identifier: str) -> str:
+    """Unqualified, unquoted, lower-case table name (schema-qualified names share their table's entry)"""
+    return identifier.rsplit('.', 1)[-1].strip('"').lower()
+
+def read_tables(normalized: str) -> Optional[Set[str]]:
+    """
+    Tables a normalized statement reads: every item of each FROM list and
+    each JOIN target. None when that cannot be told for sure (a derived
+    table, LATERAL, a function in FROM, anything else that is not a plain
+    table name), in which case the result must not be cached.
+    """
+    text = _STRING.sub("''", normalized)
+    tables: Set[str] = set()
+    for match in _TABLE_LIST.finditer(text):
+        position = match.end()
+        while True:
+            table = _TABLE.match(text, position)
+            if table is None or text.startswith('(', table.end()) or table.group(1) == 'lateral':
+                return None
+            tables.add(_table_name(table.group(1)))
+            position = table.end()
+            alias = _ALIAS.match(text, position)
+            if alias is not None:
+                position = alias.end()
+            # FROM a, b: keep reading the list (a JOIN names a single table)
+            separator = _LIST_SEPARATOR.match(text, position) if match.group(1) == 'from' else None
+            if separator is not None:
+                position = separator.end()
+                continue
+            break
+    return tables
+
+def written_table(normalized: str) -> Optional[str]:
+    """Table a normalized write statement targets, or None if it cannot be told"""
+    match = _WRITE_TABLE.match(normalized)
+    return _table_name(match.group(1)) if match else None
+
+# ========== RESULT CACHE ==========
+
+class CachedResult:
+    """One encoded response body with the table versions it was computed against"""
+
+    __slots__ = ('body', 'versions', 'expires')
+
+    def __init__(self, body: bytes, versions: Dict[str, int], expires: float):
+        self.body = body
+        self.versions = versions
+        self.expires = expires
+
+
+class QueryCache:
+    """
+    LRU of encoded SQL console results, bounded by total bytes and a TTL.
+    Keys are (normalized SQL, parameters, limit, output format). Each entry
+    remembers the version of every table it reads; a write bumps the
+    version file of its table so every worker drops the stale entries.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl: float, version_dir: str):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        self.version_dir = version_dir
+        self._entries: 'OrderedDict[Tuple[Any, ...], CachedResult]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key(normalized: str, params: Optional[Dict[str, Any]], limit: int, output_format: str) -> Tuple[Any, ...]:
+        return (normalized, tuple(sorted((params or {}).items())), limit, output_format)
+
+    def _version_path(self, table: str) -> str:
+        return os.path.join(self.version_dir, re.sub(r'[^\w.$-]', '_', table) if table != _ALL_TABLES else '_all')
+
+    def versions(self, tables: Iterable[str]) -> Dict[str, int]:
+        """Current version of each table (the mtime of its version file, 0 if never written)"""
+        versions = {}
+        for table in list(tables) + [_ALL_TABLES]:
+            try:
+                versions[table] = os.stat(self._version_path(table)).st_mtime_ns
+            except OSError:
+                versions[table] = 0
+        return versions
+
+    def _drop(self, key: Tuple[Any, ...]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[bytes]:
+        """Gets a fresh cached body, counting the hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > time.monotonic():
+                tables = [table for table in entry.versions if table != _ALL_TABLES]
+                if self.versions(tables) == entry.versions:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['bytes_saved'] += len(entry.body)
+                    return entry.body
+            if entry is not None:
+                self._drop(key)
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key: Tuple[Any, ...], body: bytes, versions: Dict[str, int]) -> None:
+        """Stores a body computed against `versions`, evicting least recently used entries"""
+        if len(body) > self.max_entry_bytes or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = CachedResult(body, versions, time.monotonic() + self.ttl)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def tee(self, key: Tuple[Any, ...], versions: Dict[str, int], stream: Iterator[bytes]) -> Iterator[bytes]:
+        """
+        Passes a response stream through and caches the body once it completes.
+        Bodies past max_entry_bytes stop being buffered; an interrupted stream
+        is never cached.
+        """
+        chunks: Optional[List[bytes]] = []
+        size = 0
+        for chunk in stream:
+            if chunks is not None:
+                size += len(chunk)
+                if size > self.max_entry_bytes:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        if chunks is not None:
+            self.put(key, b''.join(chunks), versions)
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """
+        Drops the entries that read `table` (every entry if None) in this
+        process and, through the version file, in every other worker.
+        """
+        name = table or _ALL_TABLES
+        os.makedirs(self.version_dir, exist_ok=True)
+        path = self._version_path(name)
+        with open(path, 'a'):
+            pass
+        os.utime(path, ns=(time.time_ns(), time.time_ns()))
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if table is None or table in entry.versions]
+            for key in stale:
+                self._drop(key)
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+            }
+
+# Shared per-process cache
+QUERY_CACHE_CONFIG = get_query_cache_config()
+QUERY_CACHE = QueryCache(QUERY_CACHE_CONFIG['max_bytes'], QUERY_CACHE_CONFIG['max_entry_bytes'],
+                         QUERY_CACHE_CONFIG['ttl'], QUERY_CACHE_CONFIG['version_dir'])
@@ -0,0 +1,281 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+from datetime import date, datetime, time
+from decimal import Decimal
+import json
+import os
+import re
+import threading
+import uuid
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+from .export_streams import csv_stream, json_stream
+from .query_cache import QUERY_CACHE, QueryCache, normalize_sql, read_tables, written_table
+
+# ========== SQL CONSOLE CONFIGURATION ==========
+
+def get_sql_console_config() -> Dict[str, Any]:
+    """Gets database and SQL console configuration from environment variables or defaults"""
+    return {
+        # Any SQLAlchemy URL: the Supabase Postgres in production, a local SQLite file otherwise
+        'database_url': (os.getenv('SUPABASE_DB_URL') or os.getenv('DATABASE_URL')
+                         or 'sqlite:///' + os.path.join('instance', 'console.sqlite3')),
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '5')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'batch_rows': int(os.getenv('SQL_CONSOLE_BATCH_ROWS', '500')),
+        'max_rows': int(os.getenv('SQL_CONSOLE_MAX_ROWS', '1000')),
+        'statement_timeout_ms': int(os.getenv('SQL_CONSOLE_STATEMENT_TIMEOUT_MS', '30000')),
+    }
+
+# Output formats of the console -> response mimetype
+SQL_OUTPUT_FORMATS: Dict[str, str] = {
+    'table': 'application/json',
+    'json': 'application/json',
+    'csv': 'text/csv',
+}
+
+# Statements whose rows can be wrapped in SELECT ... LIMIT
+_ROW_QUERY = re.compile(r'^\s*(select|with|values|table)\b', re.IGNORECASE)
+_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+# Statements that never change table contents, so they keep the result cache
+_NO_DATA_CHANGE = re.compile(r'^\s*(show|pragma|describe|set|analyze|vacuum)\b', re.IGNORECASE)
+
+# ========== ENGINE ==========
+
+class DatabaseEngine:
+    """
+    One SQLAlchemy engine per process with a size-bounded QueuePool, pre-ping
+    and recycling. The engine is created on first use and again after a fork,
+    so prefork workers never share pooled connections with the master.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self._engine: Optional[Engine] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _create(self) -> Engine:
+        url = self.config['database_url']
+        options: Dict[str, Any] = {'pool_pre_ping': True, 'pool_recycle': self.config['pool_recycle']}
+        if url.startswith('sqlite'):
+            path = url.split(':///', 1)[-1]
+            if path and path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            options['connect_args'] = {'check_same_thread': False}
+        else:
+            options.update(pool_size=self.config['pool_size'], max_overflow=self.config['max_overflow'],
+                           pool_timeout=self.config['pool_timeout'])
+        return create_engine(url, **options)
+
+    @property
+    def engine(self) -> Engine:
+        pid = os.getpid()
+        with self._lock:
+            if self._engine is None or self._pid != pid:
+                if self._engine is not None:
+                    # Inherited from the parent: drop its pool without closing the parent's sockets
+                    self._engine.dispose(close=False)
+                self._engine = self._create()
+                self._pid = pid
+            return self._engine
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    def status(self) -> Dict[str, Any]:
+        """Round trip to the database plus the pool state"""
+        with self.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        return {'dialect': self.dialect, 'pool': self.engine.pool.status()}
+
+# ========== QUERIES ==========
+
+def split_statement(sql: str) -> str:
+    """Normalizes a single statement, raising ValueError if there is none or more than one"""
+    statement = _COMMENT.sub(' ', sql or '').strip().rstrip(';').strip()
+    if not statement:
+        raise ValueError('Por favor, ingresa una consulta SQL')
+    if ';' in _QUOTED.sub('', statement):
+        raise ValueError('Solo se admite una sentencia por consulta')
+    return statement
+
+def is_row_query(statement: str) -> bool:
+    """Whether the statement is a query whose rows can be limited in the database"""
+    return bool(_ROW_QUERY.match(statement))
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+class QueryResult(NamedTuple):
+    """An executed statement: column names and its rows in batches (rowcount for writes)"""
+    header: List[str]
+    batches: Iterator[List[Sequence[Any]]]
+    rowcount: Optional[int] = None
+
+
+class ConsoleOutput(NamedTuple):
+    """What the console answers: the encoded body stream of a query, or the rowcount of a write"""
+    stream: Iterator[bytes]
+    rowcount: Optional[int] = None
+    cached: bool = False
+
+
+class SqlConsole:
+    """
+    Runs console statements on the pooled engine. Row queries are wrapped as
+    SELECT * FROM (...) LIMIT n so the database stops at the limit, and are
+    read through a server-side (named) cursor in batches of batch_rows.
+    Other statements run in their own transaction, report the rowcount and
+    invalidate the cached results of the table they write.
+    """
+
+    def __init__(self, database: DatabaseEngine, config: Dict[str, Any], cache: Optional[QueryCache] = None):
+        self.database = database
+        self.config = config
+        self.cache = cache
+
+    def _prepare(self, connection: Connection, read_only: bool) -> None:
+        if self.database.dialect == 'postgresql':
+            if read_only:
+                # Also rejects writes hidden in a query (data-modifying CTEs, SELECT INTO)
+                connection.execute(text('SET TRANSACTION READ ONLY'))
+            connection.execute(text(f"SET LOCAL statement_timeout = {int(self.config['statement_timeout_ms'])}"))
+
+    @staticmethod
+    def _run(connection: Connection, statement: str, params: Optional[Dict[str, Any]]) -> Any:
+        """
+        Sends the statement to the driver as written: ':name' inside string
+        literals or '::' casts is not a bind parameter. `params`, if any, use
+        the driver's own paramstyle.
+        """
+        if params:
+            return connection.exec_driver_sql(statement, params)
+        return connection.execution_options(no_parameters=True).exec_driver_sql(statement)
+
+    def execute(self, sql: str, limit: int, params: Optional[Dict[str, Any]] = None,
+                read_only: bool = False) -> QueryResult:
+        """
+        Executes one statement. Errors in the SQL surface here, before anything
+        is streamed; the connection goes back to the pool once the batches are
+        exhausted or closed. With read_only, only row queries are accepted.
+        """
+        statement = split_statement(sql)
+        if read_only and not is_row_query(statement):
+            raise PermissionError('No tienes permisos para modificar la base de datos')
+        limit = max(1, min(limit, self.config['max_rows']))
+        connection = self.database.engine.connect()
+        try:
+            transaction = connection.begin()
+            self._prepare(connection, read_only)
+            if is_row_query(statement):
+                connection = connection.execution_options(stream_results=True, yield_per=self.config['batch_rows'])
+                # limit is an int clamped above, so it can be inlined
+                result = self._run(connection, f"SELECT * FROM ({statement}) AS console_query LIMIT {limit}", params)
+            else:
+                result = self._run(connection, statement, params)
+                if not result.returns_rows:
+                    rowcount = result.rowcount
+                    transaction.commit()
+                    connection.close()
+                    self.invalidate(statement)
+                    return QueryResult([], iter(()), rowcount)
+        except Exception:
+            connection.close()
+            raise
+
+        def batches() -> Iterator[List[Sequence[Any]]]:
+            try:
+                served = 0
+                for partition in result.partitions(self.config['batch_rows']):
+                    # Only statements like EXPLAIN or RETURNING get here unlimited
+                    partition = partition[:limit - served]
+                    served += len(partition)
+                    yield [tuple(row) for row in partition]
+                    if served >= limit:
+                        break
+                result.close()
+                transaction.commit()
+                if not is_row_query(statement):
+                    # e.g. INSERT ... RETURNING: its rows are visible once committed
+                    self.invalidate(statement)
+            finally:
+                connection.close()
+
+        return QueryResult(list(result.keys()), batches())
+
+    def invalidate(self, statement: str) -> None:
+        """Drops cached results of the table a write targets (all of them if it cannot be told)"""
+        if self.cache is not None and not _NO_DATA_CHANGE.match(statement):
+            self.cache.invalidate(written_table(normalize_sql(statement)))
+
+    def run(self, sql: str, limit: int, output_format: str, params: Optional[Dict[str, Any]] = None,
+            read_only: bool = False) -> ConsoleOutput:
+        """
+        Answers a console request, from the result cache when a fresh entry
+        exists. Table versions are read before executing, so a write that
+        lands while the query runs keeps its result out of the cache.
+        read_only requests may only run row queries (PermissionError otherwise).
+        """
+        limit = max(1, min(limit, self.config['max_rows']))
+        normalized = normalize_sql(split_statement(sql))
+        if read_only and not is_row_query(normalized):
+            raise PermissionError('No tienes permisos para modificar la base de datos')
+        key = None
+        # Queries whose tables cannot all be told are never cached
+        tables = read_tables(normalized) if self.cache is not None and is_row_query(normalized) else None
+        if tables is not None:
+            key = self.cache.key(normalized, params, limit, output_format)
+            body = self.cache.get(key)
+            if body is not None:
+                return ConsoleOutput(iter((body,)), cached=True)
+            versions = self.cache.versions(tables)
+
+        result = self.execute(sql, limit, params, read_only)
+        if result.rowcount is not None:
+            return ConsoleOutput(iter(()), rowcount=result.rowcount)
+        stream = encode_result(result, output_format)
+        if key is not None:
+            stream = self.cache.tee(key, versions, stream)
+        return ConsoleOutput(stream)
+
+
+def table_stream(header: List[str], batches: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    """Encodes batches as {"columns": [...], "rows": [[...], ...]}, emitted incrementally"""
+    yield ('{"columns":' + json.dumps(header) + ',"rows":[').encode('utf-8')
+    separator = ''
+    for batch in batches:
+        if not batch:
+            continue
+        yield (separator + ','.join(json.dumps([_json_value(value) for value in row], separators=(',', ':'))
+                                    for row in batch)).encode('utf-8')
+        separator = ','
+    yield b']}'
+
+def encode_result(result: QueryResult, output_format: str) -> Iterator[bytes]:
+    """Streams a query result in one of SQL_OUTPUT_FORMATS"""
+    if output_format == 'csv':
+        return csv_stream(result.header, result.batches)
+    if output_format == 'json':
+        return json_stream(result.header, ([tuple(_json_value(value) for value in row) for row in batch]
+                                           for batch in result.batches))
+    return table_stream(result.header, result.batches)
+
+# Shared per-process engine and console
+SQL_CONSOLE_CONFIG = get_sql_console_config()
+DATABASE = DatabaseEngine(SQL_CONSOLE_CONFIG)
+SQL_CONSOLE = SqlConsole(DATABASE, SQL_CONSOLE_CONFIG, QUERY_CACHE)
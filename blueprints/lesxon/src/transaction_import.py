@@ -0,0 +1,266 @@
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import os
+
+import numpy as np
+
+from .transaction_store import TRANSACTION_STORE, TRANSACTION_TYPES, TransactionStore
+
+# ========== IMPORT CONFIGURATION ==========
+
+# Fields every imported row must provide
+IMPORT_FIELDS: Tuple[str, ...] = ('symbol', 'timestamp', 'type', 'amount', 'price')
+
+IMPORT_FORMATS: Tuple[str, ...] = ('csv', 'jsonl')
+
+def get_import_config() -> Dict[str, Any]:
+    """Gets bulk import configuration from environment variables or defaults"""
+    return {
+        'chunk_rows': int(os.getenv('TRANSACTIONS_IMPORT_CHUNK_ROWS', '50000')),
+        'batch_rows': int(os.getenv('TRANSACTIONS_IMPORT_BATCH_ROWS', '200000')),
+        'max_errors': int(os.getenv('TRANSACTIONS_IMPORT_MAX_ERRORS', '1000')),
+    }
+
+def detect_format(filename: str, requested: Optional[str] = None) -> str:
+    """Gets the import format from the request or the file extension, raising ValueError if unknown"""
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise ValueError(f"Formato no soportado: {requested}")
+        return requested
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    raise ValueError('Usa un archivo .csv o .jsonl')
+
+# ========== STREAMING PARSERS ==========
+
+def iter_csv_chunks(stream: IO[bytes], chunk_rows: int) -> Iterator[Tuple[int, Dict[str, List[Any]], List[Dict[str, Any]]]]:
+    """
+    Reads a CSV with a header row in chunks of chunk_rows. Yields
+    (first line number, columns as lists of raw strings, rows that could not be read).
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [field for field in IMPORT_FIELDS if field not in header]
+    if missing:
+        raise ValueError(f"Faltan columnas: {', '.join(missing)}")
+    positions = [header.index(field) for field in IMPORT_FIELDS]
+
+    line = 2
+    while True:
+        columns: Dict[str, List[Any]] = {field: [] for field in IMPORT_FIELDS}
+        broken: List[Dict[str, Any]] = []
+        first = line
+        for record in reader:
+            if len(record) < len(header):
+                broken.append({'line': line, 'field': None, 'error': 'Fila incompleta'})
+                record = record + [''] * (len(header) - len(record))
+            for field, position in zip(IMPORT_FIELDS, positions):
+                columns[field].append(record[position])
+            line += 1
+            if line - first >= chunk_rows:
+                break
+        if line == first:
+            return
+        yield first, columns, broken
+
+def iter_jsonl_chunks(stream: IO[bytes], chunk_rows: int) -> Iterator[Tuple[int, Dict[str, List[Any]], List[Dict[str, Any]]]]:
+    """Reads JSON lines (one object per line) in chunks, like iter_csv_chunks"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    line = 1
+    while True:
+        columns: Dict[str, List[Any]] = {field: [] for field in IMPORT_FIELDS}
+        broken: List[Dict[str, Any]] = []
+        first = line
+        for raw in text:
+            try:
+                record = json.loads(raw) if raw.strip() else None
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                broken.append({'line': line, 'field': None, 'error': 'Línea JSON no válida'})
+                record = {}
+            for field in IMPORT_FIELDS:
+                value = record.get(field)
+                columns[field].append('' if value is None else str(value))
+            line += 1
+            if line - first >= chunk_rows:
+                break
+        if line == first:
+            return
+        yield first, columns, broken
+
+# ========== VECTORIZED VALIDATION ==========
+
+def _parse_floats(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Parses strings to float64; returns (numbers, valid mask). Invalid entries become NaN."""
+    try:
+        numbers = values.astype(np.float64)
+    except ValueError:
+        # Some entry is not a number: only then fall back to one conversion per value
+        numbers = np.array([_to_float(value) for value in values], dtype=np.float64)
+    return numbers, np.isfinite(numbers)
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+def _parse_timestamps(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses ms epochs or ISO dates/datetimes (UTC) to ms; returns (timestamps, valid mask).
+    Digits-only values are epochs; the rest go through numpy's datetime64 parser.
+    """
+    timestamps = np.zeros(len(values), dtype=np.int64)
+    valid = np.zeros(len(values), dtype=bool)
+
+    epochs = np.char.isdigit(values) & (np.char.str_len(values) <= 15)
+    timestamps[epochs] = values[epochs].astype(np.int64)
+    valid[epochs] = True
+
+    dates = np.flatnonzero(~epochs & (np.char.str_len(values) > 0))
+    if len(dates):
+        text = np.char.rstrip(np.char.replace(values[dates], ' ', 'T'), 'Z')
+        try:
+            timestamps[dates] = text.astype('datetime64[ms]').astype(np.int64)
+            valid[dates] = True
+        except ValueError:
+            for position, value in zip(dates, text):
+                try:
+                    timestamps[position] = np.datetime64(value, 'ms').astype(np.int64)
+                    valid[position] = True
+                except ValueError:
+                    pass
+    return timestamps, valid
+
+def validate_chunk(columns: Dict[str, List[Any]]) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray, List[Tuple[str, np.ndarray, str]]]:
+    """
+    Applies the filter form rules to a whole chunk with array masks.
+    Returns (symbols, rows, valid mask, failures) where failures lists
+    (field, mask of failing rows, message) for the error report.
+    """
+    symbols = np.char.upper(np.char.strip(np.asarray(columns['symbol'], dtype=str)))
+    types = np.char.lower(np.char.strip(np.asarray(columns['type'], dtype=str)))
+    timestamps, timestamp_ok = _parse_timestamps(np.char.strip(np.asarray(columns['timestamp'], dtype=str)))
+    amounts, amount_ok = _parse_floats(np.char.strip(np.asarray(columns['amount'], dtype=str)))
+    prices, price_ok = _parse_floats(np.char.strip(np.asarray(columns['price'], dtype=str)))
+
+    codes = np.full(len(types), 255, dtype=np.uint8)
+    for code, name in enumerate(TRANSACTION_TYPES):
+        codes[types == name] = code
+
+    symbol_length = np.char.str_len(symbols)
+    # Same shape as the store's partition names: 3-20 ASCII letters or digits
+    symbol_ascii = np.char.str_len(np.char.encode(symbols, 'ascii', 'ignore')) == symbol_length
+    failures = [
+        ('symbol', symbol_length < 3, 'El símbolo debe tener al menos 3 caracteres'),
+        ('symbol', (symbol_length >= 3) & ((symbol_length > 20) | ~np.char.isalnum(symbols) | ~symbol_ascii),
+         'Símbolo no válido'),
+        ('timestamp', ~timestamp_ok, 'Formato de fecha inválido'),
+        ('type', codes == 255, 'Tipo de transacción no válido'),
+        ('amount', ~amount_ok, 'Ingresa un monto válido'),
+        ('amount', amount_ok & (amounts < 0), 'El monto no puede ser negativo'),
+        ('price', ~price_ok, 'Ingresa un precio válido'),
+        ('price', price_ok & (prices < 0), 'El precio no puede ser negativo'),
+    ]
+    valid = np.ones(len(symbols), dtype=bool)
+    for _, mask, _ in failures:
+        valid &= ~mask
+
+    rows = {'timestamp': timestamps, 'type': codes, 'amount': amounts, 'price': prices}
+    return symbols, rows, valid, failures
+
+# ========== IMPORT ==========
+
+class TransactionImport:
+    """
+    One bulk import: validates an upload chunk by chunk and inserts the valid
+    rows into the store in batches of batch_rows. Only the first max_errors
+    failures are kept for the report; the counts cover every row.
+    """
+
+    def __init__(self, store: TransactionStore, batch_rows: int, max_errors: int):
+        self.store = store
+        self.batch_rows = batch_rows
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.truncated = False
+        self._pending: List[Tuple[np.ndarray, Dict[str, np.ndarray]]] = []
+        self._pending_rows = 0
+
+    def _report(self, error: Dict[str, Any]) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append(error)
+        else:
+            self.truncated = True
+
+    def add_chunk(self, first_line: int, columns: Dict[str, List[Any]], broken: List[Dict[str, Any]]) -> None:
+        """Validates a parsed chunk and queues its valid rows"""
+        symbols, rows, valid, failures = validate_chunk(columns)
+        for error in broken:
+            valid[error['line'] - first_line] = False
+            self._report(error)
+        for field, mask, message in failures:
+            failing = np.flatnonzero(mask)
+            if len(failing) > self.max_errors - len(self.errors):
+                self.truncated = True
+            for position in failing[:max(self.max_errors - len(self.errors), 0)]:
+                self._report({'line': first_line + int(position), 'field': field, 'error': message})
+        self.errors.sort(key=lambda error: error['line'])
+
+        accepted = int(np.count_nonzero(valid))
+        self.rows += len(valid)
+        self.rejected += len(valid) - accepted
+        if accepted:
+            self._pending.append((symbols[valid], {column: values[valid] for column, values in rows.items()}))
+            self._pending_rows += accepted
+        if self._pending_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Inserts the queued rows as one batch"""
+        if not self._pending:
+            return
+        symbols = np.concatenate([symbols for symbols, _ in self._pending])
+        rows = {column: np.concatenate([chunk[column] for _, chunk in self._pending])
+                for column in self._pending[0][1]}
+        self._pending, self._pending_rows = [], 0
+        self.store.insert(symbols, rows)
+        self.imported += len(symbols)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.truncated,
+        }
+
+def import_transactions(stream: IO[bytes], import_format: str, store: TransactionStore = TRANSACTION_STORE,
+                        config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Imports a CSV or JSON-lines stream of transactions; raises ValueError if the file is unreadable"""
+    config = config or TRANSACTION_IMPORT_CONFIG
+    chunks = iter_csv_chunks if import_format == 'csv' else iter_jsonl_chunks
+    job = TransactionImport(store, config['batch_rows'], config['max_errors'])
+    try:
+        for first_line, columns, broken in chunks(stream, config['chunk_rows']):
+            job.add_chunk(first_line, columns, broken)
+    except (UnicodeDecodeError, csv.Error) as e:
+        job.flush()
+        result = job.result()
+        result['error'] = f'Archivo no legible: {e}'
+        return result
+    job.flush()
+    return job.result()
+
+TRANSACTION_IMPORT_CONFIG = get_import_config()
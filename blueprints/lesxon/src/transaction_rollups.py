@@ -0,0 +1,255 @@
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from .transaction_store import TRANSACTION_STORE, TRANSACTION_TYPE_CODES, TransactionStore
+
+# ========== ROLLUP CONFIGURATION ==========
+
+# Rollup tier -> bucket length in milliseconds, finest first
+ROLLUP_TIERS: Dict[str, int] = {
+    '1h': 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+}
+
+# Aggregates kept per bucket, one binary file each, sorted by bucket
+ROLLUP_COLUMNS: Dict[str, np.dtype] = {
+    'bucket': np.dtype('<i8'),        # bucket start, ms since epoch
+    'count': np.dtype('<i8'),         # rows of any type
+    'buy_count': np.dtype('<i8'),
+    'sell_count': np.dtype('<i8'),
+    'buy_volume': np.dtype('<f8'),    # USD
+    'sell_volume': np.dtype('<f8'),   # USD
+    'quantity': np.dtype('<f8'),      # traded units (amount / price), the VWAP denominator
+}
+
+_BUY = TRANSACTION_TYPE_CODES['buy']
+_SELL = TRANSACTION_TYPE_CODES['sell']
+
+def get_rollup_config() -> Dict[str, Any]:
+    """Gets rollup configuration from environment variables or defaults"""
+    return {
+        'data_dir': os.getenv('TRANSACTIONS_ROLLUP_DIR', os.path.join('data', 'transaction_rollups')),
+    }
+
+# ========== AGGREGATION ==========
+
+def aggregate(rows: Dict[str, np.ndarray], bucket_ms: int) -> Dict[str, np.ndarray]:
+    """Aggregates raw rows (timestamp, type, amount, price) into sorted buckets of bucket_ms"""
+    timestamp = np.asarray(rows['timestamp'], dtype=np.int64)
+    types = np.asarray(rows['type'])
+    amount = np.asarray(rows['amount'], dtype=np.float64)
+    price = np.asarray(rows['price'], dtype=np.float64)
+
+    buckets, inverse = np.unique(timestamp // bucket_ms * bucket_ms, return_inverse=True)
+    size = len(buckets)
+    buy = types == _BUY
+    sell = types == _SELL
+    traded = (buy | sell) & (price > 0)
+    quantity = np.divide(amount, price, out=np.zeros_like(amount), where=traded)
+
+    return {
+        'bucket': buckets.astype(np.int64),
+        'count': np.bincount(inverse, minlength=size).astype(np.int64),
+        'buy_count': np.bincount(inverse, weights=buy.astype(np.float64), minlength=size).astype(np.int64),
+        'sell_count': np.bincount(inverse, weights=sell.astype(np.float64), minlength=size).astype(np.int64),
+        'buy_volume': np.bincount(inverse, weights=np.where(buy, amount, 0.0), minlength=size),
+        'sell_volume': np.bincount(inverse, weights=np.where(sell, amount, 0.0), minlength=size),
+        'quantity': np.bincount(inverse, weights=quantity, minlength=size),
+    }
+
+def merge_buckets(stored: Dict[str, np.ndarray], delta: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Adds delta buckets to stored ones: matching buckets are summed, new ones inserted in order"""
+    at = np.searchsorted(stored['bucket'], delta['bucket'])
+    existing = at < len(stored['bucket'])
+    existing[existing] = stored['bucket'][at[existing]] == delta['bucket'][existing]
+
+    merged = {}
+    for column in ROLLUP_COLUMNS:
+        values = np.array(stored[column], dtype=ROLLUP_COLUMNS[column])
+        if column != 'bucket':
+            values[at[existing]] += delta[column][existing]
+        merged[column] = np.insert(values, at[~existing], delta[column][~existing])
+    return merged
+
+def sum_buckets(tier: Dict[str, np.ndarray], lo: int, hi: int) -> Dict[str, float]:
+    """Totals of the buckets [lo, hi) of a tier"""
+    return {column: tier[column][lo:hi].sum() for column in ROLLUP_COLUMNS if column != 'bucket'}
+
+def totals_to_json(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain totals with the average (volume-weighted) price of buys and sells"""
+    volume = float(totals['buy_volume'] + totals['sell_volume'])
+    quantity = float(totals['quantity'])
+    return {
+        'count': int(totals['count']),
+        'buy_count': int(totals['buy_count']),
+        'sell_count': int(totals['sell_count']),
+        'buy_volume': float(totals['buy_volume']),
+        'sell_volume': float(totals['sell_volume']),
+        'vwap': volume / quantity if quantity else None,
+    }
+
+# ========== ROLLUP STORE ==========
+
+class TransactionRollups:
+    """
+    Materialized aggregates per symbol and tier, laid out as
+    <data_dir>/<SYMBOL>/<tier>/<column>.bin plus a 'rows' file with the number
+    of raw rows they cover. They are updated incrementally from
+    TransactionStore.insert (under its write lock) and rebuilt from the raw
+    partition whenever 'rows' does not match it.
+    """
+
+    def __init__(self, store: TransactionStore, data_dir: str):
+        self.store = store
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[int, Dict[str, Dict[str, np.ndarray]]]] = {}
+
+    def _directory(self, symbol: str) -> str:
+        return os.path.join(self.data_dir, symbol)
+
+    def _stored_rows(self, symbol: str) -> int:
+        try:
+            with open(os.path.join(self._directory(symbol), 'rows')) as rows_file:
+                return int(rows_file.read())
+        except (OSError, ValueError):
+            return -1
+
+    def _read(self, symbol: str) -> Dict[str, Dict[str, np.ndarray]]:
+        tiers = {}
+        for tier in ROLLUP_TIERS:
+            directory = os.path.join(self._directory(symbol), tier)
+            tiers[tier] = {column: np.fromfile(os.path.join(directory, f"{column}.bin"), dtype=dtype)
+                           for column, dtype in ROLLUP_COLUMNS.items()}
+        return tiers
+
+    def _write(self, symbol: str, tiers: Dict[str, Dict[str, np.ndarray]], rows: int) -> None:
+        """Writes every tier to a staging directory that then replaces the symbol's one"""
+        directory = self._directory(symbol)
+        staging = directory + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        for tier, columns in tiers.items():
+            os.makedirs(os.path.join(staging, tier))
+            for column, dtype in ROLLUP_COLUMNS.items():
+                np.ascontiguousarray(columns[column], dtype=dtype).tofile(os.path.join(staging, tier, f"{column}.bin"))
+        with open(os.path.join(staging, 'rows'), 'w') as rows_file:
+            rows_file.write(str(rows))
+        retired = directory + '.old'
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.isdir(directory):
+            os.rename(directory, retired)
+        os.rename(staging, directory)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def _rebuild(self, symbol: str) -> None:
+        """Recomputes every tier of a symbol from its raw partition (caller holds the write lock)"""
+        columns = self.store.partition(symbol).columns()
+        tiers = {tier: aggregate(columns, bucket_ms) for tier, bucket_ms in ROLLUP_TIERS.items()}
+        self._write(symbol, tiers, len(columns['id']))
+
+    def apply(self, symbol: str, rows: Dict[str, np.ndarray]) -> None:
+        """
+        Folds freshly inserted rows into every tier. Only the touched buckets
+        change; a symbol whose rollups are missing or behind is rebuilt instead.
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        stored_rows = self._stored_rows(symbol)
+        if stored_rows != len(self.store.partition(symbol)) - len(rows['timestamp']):
+            self._rebuild(symbol)
+            return
+
+        tiers = self._read(symbol)
+        for tier, bucket_ms in ROLLUP_TIERS.items():
+            tiers[tier] = merge_buckets(tiers[tier], aggregate(rows, bucket_ms))
+        self._write(symbol, tiers, stored_rows + len(rows['timestamp']))
+
+    def tiers(self, symbol: str) -> Dict[str, Dict[str, np.ndarray]]:
+        """Gets every tier of a symbol, rebuilding it first if it does not cover the partition"""
+        length = len(self.store.partition(symbol))
+        if self._stored_rows(symbol) != length:
+            with self.store.write_lock():
+                length = len(self.store.partition(symbol))
+                if self._stored_rows(symbol) != length:
+                    os.makedirs(self.data_dir, exist_ok=True)
+                    self._rebuild(symbol)
+
+        with self._lock:
+            cached = self._cache.get(symbol)
+            if cached is not None and cached[0] == length:
+                return cached[1]
+        tiers = self._read(symbol)
+        with self._lock:
+            self._cache[symbol] = (length, tiers)
+        return tiers
+
+    def totals(self, symbol: str, start_time: Optional[int] = None, end_time: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Totals of [start_time, end_time). Whole days are read from the daily tier,
+        whole hours at the edges from the hourly tier, and only the sub-hour
+        remainder from raw rows.
+        """
+        tiers = self.tiers(symbol)
+        totals = {column: 0 for column in ROLLUP_COLUMNS if column != 'bucket'}
+        if not len(tiers['1h']['bucket']):
+            return totals
+        start = start_time if start_time is not None else int(tiers['1h']['bucket'][0])
+        end = end_time if end_time is not None else int(tiers['1h']['bucket'][-1]) + ROLLUP_TIERS['1h']
+
+        for lo, hi, tier in self._cover(start, end):
+            if tier is None:
+                part = self._raw_totals(symbol, lo, hi)
+            else:
+                buckets = tiers[tier]['bucket']
+                first, last = np.searchsorted(buckets, (lo, hi))
+                part = sum_buckets(tiers[tier], first, last)
+            for column in totals:
+                totals[column] += part[column]
+        return totals
+
+    @staticmethod
+    def _cover(start: int, end: int) -> List[Tuple[int, int, Optional[str]]]:
+        """Splits [start, end) into pieces read from the coarsest tier that fits each one"""
+        for tier, bucket_ms in reversed(list(ROLLUP_TIERS.items())):
+            aligned_start = -(-start // bucket_ms) * bucket_ms
+            aligned_end = end // bucket_ms * bucket_ms
+            if aligned_start >= aligned_end:
+                continue
+            inner = TransactionRollups._cover(start, aligned_start) if aligned_start > start else []
+            outer = TransactionRollups._cover(aligned_end, end) if end > aligned_end else []
+            return inner + [(aligned_start, aligned_end, tier)] + outer
+        return [(start, end, None)] if start < end else []
+
+    def _raw_totals(self, symbol: str, start_time: int, end_time: int) -> Dict[str, float]:
+        partition = self.store.partition(symbol)
+        lo, hi = partition.bounds({'start_time': start_time, 'end_time': end_time})
+        columns = partition.columns()
+        rows = {column: columns[column][lo:hi] for column in ('timestamp', 'type', 'amount', 'price')}
+        return sum_buckets(aggregate(rows, ROLLUP_TIERS['1h']), 0, hi - lo)
+
+    def series(self, symbol: str, tier: str = '1d', start_time: Optional[int] = None,
+               end_time: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Buckets of one tier within [start_time, end_time), e.g. daily figures for a chart"""
+        if tier not in ROLLUP_TIERS:
+            raise ValueError(f"Invalid rollup tier '{tier}'")
+        columns = self.tiers(symbol)[tier]
+        buckets = columns['bucket']
+        lo = int(np.searchsorted(buckets, start_time)) if start_time is not None else 0
+        hi = int(np.searchsorted(buckets, end_time)) if end_time is not None else len(buckets)
+        return {column: values[lo:hi] for column, values in columns.items()}
+
+def series_to_json(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Bucket columns as plain lists, with the VWAP of each bucket"""
+    volume = columns['buy_volume'] + columns['sell_volume']
+    vwap = np.divide(volume, columns['quantity'], out=np.full(len(volume), np.nan), where=columns['quantity'] > 0)
+    result = {column: values.tolist() for column, values in columns.items()}
+    result['vwap'] = [None if np.isnan(value) else value for value in vwap.tolist()]
+    return result
+
+# Shared per-process rollups, fed by every insert into the shared store
+TRANSACTION_ROLLUP_CONFIG = get_rollup_config()
+TRANSACTION_ROLLUPS = TransactionRollups(TRANSACTION_STORE, TRANSACTION_ROLLUP_CONFIG['data_dir'])
+TRANSACTION_STORE.subscribe(TRANSACTION_ROLLUPS.apply)
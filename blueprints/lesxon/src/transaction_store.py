@@ -0,0 +1,590 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import fcntl
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+
+# ========== TRANSACTION STORE CONFIGURATION ==========
+
+# Columns kept per symbol, one append-only binary file each, sorted by (timestamp, id)
+TRANSACTION_COLUMNS: Dict[str, np.dtype] = {
+    'id': np.dtype('<i8'),          # global, assigned on insert
+    'timestamp': np.dtype('<i8'),   # ms since epoch
+    'type': np.dtype('u1'),         # code in TRANSACTION_TYPES
+    'amount': np.dtype('<f8'),      # USD
+    'price': np.dtype('<f8'),
+}
+
+# Transaction type dictionary: the stored code is the position in this tuple
+TRANSACTION_TYPES: Tuple[str, ...] = ('buy', 'sell', 'deposit', 'withdrawal')
+TRANSACTION_TYPE_CODES: Dict[str, int] = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+
+_SYMBOL_PATTERN = re.compile(r'^[A-Z0-9]{3,20}$')
+
+def get_transaction_store_config() -> Dict[str, Any]:
+    """Gets transaction store configuration from environment variables or defaults"""
+    return {
+        'data_dir': os.getenv('TRANSACTIONS_DATA_DIR', os.path.join('data', 'transactions')),
+        'page_size': int(os.getenv('TRANSACTIONS_PAGE_SIZE', '10')),
+        'max_page_size': int(os.getenv('TRANSACTIONS_MAX_PAGE_SIZE', '500')),
+    }
+
+# ========== FILTER VALIDATION ==========
+
+def parse_transaction_filters(values: Any) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Validates the filter form fields. Returns (filters, errors); errors maps a
+    field name to its message and filters holds the typed values:
+    symbol, start_time/end_time (ms, end day inclusive), type code, min/max amount.
+    """
+    symbol = (values.get('symbol') or '').strip().upper()
+    start_date = (values.get('start_date') or '').strip()
+    end_date = (values.get('end_date') or '').strip()
+    transaction_type = (values.get('transaction_type') or '').strip()
+    min_amount = (values.get('min_amount') or '').strip()
+    max_amount = (values.get('max_amount') or '').strip()
+
+    errors: Dict[str, str] = {}
+    filters: Dict[str, Any] = {}
+
+    if symbol:
+        if len(symbol) < 3:
+            errors['symbol'] = 'El símbolo debe tener al menos 3 caracteres'
+        filters['symbol'] = symbol
+
+    dates = {}
+    for field, value in (('start_date', start_date), ('end_date', end_date)):
+        if value:
+            try:
+                dates[field] = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            except ValueError:
+                errors[field] = 'Formato de fecha inválido'
+    if 'start_date' in dates and 'end_date' in dates and dates['start_date'] > dates['end_date']:
+        errors['end_date'] = 'La fecha fin debe ser posterior a la fecha inicio'
+    if 'start_date' in dates:
+        filters['start_time'] = int(dates['start_date'].timestamp() * 1000)
+    if 'end_date' in dates:
+        filters['end_time'] = int(dates['end_date'].timestamp() * 1000) + 86_400_000
+
+    if transaction_type:
+        if transaction_type not in TRANSACTION_TYPE_CODES:
+            errors['transaction_type'] = 'Tipo de transacción no válido'
+        else:
+            filters['type'] = TRANSACTION_TYPE_CODES[transaction_type]
+
+    for field, value, label in (('min_amount', min_amount, 'mínimo'), ('max_amount', max_amount, 'máximo')):
+        if value:
+            try:
+                amount = float(value)
+            except ValueError:
+                errors[field] = 'Ingresa un monto válido'
+                continue
+            if amount < 0:
+                errors[field] = f'El monto {label} no puede ser negativo'
+            filters[field] = amount
+    if 'min_amount' in filters and 'max_amount' in filters and 'max_amount' not in errors \
+            and filters['min_amount'] > filters['max_amount']:
+        errors['max_amount'] = 'El monto máximo debe ser mayor al mínimo'
+
+    return filters, errors
+
+def encode_cursor(timestamp: int, row_id: int) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    return f'{timestamp}_{row_id}'
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Parses a keyset cursor, raising ValueError if it is malformed"""
+    timestamp, _, row_id = (cursor or '').partition('_')
+    return int(timestamp), int(row_id)
+
+# ========== SECONDARY INDEXES ==========
+
+# Index files of a partition, kept under <partition>/index/
+TRANSACTION_INDEX_FILES: Dict[str, np.dtype] = {
+    'type_positions': np.dtype('<i8'),    # row positions grouped by type code, ascending within each
+    'type_offsets': np.dtype('<i8'),      # start of each type code in type_positions (+ end)
+    'amount_sorted': np.dtype('<f8'),     # amounts ascending
+    'amount_positions': np.dtype('<i8'),  # row position of each sorted amount
+}
+
+class TransactionIndex:
+    """
+    Secondary access paths of a partition covering its first `length` rows:
+    positions per type code and a sorted amount index. Both give exact row
+    counts for a filter with a binary search, which is what the planner uses.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], length: int):
+        self.arrays = arrays
+        self.length = length
+
+    @classmethod
+    def build(cls, columns: Dict[str, np.ndarray]) -> 'TransactionIndex':
+        """Indexes every row of the columns"""
+        return cls.empty().extend(columns)
+
+    @classmethod
+    def empty(cls) -> 'TransactionIndex':
+        arrays = {name: np.empty(0, dtype=dtype) for name, dtype in TRANSACTION_INDEX_FILES.items()}
+        arrays['type_offsets'] = np.zeros(len(TRANSACTION_TYPES) + 1, dtype=np.int64)
+        return cls(arrays, 0)
+
+    def extend(self, columns: Dict[str, np.ndarray]) -> 'TransactionIndex':
+        """
+        New index that also covers rows [self.length, len(columns)). Appended
+        rows only ever take higher positions, so each structure is a linear merge.
+        """
+        length = len(columns['id'])
+        types = np.asarray(columns['type'][self.length:length])
+        amounts = np.asarray(columns['amount'][self.length:length])
+
+        type_order = np.argsort(types, kind='stable')
+        type_counts = np.bincount(types, minlength=len(TRANSACTION_TYPES))
+        type_offsets = np.concatenate(([0], np.cumsum(type_counts)))
+        old_positions, old_offsets = self.arrays['type_positions'], self.arrays['type_offsets']
+        type_positions = np.concatenate([
+            part
+            for code in range(len(TRANSACTION_TYPES))
+            for part in (old_positions[old_offsets[code]:old_offsets[code + 1]],
+                         type_order[type_offsets[code]:type_offsets[code + 1]] + self.length)
+        ] + [np.empty(0, dtype=np.int64)]).astype(np.int64)
+
+        amount_order = np.argsort(amounts, kind='stable')
+        new_sorted = amounts[amount_order]
+        at = np.searchsorted(self.arrays['amount_sorted'], new_sorted, side='right')
+
+        return TransactionIndex({
+            'type_positions': type_positions,
+            'type_offsets': (old_offsets + type_offsets).astype(np.int64),
+            'amount_sorted': np.insert(self.arrays['amount_sorted'], at, new_sorted),
+            'amount_positions': np.insert(self.arrays['amount_positions'], at, amount_order + self.length),
+        }, length)
+
+    def type_positions(self, code: int) -> np.ndarray:
+        """Ascending positions of the rows of a type code"""
+        offsets = self.arrays['type_offsets']
+        return self.arrays['type_positions'][offsets[code]:offsets[code + 1]]
+
+    def amount_range(self, min_amount: Optional[float], max_amount: Optional[float]) -> Tuple[int, int]:
+        """Slice [i, j) of the sorted amounts that lies within [min_amount, max_amount]"""
+        amounts = self.arrays['amount_sorted']
+        i = int(np.searchsorted(amounts, min_amount, side='left')) if min_amount is not None else 0
+        j = int(np.searchsorted(amounts, max_amount, side='right')) if max_amount is not None else len(amounts)
+        return i, max(i, j)
+
+    def save(self, directory: str) -> None:
+        """Writes the index to a staging directory that then replaces `directory`"""
+        staging = f"{directory}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name, dtype in TRANSACTION_INDEX_FILES.items():
+            np.ascontiguousarray(self.arrays[name], dtype=dtype).tofile(os.path.join(staging, f"{name}.bin"))
+        with open(os.path.join(staging, 'length'), 'w') as length_file:
+            length_file.write(str(self.length))
+        retired = f"{directory}.{os.getpid()}.old"
+        if os.path.isdir(directory):
+            os.rename(directory, retired)
+        os.rename(staging, directory)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['TransactionIndex']:
+        """Opens a saved index with np.memmap, or None if there is none"""
+        try:
+            with open(os.path.join(directory, 'length')) as length_file:
+                length = int(length_file.read())
+            arrays = {}
+            for name, dtype in TRANSACTION_INDEX_FILES.items():
+                path = os.path.join(directory, f"{name}.bin")
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r') if os.path.getsize(path) else np.empty(0, dtype=dtype)
+        except (OSError, ValueError):
+            return None
+        return cls(arrays, length)
+
+# ========== COLUMNAR PARTITIONS ==========
+
+class TransactionPartition:
+    """
+    Columns of one symbol as append-only files opened with np.memmap, kept
+    sorted by (timestamp, id) so time ranges and keyset cursors are binary searches.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._length = -1
+        self._columns: Dict[str, np.ndarray] = {}
+        self._index: Optional[TransactionIndex] = None
+
+    def _path(self, column: str, directory: Optional[str] = None) -> str:
+        return os.path.join(directory or self.directory, f"{column}.bin")
+
+    def _stored_length(self) -> int:
+        """Rows fully written to every column (a torn append is ignored)"""
+        lengths = []
+        for column, dtype in TRANSACTION_COLUMNS.items():
+            try:
+                lengths.append(os.path.getsize(self._path(column)) // dtype.itemsize)
+            except OSError:
+                return 0
+        return min(lengths)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Gets read-only memmapped views of every column"""
+        length = self._stored_length()
+        with self._lock:
+            if length != self._length:
+                self._columns = {
+                    column: (np.memmap(self._path(column), dtype=dtype, mode='r', shape=(length,))
+                             if length else np.empty(0, dtype=dtype))
+                    for column, dtype in TRANSACTION_COLUMNS.items()
+                }
+                self._length = length
+            return self._columns
+
+    def __len__(self) -> int:
+        return len(self.columns()['id'])
+
+    def append(self, rows: Dict[str, np.ndarray]) -> None:
+        """
+        Adds rows (already sorted by timestamp, with fresh ids). Rows newer than
+        the stored tail are appended; otherwise the partition is merged and
+        rewritten into a new directory that replaces the old one.
+        """
+        with self._lock:
+            length = self._stored_length()
+            if length:
+                dtype = TRANSACTION_COLUMNS['timestamp']
+                last = np.fromfile(self._path('timestamp'), dtype=dtype, count=1,
+                                   offset=(length - 1) * dtype.itemsize)[0]
+            if not length or rows['timestamp'][0] >= last:
+                os.makedirs(self.directory, exist_ok=True)
+                for column, dtype in TRANSACTION_COLUMNS.items():
+                    path = self._path(column)
+                    # Drop a torn tail left by an interrupted append before writing
+                    if os.path.exists(path) and os.path.getsize(path) != length * dtype.itemsize:
+                        os.truncate(path, length * dtype.itemsize)
+                    with open(path, 'ab') as column_file:
+                        column_file.write(np.ascontiguousarray(rows[column], dtype=dtype).tobytes())
+                return
+
+            stored = {column: np.fromfile(self._path(column), dtype=dtype, count=length)
+                      for column, dtype in TRANSACTION_COLUMNS.items()}
+            merged = {column: np.concatenate((stored[column], np.asarray(rows[column], dtype=dtype)))
+                      for column, dtype in TRANSACTION_COLUMNS.items()}
+            order = np.lexsort((merged['id'], merged['timestamp']))
+
+            staging = self.directory + '.tmp'
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            for column in TRANSACTION_COLUMNS:
+                merged[column][order].tofile(self._path(column, staging))
+            retired = self.directory + '.old'
+            shutil.rmtree(retired, ignore_errors=True)
+            os.rename(self.directory, retired)
+            os.rename(staging, self.directory)
+            shutil.rmtree(retired, ignore_errors=True)
+
+    def bounds(self, filters: Dict[str, Any], cursor: Optional[Tuple[int, int]] = None,
+               descending: bool = True) -> Tuple[int, int]:
+        """Row range [lo, hi) matching the time filters and lying past the cursor"""
+        columns = self.columns()
+        timestamp = columns['timestamp']
+        start_time, end_time = filters.get('start_time'), filters.get('end_time')
+        lo = int(np.searchsorted(timestamp, start_time, side='left')) if start_time is not None else 0
+        hi = int(np.searchsorted(timestamp, end_time, side='left')) if end_time is not None else len(timestamp)
+
+        if cursor is not None:
+            cursor_time, cursor_id = cursor
+            first = int(np.searchsorted(timestamp, cursor_time, side='left'))
+            last = int(np.searchsorted(timestamp, cursor_time, side='right'))
+            # Ids are ascending among equal timestamps
+            side = 'left' if descending else 'right'
+            position = first + int(np.searchsorted(columns['id'][first:last], cursor_id, side=side))
+            if descending:
+                hi = min(hi, position)
+            else:
+                lo = max(lo, position)
+        return lo, max(lo, hi)
+
+    def index(self) -> TransactionIndex:
+        """
+        Gets the secondary index covering every stored row. A saved index that
+        is behind the columns is extended with the appended rows (a rewrite of
+        the partition drops the index directory with it) and saved again.
+        """
+        columns = self.columns()
+        length = len(columns['id'])
+        index = self._index
+        if index is not None and index.length == length:
+            return index
+
+        directory = os.path.join(self.directory, 'index')
+        index = TransactionIndex.load(directory)
+        if index is None or index.length != length:
+            if index is None or index.length > length:
+                index = TransactionIndex.build(columns)
+            else:
+                index = index.extend(columns)
+            try:
+                index.save(directory)
+            except OSError:
+                pass  # Another worker is saving the same rows; the in-memory index is complete
+        self._index = index
+        return index
+
+    def plan(self, filters: Dict[str, Any], lo: int, hi: int) -> List[Tuple[int, str]]:
+        """
+        Access paths usable for the filters within rows [lo, hi) with the number
+        of rows each one yields, most selective first. 'time' is the contiguous
+        range itself; 'type' and 'amount' come from the secondary index.
+        """
+        paths = [(hi - lo, 'time')]
+        if 'type' in filters or 'min_amount' in filters or 'max_amount' in filters:
+            index = self.index()
+            if 'type' in filters:
+                positions = index.type_positions(filters['type'])
+                paths.append((int(np.searchsorted(positions, hi) - np.searchsorted(positions, lo)), 'type'))
+            if 'min_amount' in filters or 'max_amount' in filters:
+                i, j = index.amount_range(filters.get('min_amount'), filters.get('max_amount'))
+                paths.append((j - i, 'amount'))
+        paths.sort()
+        return paths
+
+    def candidates(self, filters: Dict[str, Any], lo: int, hi: int) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Drives the query with the most selective path. Returns the ascending
+        candidate positions within [lo, hi) (None when the time range itself is
+        the cheapest path) and the filters the candidates still have to pass.
+        """
+        _, path = self.plan(filters, lo, hi)[0]
+        residual = {key: filters[key] for key in ('type', 'min_amount', 'max_amount') if key in filters}
+        if path == 'time':
+            return None, residual
+
+        index = self.index()
+        if path == 'type':
+            positions = index.type_positions(residual.pop('type'))
+        else:
+            i, j = index.amount_range(residual.pop('min_amount', None), residual.pop('max_amount', None))
+            positions = np.sort(index.arrays['amount_positions'][i:j])
+        start, stop = np.searchsorted(positions, (lo, hi))
+        return positions[start:stop], residual
+
+    def matches(self, filters: Dict[str, Any], positions: np.ndarray) -> np.ndarray:
+        """Boolean mask of the rows at `positions` matching the type and amount filters"""
+        columns = self.columns()
+        mask = np.ones(len(positions), dtype=bool)
+        if 'type' in filters:
+            mask &= columns['type'][positions] == filters['type']
+        if 'min_amount' in filters:
+            mask &= columns['amount'][positions] >= filters['min_amount']
+        if 'max_amount' in filters:
+            mask &= columns['amount'][positions] <= filters['max_amount']
+        return mask
+
+    def mask(self, filters: Dict[str, Any], lo: int, hi: int) -> np.ndarray:
+        """Boolean mask of rows [lo, hi) matching the type and amount filters"""
+        columns = self.columns()
+        mask = np.ones(hi - lo, dtype=bool)
+        if 'type' in filters:
+            mask &= columns['type'][lo:hi] == filters['type']
+        if 'min_amount' in filters:
+            mask &= columns['amount'][lo:hi] >= filters['min_amount']
+        if 'max_amount' in filters:
+            mask &= columns['amount'][lo:hi] <= filters['max_amount']
+        return mask
+
+    def select(self, filters: Dict[str, Any], cursor: Optional[Tuple[int, int]], limit: int,
+               descending: bool = True) -> np.ndarray:
+        """
+        Positions of the first `limit` matching rows past the cursor, in page order.
+        Walks the driving path outward from the cursor in growing blocks, so a
+        page costs about the same at any depth.
+        """
+        lo, hi = self.bounds(filters, cursor, descending)
+        candidates, residual = self.candidates(filters, lo, hi)
+        if candidates is not None:
+            lo, hi = 0, len(candidates)
+
+        found: List[np.ndarray] = []
+        count = 0
+        block = max(limit * 4, 1024)
+        while lo < hi and count < limit:
+            if descending:
+                start, stop = max(hi - block, lo), hi
+                hi = start
+            else:
+                start, stop = lo, min(lo + block, hi)
+                lo = stop
+            if candidates is None:
+                positions = np.flatnonzero(self.mask(residual, start, stop)) + start
+            else:
+                positions = candidates[start:stop]
+                if residual:
+                    positions = positions[self.matches(residual, positions)]
+            if descending:
+                positions = positions[::-1]
+            found.append(positions[:limit - count])
+            count += len(found[-1])
+            block *= 2
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def count(self, filters: Dict[str, Any]) -> int:
+        """Number of rows matching the filters"""
+        lo, hi = self.bounds(filters)
+        candidates, residual = self.candidates(filters, lo, hi)
+        if candidates is None:
+            return int(np.count_nonzero(self.mask(residual, lo, hi))) if residual else hi - lo
+        return int(np.count_nonzero(self.matches(residual, candidates))) if residual else len(candidates)
+
+# ========== STORE ==========
+
+class TransactionStore:
+    """
+    Directory of per-symbol TransactionPartition laid out as <data_dir>/<SYMBOL>/<column>.bin.
+    Writes from any worker process are serialized with a lock file; ids come
+    from a counter file under the same lock. Subscribers (see subscribe) see
+    every inserted batch while the lock is still held.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._partitions: Dict[str, TransactionPartition] = {}
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[str, Dict[str, np.ndarray]], None]] = []
+
+    def subscribe(self, callback: Callable[[str, Dict[str, np.ndarray]], None]) -> None:
+        """Calls callback(symbol, rows) after the rows of each symbol are appended"""
+        self._subscribers.append(callback)
+
+    @contextmanager
+    def write_lock(self) -> Iterator[None]:
+        """Exclusive lock shared by every worker process that writes to the store"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(os.path.join(self.data_dir, '.lock'), 'a+') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def partition(self, symbol: str) -> TransactionPartition:
+        """Gets the (cached) partition handle of a symbol"""
+        with self._lock:
+            partition = self._partitions.get(symbol)
+            if partition is None:
+                partition = TransactionPartition(os.path.join(self.data_dir, symbol))
+                self._partitions[symbol] = partition
+            return partition
+
+    def symbols(self) -> List[str]:
+        """Lists the symbols with stored transactions"""
+        if not os.path.isdir(self.data_dir):
+            return []
+        return sorted(name for name in os.listdir(self.data_dir) if _SYMBOL_PATTERN.match(name))
+
+    def insert(self, symbols: np.ndarray, rows: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Inserts validated rows: symbols is an array of symbol strings and rows
+        holds timestamp, type (codes), amount and price arrays. Returns the ids.
+        """
+        symbols = np.asarray(symbols)
+        count = len(symbols)
+        if not count:
+            return np.empty(0, dtype=np.int64)
+
+        with self.write_lock():
+            counter = os.path.join(self.data_dir, 'next_id')
+            try:
+                with open(counter) as counter_file:
+                    first_id = int(counter_file.read() or 1)
+            except FileNotFoundError:
+                first_id = 1
+            ids = np.arange(first_id, first_id + count, dtype=np.int64)
+            # Reserved before writing, so a failed batch skips ids instead of reusing them
+            with open(counter + '.tmp', 'w') as counter_file:
+                counter_file.write(str(first_id + count))
+            os.replace(counter + '.tmp', counter)
+
+            for symbol in np.unique(symbols):
+                selected = np.flatnonzero(symbols == symbol)
+                order = selected[np.argsort(rows['timestamp'][selected], kind='stable')]
+                part = {'id': ids[order]}
+                part.update({column: np.asarray(rows[column])[order] for column in TRANSACTION_COLUMNS if column != 'id'})
+                self.partition(str(symbol)).append(part)
+                for callback in self._subscribers:
+                    callback(str(symbol), part)
+        return ids
+
+    def _partitions_for(self, filters: Dict[str, Any]) -> List[str]:
+        if 'symbol' in filters:
+            return [filters['symbol']] if filters['symbol'] in self.symbols() else []
+        return self.symbols()
+
+    def query(self, filters: Dict[str, Any], cursor: Optional[str] = None, limit: int = 10,
+              descending: bool = True, with_total: bool = False) -> Dict[str, Any]:
+        """
+        Gets one keyset page ordered by (timestamp, id). Each partition supplies
+        at most `limit` candidates past the cursor; they are merged and cut to
+        `limit`, and the last row becomes the next cursor.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        candidates: Dict[str, List[np.ndarray]] = {column: [] for column in TRANSACTION_COLUMNS}
+        candidates['symbol'] = []
+        total = 0 if with_total else None
+
+        for symbol in self._partitions_for(filters):
+            partition = self.partition(symbol)
+            positions = partition.select(filters, position, limit, descending)
+            columns = partition.columns()
+            for column in TRANSACTION_COLUMNS:
+                candidates[column].append(columns[column][positions])
+            candidates['symbol'].append(np.full(len(positions), symbol, dtype=object))
+            if with_total:
+                total += partition.count(filters)
+
+        merged = {column: (np.concatenate(values) if values else
+                           np.empty(0, dtype=TRANSACTION_COLUMNS.get(column, np.dtype(object))))
+                  for column, values in candidates.items()}
+        order = np.lexsort((merged['id'], merged['timestamp']))
+        if descending:
+            order = order[::-1]
+        order = order[:limit]
+        page = {column: values[order] for column, values in merged.items()}
+
+        next_cursor = None
+        if len(order) == limit:
+            next_cursor = encode_cursor(int(page['timestamp'][-1]), int(page['id'][-1]))
+        return {'columns': page, 'next_cursor': next_cursor, 'total': total}
+
+
+def page_to_json(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts a query page to plain typed columns (type codes decoded to names)"""
+    columns = page['columns']
+    return {
+        'columns': {
+            'id': columns['id'].tolist(),
+            'timestamp': columns['timestamp'].tolist(),
+            'symbol': columns['symbol'].tolist(),
+            'type': np.asarray(TRANSACTION_TYPES)[columns['type']].tolist(),
+            'amount': columns['amount'].tolist(),
+            'price': columns['price'].tolist(),
+        },
+        'next_cursor': page['next_cursor'],
+        'total': page['total'],
+    }
+
+def page_to_rows(page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Converts a query page to row dicts for server-side rendering"""
+    data = page_to_json(page)['columns']
+    rows = [dict(zip(data, values)) for values in zip(*data.values())]
+    for row in rows:
+        row['date'] = datetime.fromtimestamp(row['timestamp'] / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return rows
+
+# Shared per-process store
+TRANSACTION_STORE_CONFIG = get_transaction_store_config()
+TRANSACTION_STORE = TransactionStore(TRANSACTION_STORE_CONFIG['data_dir'])
@@ -0,0 +1,324 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+
+# ========== ZIP BUILDER CONFIGURATION ==========
+
+def get_zip_builder_config() -> Dict[str, Any]:
+    """Gets archive builder configuration from environment variables or defaults"""
+    return {
+        'source_dir': os.getenv('ZIP_SOURCE_DIR', os.path.join('data', 'downloads', 'artifacts')),
+        'workers': int(os.getenv('ZIP_WORKERS', str(os.cpu_count() or 1))),
+        'block_size': max(int(os.getenv('ZIP_BLOCK_SIZE', str(4 * 1024 * 1024))), 64 * 1024),
+    }
+
+# Inputs that are already compressed: stored as-is, recompressing only burns CPU
+STORED_EXTENSIONS = {
+    '.gz', '.tgz', '.zip', '.bz2', '.xz', '.zst', '.7z', '.rar', '.br', '.xlsx', '.docx',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp4', '.pdf',
+}
+
+# Deflate uses up to the last 32 KiB of input as back-references
+DEFLATE_WINDOW = 32 * 1024
+
+ZIP64_LIMIT = 0xFFFFFFFF
+
+# Deflate can slightly expand incompressible input: members this close to 4 GB get ZIP64 headers
+ZIP64_MARGIN = ZIP64_LIMIT >> 10
+
+def parse_compression_level(value: Any) -> int:
+    """Maps the form's compression_level to a zlib level (0 = store), raising ValueError"""
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Nivel de compresión no válido: '{value}'")
+    if not 0 <= level <= 9:
+        raise ValueError(f"Nivel de compresión no válido: '{value}'")
+    return level
+
+def list_source_files(source_dir: str) -> List[Dict[str, Any]]:
+    """Lists the files that can be added to an archive (relative names, sizes)"""
+    files = []
+    for root, _, names in os.walk(source_dir):
+        for name in names:
+            if name.endswith('.part'):
+                continue
+            path = os.path.join(root, name)
+            files.append({'name': os.path.relpath(path, source_dir), 'size': os.path.getsize(path)})
+    return sorted(files, key=lambda item: item['name'])
+
+def resolve_source_file(source_dir: str, name: str) -> str:
+    """Resolves a requested member inside source_dir, raising ValueError for anything outside it"""
+    root = os.path.realpath(source_dir)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise ValueError(f"Archivo no disponible: '{name}'")
+    return path
+
+# ========== CRC-32 COMBINATION ==========
+# zlib's crc32_combine (GF(2) matrix method); Python's zlib module does not expose it
+
+def _gf2_times(matrix: List[int], vector: int) -> int:
+    result = 0
+    index = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[index]
+        vector >>= 1
+        index += 1
+    return result
+
+def _gf2_square(matrix: List[int]) -> List[int]:
+    return [_gf2_times(matrix, row) for row in matrix]
+
+def crc32_shift_operator(length: int) -> List[int]:
+    """Operator that advances a CRC-32 over `length` zero bytes (reusable for equal-sized blocks)"""
+    # Operator for one zero bit, then squared up to one zero byte
+    odd = [0xEDB88320] + [1 << bit for bit in range(31)]
+    even = _gf2_square(odd)      # 2 bits
+    odd = _gf2_square(even)      # 4 bits
+    operator = None
+    while length:
+        even = _gf2_square(odd)
+        if length & 1:
+            operator = even if operator is None else [_gf2_times(even, row) for row in operator]
+        length >>= 1
+        if not length:
+            break
+        odd = _gf2_square(even)
+        if length & 1:
+            operator = odd if operator is None else [_gf2_times(odd, row) for row in operator]
+        length >>= 1
+    return operator if operator is not None else [1 << bit for bit in range(32)]
+
+def crc32_combine(crc1: int, crc2: int, operator: List[int]) -> int:
+    """CRC-32 of A+B from crc(A), crc(B) and the shift operator for len(B)"""
+    return _gf2_times(operator, crc1) ^ crc2
+
+# ========== BLOCK COMPRESSION (runs in the process pool) ==========
+
+def compress_block(path: str, offset: int, length: int, level: int, last: bool) -> Tuple[bytes, int]:
+    """
+    Compresses one block of a file as a piece of a single raw deflate stream.
+    The preceding 32 KiB are used as dictionary so the output matches a
+    sequential stream; non-final blocks end with a sync flush (byte aligned).
+    Returns (deflate bytes, crc32 of the block).
+    """
+    start = max(offset - DEFLATE_WINDOW, 0)
+    with open(path, 'rb') as source:
+        source.seek(start)
+        dictionary = source.read(offset - start)
+        data = source.read(length)
+
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return compressed, zlib.crc32(data)
+
+# ========== ZIP RECORDS ==========
+
+def _dos_datetime(timestamp: float) -> Tuple[int, int]:
+    t = time.localtime(timestamp)
+    year = min(max(t.tm_year, 1980), 2107)
+    return ((year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday,
+            t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2)
+
+
+class _Member:
+    """Bookkeeping for one archive member, filled in as it is written"""
+
+    def __init__(self, name: str, path: str, size: int, mtime: float, method: int):
+        self.name = name.replace(os.sep, '/').encode('utf-8')
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.method = method  # 0 = stored, 8 = deflated
+        self.offset = 0
+        self.crc = 0
+        self.compressed_size = 0
+
+    @property
+    def zip64(self) -> bool:
+        # Decided before writing, from the input size
+        return self.size >= ZIP64_LIMIT - ZIP64_MARGIN or self.offset >= ZIP64_LIMIT
+
+    def local_header(self) -> bytes:
+        date, clock = _dos_datetime(self.mtime)
+        extra = b''
+        sizes = 0
+        if self.zip64:
+            # Sizes follow in the ZIP64 data descriptor
+            extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0)
+            sizes = ZIP64_LIMIT
+        # Flag bit 3: CRC and sizes come after the data; bit 11: UTF-8 names
+        return struct.pack('<IHHHHHIIIHH', 0x04034B50, 45 if self.zip64 else 20, 0x0808, self.method,
+                           clock, date, 0, sizes, sizes, len(self.name), len(extra)) + self.name + extra
+
+    def data_descriptor(self) -> bytes:
+        if self.zip64:
+            return struct.pack('<IIQQ', 0x08074B50, self.crc, self.compressed_size, self.size)
+        return struct.pack('<IIII', 0x08074B50, self.crc, self.compressed_size, self.size)
+
+    def central_header(self) -> bytes:
+        date, clock = _dos_datetime(self.mtime)
+        values = []
+        sizes = (self.compressed_size, self.size)
+        if self.size >= ZIP64_LIMIT or self.compressed_size >= ZIP64_LIMIT:
+            values += [self.size, self.compressed_size]
+            sizes = (ZIP64_LIMIT, ZIP64_LIMIT)
+        offset = self.offset
+        if self.offset >= ZIP64_LIMIT:
+            values.append(self.offset)
+            offset = ZIP64_LIMIT
+        extra = struct.pack(f'<HH{len(values)}Q', 0x0001, 8 * len(values), *values) if values else b''
+        version = 45 if values or self.zip64 else 20
+        return struct.pack('<IHHHHHHIIIHHHHHII', 0x02014B50, 3 << 8 | version, version, 0x0808,
+                           self.method, clock, date, self.crc, sizes[0], sizes[1], len(self.name),
+                           len(extra), 0, 0, 0, 0o100644 << 16, offset) + self.name + extra
+
+
+def _end_records(count: int, directory_offset: int, directory_size: int) -> bytes:
+    """End of central directory, preceded by the ZIP64 records when any field overflows"""
+    records = b''
+    if count >= 0xFFFF or directory_offset >= ZIP64_LIMIT or directory_size >= ZIP64_LIMIT:
+        zip64_offset = directory_offset + directory_size
+        records += struct.pack('<IQHHIIQQQQ', 0x06064B50, 44, 45, 45, 0, 0,
+                               count, count, directory_size, directory_offset)
+        records += struct.pack('<IIQI', 0x07064B50, 0, zip64_offset, 1)
+        count = min(count, 0xFFFF)
+        directory_offset = min(directory_offset, ZIP64_LIMIT)
+        directory_size = min(directory_size, ZIP64_LIMIT)
+    return records + struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, count, count,
+                                 directory_size, directory_offset, 0)
+
+# ========== ARCHIVE STREAM ==========
+
+class ZipBuilder:
+    """
+    Streams zip archives whose members are deflated block by block on a process pool.
+
+    Blocks are submitted ahead (bounded by a window of in-flight blocks) and
+    their output is written strictly in order, so the archive is produced as a
+    single forward-only stream: nothing is staged in memory or on disk beyond
+    the window. Sizes and CRCs go in data descriptors, with ZIP64 records when
+    an archive or member exceeds 4 GB.
+    """
+
+    def __init__(self, workers: int, block_size: int):
+        self.workers = max(workers, 1)
+        self.block_size = block_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._block_operator = crc32_shift_operator(block_size)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Pool created lazily per process; workers are not forked from a threaded server"""
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(method))
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def members(self, source_dir: str, names: List[str], level: int) -> List[_Member]:
+        """Validates the requested files (raising ValueError) and plans how each one is stored"""
+        if not names:
+            raise ValueError('Selecciona al menos un archivo')
+        members, seen = [], set()
+        for name in names:
+            if name in seen:
+                continue
+            seen.add(name)
+            path = resolve_source_file(source_dir, name)
+            stat = os.stat(path)
+            stored = level == 0 or os.path.splitext(name)[1].lower() in STORED_EXTENSIONS
+            members.append(_Member(name, path, stat.st_size, stat.st_mtime, 0 if stored else 8))
+        return members
+
+    def _blocks(self, member: _Member) -> List[Tuple[int, int, bool]]:
+        """(offset, length, last) of every block; an empty file is one empty final block"""
+        offsets = range(0, member.size, self.block_size) if member.size else [0]
+        return [(offset, min(self.block_size, member.size - offset), offset + self.block_size >= member.size)
+                for offset in offsets]
+
+    def stream(self, members: List[_Member], level: int) -> Iterator[bytes]:
+        """Yields the archive bytes in order"""
+        position = 0
+        pending: 'deque[Tuple[int, Future]]' = deque()
+        window = self.workers * 2
+
+        def deflated_tasks() -> Iterator[Tuple[int, Tuple[Any, ...]]]:
+            for member in members:
+                if member.method == 8:
+                    for offset, length, last in self._blocks(member):
+                        yield length, (member.path, offset, length, level, last)
+
+        tasks = deflated_tasks()
+        executor = self._executor() if any(member.method == 8 for member in members) else None
+
+        def fill() -> None:
+            while len(pending) < window:
+                task = next(tasks, None)
+                if task is None:
+                    return
+                length, arguments = task
+                pending.append((length, executor.submit(compress_block, *arguments)))
+
+        try:
+            for member in members:
+                member.offset = position
+                header = member.local_header()
+                yield header
+                position += len(header)
+
+                if member.method == 8:
+                    for index in range(len(self._blocks(member))):
+                        fill()
+                        length, future = pending.popleft()
+                        compressed, crc = future.result()
+                        fill()
+                        if index:
+                            operator = self._block_operator if length == self.block_size else crc32_shift_operator(length)
+                            member.crc = crc32_combine(member.crc, crc, operator)
+                        else:
+                            member.crc = crc
+                        member.compressed_size += len(compressed)
+                        yield compressed
+                else:
+                    with open(member.path, 'rb') as source:
+                        while True:
+                            chunk = source.read(self.block_size)
+                            if not chunk:
+                                break
+                            member.crc = zlib.crc32(chunk, member.crc)
+                            member.compressed_size += len(chunk)
+                            yield chunk
+
+                position += member.compressed_size
+                descriptor = member.data_descriptor()
+                yield descriptor
+                position += len(descriptor)
+
+            directory_offset = position
+            directory = [member.central_header() for member in members]
+            directory_size = sum(len(record) for record in directory)
+            yield b''.join(directory)
+            yield _end_records(len(members), directory_offset, directory_size)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+# Shared per-process builder (its pool is started on first use)
+ZIP_BUILDER_CONFIG = get_zip_builder_config()
+ZIP_BUILDER = ZipBuilder(ZIP_BUILDER_CONFIG['workers'], ZIP_BUILDER_CONFIG['block_size'])
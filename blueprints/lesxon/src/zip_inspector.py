@@ -0,0 +1,289 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from .zip_builder import resolve_source_file
+
+# ========== ZIP INSPECTOR CONFIGURATION ==========
+
+def get_zip_inspector_config() -> Dict[str, Any]:
+    """Gets archive inspection configuration from environment variables or defaults"""
+    return {
+        'archive_dir': os.getenv('ZIP_ARCHIVE_DIR', os.path.join('data', 'archives')),
+        'listing_cache_size': int(os.getenv('ZIP_LISTING_CACHE_SIZE', '64')),
+        'chunk_size': int(os.getenv('ZIP_EXTRACT_CHUNK_SIZE', str(256 * 1024))),
+        'max_upload_bytes': int(os.getenv('ZIP_MAX_UPLOAD_BYTES', str(100 * 1024 * 1024))),
+    }
+
+_EOCD = struct.Struct('<IHHHHIIH')
+_ZIP64_LOCATOR = struct.Struct('<IIQI')
+_ZIP64_EOCD = struct.Struct('<IQHHIIQQQQ')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+
+# EOCD record plus the longest possible archive comment
+_EOCD_SEARCH = _EOCD.size + 0xFFFF
+
+
+class ZipEntry(NamedTuple):
+    """One central directory record"""
+    name: str
+    file_size: int
+    compress_size: int
+    method: int
+    crc: int
+    flags: int
+    header_offset: int
+    modified: str
+
+    @property
+    def is_dir(self) -> bool:
+        return self.name.endswith('/')
+
+    @property
+    def encrypted(self) -> bool:
+        return bool(self.flags & 0x1)
+
+
+class ZipListing(NamedTuple):
+    """Parsed central directory with a name index"""
+    entries: List[ZipEntry]
+    index: Dict[str, int]
+
+# ========== CENTRAL DIRECTORY PARSING ==========
+
+def _dos_to_iso(date: int, clock: int) -> str:
+    try:
+        return datetime(1980 + (date >> 9), (date >> 5) & 0xF, date & 0x1F,
+                        clock >> 11, (clock >> 5) & 0x3F, (clock & 0x1F) * 2).strftime('%Y-%m-%d %H:%M')
+    except ValueError:
+        return ''
+
+def _open_map(path: str) -> mmap.mmap:
+    with open(path, 'rb') as archive:
+        if not os.fstat(archive.fileno()).st_size:
+            raise ValueError('El archivo ZIP está vacío')
+        # The mapping stays valid after the file object is closed
+        return mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+
+def parse_central_directory(data: mmap.mmap) -> ZipListing:
+    """
+    Parses only the end records and the central directory of a mapped archive.
+    Member data is never touched, so only the tail pages of the file are read.
+    """
+    tail_start = max(len(data) - _EOCD_SEARCH, 0)
+    position = data.rfind(b'PK\x05\x06', tail_start)
+    if position < 0:
+        raise ValueError('No es un archivo ZIP válido (falta el directorio central)')
+    _, _, _, _, count, directory_size, directory_offset, _ = _EOCD.unpack_from(data, position)
+
+    locator = position - _ZIP64_LOCATOR.size
+    if locator >= 0 and data[locator:locator + 4] == b'PK\x06\x07':
+        _, _, zip64_offset, _ = _ZIP64_LOCATOR.unpack_from(data, locator)
+        fields = _ZIP64_EOCD.unpack_from(data, zip64_offset)
+        if fields[0] != 0x06064B50:
+            raise ValueError('Registro ZIP64 corrupto')
+        count, directory_size, directory_offset = fields[7], fields[8], fields[9]
+
+    entries: List[ZipEntry] = []
+    index: Dict[str, int] = {}
+    offset = directory_offset
+    for _ in range(count):
+        (signature, _, _, flags, method, clock, date, crc, compress_size, file_size,
+         name_length, extra_length, comment_length, _, _, _, header_offset) = _CENTRAL_HEADER.unpack_from(data, offset)
+        if signature != 0x02014B50:
+            raise ValueError('Directorio central corrupto')
+        name_start = offset + _CENTRAL_HEADER.size
+        raw_name = data[name_start:name_start + name_length]
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+
+        # ZIP64 extra field carries, in order, whichever fields overflowed
+        extra = data[name_start + name_length:name_start + name_length + extra_length]
+        cursor = 0
+        while cursor + 4 <= len(extra):
+            header_id, size = struct.unpack_from('<HH', extra, cursor)
+            if header_id == 0x0001:
+                values = iter(struct.unpack_from(f'<{size // 8}Q', extra, cursor + 4))
+                if file_size == 0xFFFFFFFF:
+                    file_size = next(values)
+                if compress_size == 0xFFFFFFFF:
+                    compress_size = next(values)
+                if header_offset == 0xFFFFFFFF:
+                    header_offset = next(values)
+                break
+            cursor += 4 + size
+
+        index[name] = len(entries)
+        entries.append(ZipEntry(name, file_size, compress_size, method, crc, flags,
+                                header_offset, _dos_to_iso(date, clock)))
+        offset = name_start + name_length + extra_length + comment_length
+
+    return ZipListing(entries, index)
+
+# ========== INSPECTOR ==========
+
+class ZipInspector:
+    """
+    Lists and extracts members of local archives without unpacking them.
+
+    Listings are cached in an LRU keyed by (path, mtime, size), so a replaced
+    archive is re-parsed automatically. Members are streamed straight from
+    the mapped file, decompressing chunk by chunk.
+    """
+
+    def __init__(self, archive_dir: str, cache_size: int = 64, chunk_size: int = 256 * 1024):
+        self.archive_dir = archive_dir
+        self.cache_size = max(cache_size, 1)
+        self.chunk_size = chunk_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[Tuple[str, int, int], ZipListing]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def archives(self) -> List[Dict[str, Any]]:
+        """Lists the archives available for inspection"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        archives = []
+        for name in sorted(os.listdir(self.archive_dir)):
+            path = os.path.join(self.archive_dir, name)
+            if name.lower().endswith('.zip') and os.path.isfile(path):
+                stat = os.stat(path)
+                archives.append({
+                    'name': name,
+                    'size': stat.st_size,
+                    'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M'),
+                })
+        return archives
+
+    def path(self, archive: str) -> str:
+        """Resolves an archive name inside archive_dir (raises ValueError)"""
+        return resolve_source_file(self.archive_dir, archive)
+
+    def listing(self, archive: str) -> ZipListing:
+        """Gets the (cached) central directory of an archive"""
+        path = self.path(archive)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            listing = self._cache.get(key)
+            if listing is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return listing
+            self.misses += 1
+
+        with _open_map(path) as data:
+            try:
+                listing = parse_central_directory(data)
+            except (struct.error, UnicodeDecodeError):
+                raise ValueError('Archivo ZIP corrupto')
+
+        with self._lock:
+            self._cache[key] = listing
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return listing
+
+    def entry(self, archive: str, name: str) -> ZipEntry:
+        """Gets one member record (raises ValueError if it does not exist or cannot be read)"""
+        listing = self.listing(archive)
+        position = listing.index.get(name)
+        if position is None:
+            raise ValueError(f"'{name}' no existe en el archivo")
+        entry = listing.entries[position]
+        if entry.encrypted:
+            raise ValueError(f"'{name}' está cifrado")
+        if entry.method not in (0, 8):
+            raise ValueError(f"'{name}' usa un método de compresión no soportado ({entry.method})")
+        return entry
+
+    def extract(self, archive: str, entry: ZipEntry, start: int = 0,
+                end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Streams bytes [start, end) of a member's uncompressed content.
+        Stored members are sliced directly; deflated ones are decompressed from
+        the beginning (deflate has no random access) and stop as soon as `end`
+        is reached. The CRC is checked when the whole member is read.
+        """
+        end = entry.file_size if end is None else min(end, entry.file_size)
+        data = _open_map(self.path(archive))
+        try:
+            signature, _, _, _, _, _, _, _, _, name_length, extra_length = _LOCAL_HEADER.unpack_from(
+                data, entry.header_offset)
+            if signature != 0x04034B50:
+                raise ValueError('Cabecera local corrupta')
+            data_start = entry.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+            data_end = data_start + entry.compress_size
+            whole = start == 0 and end == entry.file_size
+            crc = 0
+
+            if entry.method == 0:
+                for offset in range(data_start + start, data_start + end, self.chunk_size):
+                    chunk = data[offset:min(offset + self.chunk_size, data_start + end)]
+                    crc = zlib.crc32(chunk, crc)
+                    yield chunk
+            else:
+                decompressor = zlib.decompressobj(-15)
+                position = 0
+                for offset in range(data_start, data_end, self.chunk_size):
+                    pending = data[offset:min(offset + self.chunk_size, data_end)]
+                    # Never inflate more than one chunk at a time, even for very compressible data
+                    while pending and position < end:
+                        chunk = decompressor.decompress(pending, self.chunk_size)
+                        pending = decompressor.unconsumed_tail
+                        chunk_start, position = position, position + len(chunk)
+                        if whole:
+                            crc = zlib.crc32(chunk, crc)
+                        if position > start:
+                            yield chunk[max(start - chunk_start, 0):len(chunk) - max(position - end, 0)]
+                    if position >= end:
+                        break
+
+            if whole and crc != entry.crc:
+                raise ValueError(f"CRC incorrecto en '{entry.name}'")
+        finally:
+            data.close()
+
+    def verify(self, archive: str) -> Dict[str, Any]:
+        """Reads every member once, checking CRCs; returns counts and the failing members"""
+        errors = []
+        listing = self.listing(archive)
+        for entry in listing.entries:
+            if entry.is_dir:
+                continue
+            try:
+                for _ in self.extract(archive, self.entry(archive, entry.name)):
+                    pass
+            except (ValueError, zlib.error) as e:
+                errors.append({'name': entry.name, 'error': str(e)})
+        return {'entries': len(listing.entries), 'errors': errors}
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns listing cache counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'archives': len(self._cache),
+                    'max_archives': self.cache_size}
+
+
+def entry_to_dict(entry: ZipEntry) -> Dict[str, Any]:
+    """Public JSON view of a member"""
+    return {
+        'name': entry.name,
+        'size': entry.file_size,
+        'compressed_size': entry.compress_size,
+        'method': 'stored' if entry.method == 0 else 'deflated' if entry.method == 8 else str(entry.method),
+        'modified': entry.modified,
+        'is_dir': entry.is_dir,
+        'encrypted': entry.encrypted,
+    }
+
+# Shared per-process inspector
+ZIP_INSPECTOR_CONFIG = get_zip_inspector_config()
+ZIP_INSPECTOR = ZipInspector(ZIP_INSPECTOR_CONFIG['archive_dir'], ZIP_INSPECTOR_CONFIG['listing_cache_size'],
+                             ZIP_INSPECTOR_CONFIG['chunk_size'])
@@ -0,0 +1,38 @@
+"""
+Build step: minified, fingerprinted and precompressed static assets.
+
+    python build_assets.py
+    python build_assets.py --json
+
+Writes static/dist/ (name.<hash>.css|js with .gz/.br variants, sw.js and
+manifest.json). The app serves through the manifest when it finds one
+(see src/static_assets.py); delete static/dist/ to go back to the sources.
+"""
+import argparse
+import json
+import logging
+import os
+
+from src.static_assets import STATIC_SOURCES, brotli, build_assets, get_static_assets_config
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the fingerprinted static assets and their manifest')
+    parser.add_argument('--static-folder', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'),
+                        help='Folder holding the sources (default: ./static)')
+    parser.add_argument('--dist', default=get_static_assets_config()['STATIC_DIST_DIR'],
+                        help='Output folder inside the static folder (default: dist)')
+    parser.add_argument('--json', action='store_true', help='Print the manifest as JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+    if brotli is None:
+        logging.getLogger('static_assets').warning("brotli is not installed: building .gz variants only")
+
+    manifest = build_assets(args.static_folder, dist_dir=args.dist, sources=STATIC_SOURCES)
+    if args.json:
+        print(json.dumps(manifest, indent=2))
+    else:
+        for name, asset in manifest['assets'].items():
+            sizes = ', '.join(f"{encoding} {asset[encoding]:,}" for encoding in ('gzip', 'br') if encoding in asset)
+            print(f"{name:16} -> {asset['file']:32} {asset['bytes']:>9,} B, min {asset['minified']:,}, {sizes}")
+        print(f"build {manifest['version']}, service worker: {manifest['service_worker'] or 'n/a'}")
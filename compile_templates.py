@@ -0,0 +1,34 @@
+"""
+Build step: fills the shared Jinja bytecode cache and reports compile times.
+
+    python compile_templates.py
+    python compile_templates.py --json > template_times.json
+
+Workers started afterwards (serve.py / asgi.py, TEMPLATE_MODE=production)
+load bytecode instead of parsing templates (see src/template_cache.py).
+"""
+import argparse
+import json
+import logging
+import os
+
+os.environ['TEMPLATE_MODE'] = 'production'
+os.environ['TEMPLATE_PRECOMPILE'] = 'false'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompile every template into the on-disk bytecode cache')
+    parser.add_argument('--json', action='store_true', help='Print per-template compile times as JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+
+    from app import app
+    from src.template_cache import precompile_templates
+
+    result = precompile_templates(app)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for name, ms in sorted(result['templates'].items(), key=lambda item: -item[1]):
+            print(f'{ms:9.2f} ms  {name}')
+        print(f"{result['total_ms']:9.2f} ms  total ({len(result['templates'])} templates, {len(result['errors'])} errors)")
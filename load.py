@@ -0,0 +1,34 @@
+"""
+ETL.LOAD entry point: bulk loads local klines and transactions into Postgres.
+
+    python load.py klines transactions --mode upsert --format binary --workers 4
+    python load.py --benchmark --rows 100000
+
+The target database is SUPABASE_DB_URL / DATABASE_URL (see
+blueprints/lesxon/src/sql_console.py); loading is done with COPY FROM STDIN
+(see blueprints/lesxon/src/bulk_loader.py).
+"""
+import argparse
+import json
+import logging
+
+from blueprints.lesxon.src.bulk_loader import BULK_LOADER, LOAD_FORMATS, LOAD_MODES, LOAD_TABLES
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bulk load klines and transactions into Postgres with COPY')
+    parser.add_argument('targets', nargs='*', choices=list(LOAD_TABLES), help='Tables to load')
+    parser.add_argument('--format', dest='load_format', choices=LOAD_FORMATS, help='COPY format (default: binary)')
+    parser.add_argument('--mode', choices=LOAD_MODES, help='append, or upsert through a staging table (default: upsert)')
+    parser.add_argument('--symbols', nargs='+', help='Only these symbols (default: all stored)')
+    parser.add_argument('--workers', type=int, help='Parallel loaders per table (default: 4)')
+    parser.add_argument('--benchmark', action='store_true', help='Compare executemany with COPY on synthetic klines')
+    parser.add_argument('--rows', type=int, default=100_000, help='Benchmark rows (default: 100000)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+
+    if args.benchmark:
+        print(json.dumps(BULK_LOADER.benchmark(args.rows), indent=2))
+    for target in args.targets:
+        result = BULK_LOADER.load(target, args.load_format, args.mode, args.symbols, args.workers)
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,41 @@
+"""
+Kline pattern search tools: index syncing and the recall/latency benchmark.
+
+    python patterns.py BTCUSDT 1h --benchmark --queries 200 --k 10
+    python patterns.py BTCUSDT ETHUSDT 1h --sync-pgvector
+
+The in-process index is built by each worker on first use (see
+blueprints/lesxon/src/kline_patterns.py); --sync-pgvector fills the
+pgvector table in SUPABASE_DB_URL / DATABASE_URL. Searches with
+backend=pgvector only read that table, so run it after loading candles.
+"""
+import argparse
+import json
+import logging
+
+from blueprints.lesxon.src.kline_store import KLINE_INTERVALS
+from blueprints.lesxon.src.kline_patterns import KLINE_PATTERNS
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Index kline windows and benchmark the similarity search')
+    parser.add_argument('symbols', nargs='+', help='Symbols to index or benchmark')
+    parser.add_argument('interval', choices=list(KLINE_INTERVALS), help='Interval of the series')
+    parser.add_argument('--sync-pgvector', action='store_true', help='Insert the missing windows into the pgvector table')
+    parser.add_argument('--benchmark', action='store_true', help='Recall@k and latency of IVF (and pgvector) against the exact scan')
+    parser.add_argument('--pgvector', action='store_true', help='Include pgvector in the benchmark')
+    parser.add_argument('--queries', type=int, default=100, help='Benchmark query windows (default: 100)')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query (default: 10)')
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 4, 8, 16, 32], help='IVF probes to compare')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+
+    for symbol in args.symbols:
+        if args.sync_pgvector:
+            columns = KLINE_PATTERNS.resampler.columns(symbol, args.interval)
+            inserted = KLINE_PATTERNS.pgvector.sync(symbol.upper(), args.interval, columns['close'], columns['open_time'])
+            print(json.dumps({'symbol': symbol.upper(), 'interval': args.interval, 'inserted': inserted}))
+        if args.benchmark:
+            result = KLINE_PATTERNS.benchmark(symbol, args.interval, args.queries, args.k,
+                                              tuple(args.probes), include_pgvector=args.pgvector)
+            print(json.dumps({'symbol': symbol.upper(), 'interval': args.interval, **result}, indent=2))
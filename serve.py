@@ -0,0 +1,31 @@
+"""
+Production entry point: prefork multi-process server.
+
+    python serve.py --workers 4 --port 1024
+
+The app is imported once in the master and forked into N workers (see
+src/prefork_server.py). Development keeps using `python app.py`.
+"""
+import argparse
+import logging
+import os
+
+# Production servers compile templates once at startup (set TEMPLATE_MODE=development to opt out)
+os.environ.setdefault('TEMPLATE_MODE', 'production')
+
+from src.prefork_server import run_prefork
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the Flask app with a prefork multi-process server')
+    parser.add_argument('--app', help="WSGI application as 'module:attribute' (default: app:app)")
+    parser.add_argument('--host', help='Bind address (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, help='Bind port (default: 1024)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--threads', type=int, help='Request threads per worker (default: 8)')
+    parser.add_argument('--no-preload', dest='preload', action='store_false', default=None,
+                        help='Import the app in each worker instead of once in the master')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+
+    run_prefork(**vars(args))
@@ -0,0 +1,26 @@
+from typing import Any, Callable
+import functools
+
+from flask import jsonify, session
+
+from blueprints.home.src.navbar_helpers import is_module_accessible
+
+# ========== ROUTE GUARDS ==========
+
+def require_module(module_name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Rejects requests whose session user cannot access the module, with the
+    same rule as the navbar and the data API (src/data_api.py): 401 without
+    a session user, 403 without the module's permissions.
+    """
+    def decorator(view: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            user = session.get('user')
+            if not is_module_accessible(user, module_name):
+                if not user:
+                    return jsonify({'error': 'Inicia sesión para continuar'}), 401
+                return jsonify({'error': 'No tienes permisos para este módulo'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
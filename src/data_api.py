@@ -0,0 +1,94 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+import functools
+import os
+
+import anyio
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.middleware.wsgi import WSGIMiddleware
+from fastapi.responses import JSONResponse
+from flask import Flask
+
+from blueprints.home.src.navbar_helpers import is_module_accessible
+from src.server_session import ServerSideSessionInterface
+
+# ========== DATA API CONFIGURATION ==========
+
+def get_data_api_config() -> Dict[str, Any]:
+    """Gets ASGI data API configuration from environment variables or defaults"""
+    return {
+        'host': os.getenv('HOST', '0.0.0.0'),
+        'port': int(os.getenv('PORT', '1024')),
+        'workers': int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 1))),
+        # Threads per worker for blocking store/database calls of the data API
+        'threads': int(os.getenv('DATA_API_THREADS', '32')),
+        # Upper bound of a job status long poll and the interval it re-reads the job at
+        'max_wait': float(os.getenv('DATA_API_MAX_WAIT', '30')),
+        'poll_interval': float(os.getenv('DATA_API_POLL_INTERVAL', '0.5')),
+    }
+
+# ========== BLOCKING CALLS ==========
+
+_limiter: Optional[anyio.CapacityLimiter] = None
+
+async def call_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking store or database call on the data API's own thread pool.
+    It is separate from the pool the mounted Flask app runs on, so slow data
+    calls queue among themselves instead of taking threads from the UI.
+    """
+    global _limiter
+    if _limiter is None:
+        # Created inside the running event loop of this worker process
+        _limiter = anyio.CapacityLimiter(DATA_API_CONFIG['threads'])
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_limiter)
+
+# ========== SESSION AND PERMISSIONS ==========
+
+async def session_user(request: Request) -> Optional[Dict[str, Any]]:
+    """
+    The user of the Flask session behind the request's cookie, read through
+    the Flask app's own session interface (server-side store or signed
+    cookie). Read-only: the API never creates, refreshes or rewrites sessions.
+    """
+    flask_app: Flask = request.app.state.flask_app
+    interface = flask_app.session_interface
+    if isinstance(interface, ServerSideSessionInterface):
+        # Looked up by the cookie alone: open_session expects a Flask request
+        sid = request.cookies.get(interface.get_cookie_name(flask_app))
+        record = await call_blocking(interface.load, sid) if sid else None
+        return record[0].get('user') if record is not None else None
+    # The signed-cookie interface only reads request.cookies
+    session = await call_blocking(interface.open_session, flask_app, request)
+    return session.get('user') if session is not None else None
+
+def require_module(module_name: str) -> Callable[..., Any]:
+    """Dependency rejecting requests whose session user cannot access the module (same rule as the navbar)"""
+    async def check(user: Optional[Dict[str, Any]] = Depends(session_user)) -> Optional[Dict[str, Any]]:
+        if not is_module_accessible(user, module_name):
+            if not user:
+                raise HTTPException(status_code=401, detail='Inicia sesión para continuar')
+            raise HTTPException(status_code=403, detail='No tienes permisos para este módulo')
+        return user
+    return check
+
+# ========== APPLICATION ==========
+
+async def _error_response(request: Request, exc: HTTPException) -> JSONResponse:
+    # Same {'error': ...} body as the Flask routes
+    return JSONResponse({'error': exc.detail}, status_code=exc.status_code, headers=getattr(exc, 'headers', None))
+
+def create_asgi_app(flask_app: Flask, routers: Iterable[APIRouter]) -> FastAPI:
+    """
+    One ASGI application for the whole deployment: the async data API routers
+    answer their own prefixes and every other path falls through to the Flask
+    UI, which runs unchanged behind WSGIMiddleware.
+    """
+    app = FastAPI(title='LesXon data API', docs_url='/api/docs', redoc_url=None, openapi_url='/api/openapi.json')
+    app.state.flask_app = flask_app
+    app.add_exception_handler(HTTPException, _error_response)
+    for router in routers:
+        app.include_router(router)
+    app.mount('/', WSGIMiddleware(flask_app))
+    return app
+
+DATA_API_CONFIG = get_data_api_config()
@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import json
+import os
+import threading
+import time
+
+from flask import Flask
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+# ========== FRAGMENT CACHE CONFIGURATION ==========
+
+def get_fragment_cache_config() -> Dict[str, Any]:
+    """Gets template fragment cache configuration from environment variables or defaults"""
+    return {
+        'FRAGMENT_CACHE_ENABLED': os.getenv('FRAGMENT_CACHE_ENABLED', 'true').lower() == 'true',
+        'FRAGMENT_CACHE_MAX_BYTES': int(os.getenv('FRAGMENT_CACHE_MAX_BYTES', str(8 * 1024 * 1024))),
+        'FRAGMENT_CACHE_TTL': float(os.getenv('FRAGMENT_CACHE_TTL', '3600')),
+        'APP_VERSION': os.getenv('APP_VERSION', '1.0.0'),
+    }
+
+# ========== FRAGMENT STORE ==========
+
+class FragmentCache:
+    """
+    LRU of rendered template fragments bounded by total bytes, with a TTL per
+    entry. Keys are (template, compile stamp, app version, fragment key, vary
+    values); hits and misses are counted per fragment (template:key).
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, version: str, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = version
+        self.enabled = enabled
+        self._entries: 'OrderedDict[Tuple[Any, ...], Tuple[Markup, int, float]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._fragments: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, fragment: str, outcome: str) -> None:
+        counters = self._fragments.setdefault(fragment, {'hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+    def render(self, template: str, stamp: int, key: Any, ttl: Optional[float], vary: List[Any],
+               caller: Callable[[], Markup]) -> Markup:
+        """Returns the cached fragment, rendering it with `caller` on a miss"""
+        if not self.enabled:
+            return caller()
+        fragment = f'{template}:{key}'
+        cache_key = (template, stamp, self.version, str(key), json.dumps(vary, default=str, sort_keys=True))
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self._count(fragment, 'hits')
+                return entry[0]
+            if entry is not None:
+                self._drop(cache_key)
+            self._count(fragment, 'misses')
+
+        body = Markup(caller())
+        size = len(body.encode('utf-8'))
+        if size <= self.max_bytes:
+            with self._lock:
+                if cache_key in self._entries:
+                    self._drop(cache_key)
+                self._entries[cache_key] = (body, size, time.monotonic() + (self.ttl if ttl is None else ttl))
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+        return body
+
+    def _drop(self, cache_key: Tuple[Any, ...]) -> None:
+        _, size, _ = self._entries.pop(cache_key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            fragments = {}
+            for fragment, counters in sorted(self._fragments.items()):
+                lookups = counters['hits'] + counters['misses']
+                fragments[fragment] = {**counters, 'hit_rate': counters['hits'] / lookups if lookups else 0.0}
+            hits = sum(counters['hits'] for counters in self._fragments.values())
+            lookups = hits + sum(counters['misses'] for counters in self._fragments.values())
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'fragments': fragments,
+            }
+
+# ========== JINJA EXTENSION ==========
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'key' %}...{% endcache %}, optionally with a TTL in seconds and
+    vary values: {% cache 'key', 600, user.id, lang %}. The output of the block
+    is cached under the template name; a template recompiled after an edit
+    gets a new compile stamp, so its old fragments are never served.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser: Any) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        ttl: nodes.Expr = nodes.Const(None)
+        vary: List[nodes.Expr] = []
+        if parser.stream.skip_if('comma'):
+            ttl = parser.parse_expression()
+            while parser.stream.skip_if('comma'):
+                vary.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+
+        args = [nodes.Const(parser.name or '<string>'), nodes.Const(time.time_ns()), key, ttl, nodes.List(vary)]
+        return nodes.CallBlock(self.call_method('_render', args), [], [], body).set_lineno(lineno)
+
+    def _render(self, template: str, stamp: int, key: Any, ttl: Optional[float], vary: List[Any],
+                caller: Callable[[], Markup]) -> Markup:
+        return FRAGMENT_CACHE.render(template, stamp, key, ttl, vary, caller)
+
+# ========== SETUP ==========
+
+def init_fragment_cache(app: Flask) -> None:
+    """Adds the {% cache %} tag to the app's templates (before any template is compiled)"""
+    for key, value in get_fragment_cache_config().items():
+        app.config.setdefault(key, value)
+
+    FRAGMENT_CACHE.max_bytes = app.config['FRAGMENT_CACHE_MAX_BYTES']
+    FRAGMENT_CACHE.ttl = app.config['FRAGMENT_CACHE_TTL']
+    FRAGMENT_CACHE.version = app.config['APP_VERSION']
+    FRAGMENT_CACHE.enabled = app.config['FRAGMENT_CACHE_ENABLED']
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+# Shared per-process fragment cache
+FRAGMENT_CACHE_CONFIG = get_fragment_cache_config()
+FRAGMENT_CACHE = FragmentCache(FRAGMENT_CACHE_CONFIG['FRAGMENT_CACHE_MAX_BYTES'], FRAGMENT_CACHE_CONFIG['FRAGMENT_CACHE_TTL'],
+                               FRAGMENT_CACHE_CONFIG['APP_VERSION'], FRAGMENT_CACHE_CONFIG['FRAGMENT_CACHE_ENABLED'])
@@ -0,0 +1,321 @@
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import gc
+import importlib
+import logging
+import os
+import select
+import signal
+import socket
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+logger = logging.getLogger('prefork')
+
+# ========== PREFORK CONFIGURATION ==========
+
+def get_prefork_config() -> Dict[str, Any]:
+    """Gets prefork server configuration from environment variables or defaults"""
+    return {
+        'app': os.getenv('WSGI_APP', 'app:app'),
+        'host': os.getenv('HOST', '0.0.0.0'),
+        'port': int(os.getenv('PORT', '1024')),
+        'workers': int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 1))),
+        'threads': int(os.getenv('WEB_THREADS', '8')),
+        'preload': os.getenv('PRELOAD_APP', 'true').lower() == 'true',
+        'backlog': int(os.getenv('LISTEN_BACKLOG', '2048')),
+        'graceful_timeout': float(os.getenv('GRACEFUL_TIMEOUT', '30')),
+    }
+
+# ========== MEMORY REPORTING ==========
+
+def get_memory_usage(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Gets memory usage of a process in kB.
+    Uses /proc/<pid>/smaps_rollup (Linux) so shared copy-on-write pages are
+    reported separately from private ones; falls back to ru_maxrss elsewhere.
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    usage = {}
+    try:
+        with open(path) as rollup:
+            for line in rollup:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    usage[key.lower()] = int(value.split()[0])
+    except OSError:
+        if pid is None or pid == os.getpid():
+            import resource
+            usage['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage
+
+    usage['shared'] = usage.pop('shared_clean', 0) + usage.pop('shared_dirty', 0)
+    usage['private'] = usage.pop('private_clean', 0) + usage.pop('private_dirty', 0)
+    return usage
+
+def _format_memory(usage: Dict[str, int]) -> str:
+    return ', '.join(f"{key}={value / 1024:.1f}MB" for key, value in usage.items()) or 'n/a'
+
+# ========== APPLICATION LOADING ==========
+
+def load_app(target: str) -> Any:
+    """Imports a WSGI application from a 'module:attribute' string"""
+    module_name, _, attribute = target.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or 'app')
+
+# ========== PREFORK ARBITER ==========
+
+class PreforkServer:
+    """
+    Minimal prefork server built on werkzeug.
+
+    The master binds the listening socket and (with preload) imports the app
+    once, then gc.freeze()s the heap so module-level globals stay in pages
+    shared copy-on-write with every forked worker. Each worker accepts from
+    the inherited socket with a small thread pool.
+
+    Signals sent to the master:
+    - SIGTERM / SIGINT: graceful shutdown of every worker
+    - SIGHUP: rolling restart, one worker at a time (without preload the new
+      workers re-import the app, so code changes are picked up)
+    - SIGTTIN / SIGTTOU: add / remove one worker
+    - SIGUSR1: log per-worker memory usage
+    """
+
+    def __init__(self, app: str = 'app:app', host: str = '0.0.0.0', port: int = 1024,
+                 workers: int = 1, threads: int = 8, preload: bool = True,
+                 backlog: int = 2048, graceful_timeout: float = 30.0):
+        self.app_target = app
+        self.host = host
+        self.port = port
+        self.num_workers = max(workers, 1)
+        self.threads = max(threads, 1)
+        self.preload = preload
+        self.backlog = backlog
+        self.graceful_timeout = graceful_timeout
+
+        self.app = None
+        self.socket: Optional[socket.socket] = None
+        self.workers: Dict[int, int] = {}  # pid -> worker number
+        self._signals: List[int] = []
+        self._stopping = False
+
+    # ----- Master -----
+
+    def run(self) -> None:
+        """Binds, preloads, forks the workers and supervises them until stopped"""
+        started = time.perf_counter()
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(self.backlog)
+        self.socket.set_inheritable(True)
+
+        if self.preload:
+            self.app = load_app(self.app_target)
+            # Move everything allocated so far out of the GC's reach: later
+            # collections in the workers won't touch (and un-share) these pages
+            gc.collect()
+            gc.freeze()
+
+        logger.info("Master %s ready in %.1f ms (preload=%s, %s), listening on %s:%s",
+                    os.getpid(), (time.perf_counter() - started) * 1000, self.preload,
+                    _format_memory(get_memory_usage()), self.host, self.port)
+
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP,
+                       signal.SIGTTIN, signal.SIGTTOU, signal.SIGUSR1):
+            signal.signal(signum, self._queue_signal)
+
+        for number in range(self.num_workers):
+            self.spawn_worker(number)
+
+        while not self._stopping:
+            self._handle_signals()
+            self._reap_workers(respawn=True)
+            time.sleep(0.5)
+
+        self.stop()
+
+    def _queue_signal(self, signum: int, frame: Any) -> None:
+        self._signals.append(signum)
+
+    def _handle_signals(self) -> None:
+        while self._signals:
+            signum = self._signals.pop(0)
+            if signum in (signal.SIGTERM, signal.SIGINT):
+                self._stopping = True
+            elif signum == signal.SIGHUP:
+                self.rolling_restart()
+            elif signum == signal.SIGTTIN:
+                self.num_workers += 1
+                self.spawn_worker(self._free_number())
+            elif signum == signal.SIGTTOU and self.num_workers > 1:
+                self.num_workers -= 1
+                pid = max(self.workers, key=self.workers.get)
+                self.stop_worker(pid)
+            elif signum == signal.SIGUSR1:
+                self.log_memory()
+
+    def _free_number(self) -> int:
+        used = set(self.workers.values())
+        return next(number for number in range(len(used) + 1) if number not in used)
+
+    def _reap_workers(self, respawn: bool) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            number = self.workers.pop(pid, None)
+            if number is None:
+                continue
+            logger.warning("Worker %s (pid %s) exited with status %s", number, pid, status)
+            if respawn and not self._stopping and len(self.workers) < self.num_workers:
+                self.spawn_worker(number)
+
+    def spawn_worker(self, number: int) -> int:
+        """Forks one worker and waits until it is accepting connections"""
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(ready_read)
+            try:
+                self._worker_main(number, ready_write)
+            except BaseException:
+                logger.exception("Worker %s crashed", number)
+                os._exit(1)
+            os._exit(0)
+
+        os.close(ready_write)
+        self.workers[pid] = number
+        readable, _, _ = select.select([ready_read], [], [], self.graceful_timeout)
+        if not readable:
+            logger.warning("Worker %s (pid %s) did not report ready in time", number, pid)
+        os.close(ready_read)
+        return pid
+
+    def stop_worker(self, pid: int) -> None:
+        """Asks a worker to finish in-flight requests and exit, then reaps it"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            return
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.pop(pid, None)
+
+    def rolling_restart(self) -> None:
+        """Replaces every worker one at a time so the socket is never unattended"""
+        logger.info("Rolling restart of %s workers", len(self.workers))
+        for pid, number in list(self.workers.items()):
+            self.spawn_worker(number)
+            self.stop_worker(pid)
+
+    def stop(self) -> None:
+        """Gracefully stops every worker and closes the listening socket"""
+        for signum in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_IGN)
+        for pid in list(self.workers):
+            self.stop_worker(pid)
+        if self.socket is not None:
+            self.socket.close()
+        logger.info("Master %s stopped", os.getpid())
+
+    def log_memory(self) -> None:
+        """Logs memory usage of the master and every worker"""
+        logger.info("Master %s: %s", os.getpid(), _format_memory(get_memory_usage()))
+        for pid, number in sorted(self.workers.items(), key=lambda item: item[1]):
+            logger.info("Worker %s (pid %s): %s", number, pid, _format_memory(get_memory_usage(pid)))
+
+    # ----- Worker -----
+
+    def _worker_main(self, number: int, ready_write: int) -> None:
+        started = time.perf_counter()
+        for signum in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_DFL)
+        # Ctrl+C reaches the whole process group; only the master decides to stop
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        app = self.app if self.app is not None else load_app(self.app_target)
+        server = make_server(self.host, self.port, app, fd=self.socket.fileno())
+        server.timeout = 0.5
+        # Every worker polls the same socket: losers of the accept() race must
+        # not block, or they would stop noticing SIGTERM
+        server.socket.setblocking(False)
+
+        # At most `threads` requests in flight: a worker only accepts while one
+        # of its threads is free, so a busy worker leaves connections to the others
+        pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix=f'worker-{number}')
+        free_threads = threading.BoundedSemaphore(self.threads)
+        accepted = 0
+
+        def handle(request: Any, client_address: Any) -> None:
+            try:
+                server.finish_request(request, client_address)
+            except Exception:
+                server.handle_error(request, client_address)
+            finally:
+                server.shutdown_request(request)
+                free_threads.release()
+
+        def process_request(request: Any, client_address: Any) -> None:
+            nonlocal accepted
+            accepted += 1
+            pool.submit(handle, request, client_address)
+
+        server.process_request = process_request
+        running = True
+
+        def request_stop(signum: int, frame: Any) -> None:
+            nonlocal running
+            running = False
+
+        signal.signal(signal.SIGTERM, request_stop)
+
+        logger.info("Worker %s (pid %s) ready in %.1f ms: %s", number, os.getpid(),
+                    (time.perf_counter() - started) * 1000, _format_memory(get_memory_usage()))
+        os.write(ready_write, b'1')
+        os.close(ready_write)
+
+        while running:
+            if not free_threads.acquire(timeout=server.timeout):
+                continue
+            before = accepted
+            server.handle_request()
+            if accepted == before:
+                # Nothing accepted (timeout, lost race, rejected): the thread is still free
+                free_threads.release()
+
+        # Let the in-flight requests finish before closing the socket
+        pool.shutdown(wait=True)
+        server.server_close()
+
+
+def run_prefork(**overrides: Any) -> None:
+    """Runs the prefork server using environment configuration plus overrides"""
+    config = get_prefork_config()
+    config.update({key: value for key, value in overrides.items() if value is not None})
+
+    if not hasattr(os, 'fork'):
+        # No fork() (Windows): serve the app from a single threaded process
+        logger.warning("os.fork() is not available; running a single threaded process")
+        make_server(config['host'], config['port'], load_app(config['app']), threaded=True).serve_forever()
+        return
+
+    PreforkServer(**config).run()
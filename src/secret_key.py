@@ -0,0 +1,27 @@
+import os
+import secrets
+
+def get_secret_key(instance_path: str) -> str:
+    """
+    Gets a SECRET_KEY that is identical in every worker process and survives restarts.
+    Uses the SECRET_KEY environment variable, or a key generated once and kept in
+    <instance_path>/secret_key.
+    """
+    secret_key = os.getenv('SECRET_KEY')
+    if secret_key:
+        return secret_key
+
+    key_path = os.path.join(instance_path, 'secret_key')
+    os.makedirs(instance_path, exist_ok=True)
+
+    try:
+        # O_EXCL: if several processes start at once, only one of them writes the key
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(key_path) as key_file:
+            return key_file.read().strip()
+
+    secret_key = secrets.token_hex(32)
+    with os.fdopen(fd, 'w') as key_file:
+        key_file.write(secret_key)
+    return secret_key
@@ -0,0 +1,269 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask import Flask, Request, Response
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+# ========== SERVER-SIDE SESSION CONFIGURATION ==========
+
+def get_session_store_config() -> Dict[str, Any]:
+    """Gets server-side session configuration from environment variables or defaults"""
+    return {
+        'SESSION_STORE': os.getenv('SESSION_STORE', 'sqlite').lower(),
+        'SESSION_DB_PATH': os.getenv('SESSION_DB_PATH', ''),
+        'SESSION_LRU_SIZE': int(os.getenv('SESSION_LRU_SIZE', '1024')),
+        'SESSION_LRU_TTL': float(os.getenv('SESSION_LRU_TTL', '2')),
+        'SESSION_PURGE_INTERVAL': int(os.getenv('SESSION_PURGE_INTERVAL', '500')),
+    }
+
+# ========== STORAGE BACKENDS ==========
+
+class SQLiteSessionBackend:
+    """
+    Durable session bodies in a local SQLite file shared by every worker process.
+    Expired rows are removed lazily: on read, and by a periodic sweep on write.
+    """
+
+    def __init__(self, path: str, purge_interval: int = 500):
+        self.path = path
+        self.purge_interval = max(purge_interval, 1)
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process; WAL lets readers run while another worker writes"""
+        connection = getattr(self._local, 'connection', None)
+        # SQLite connections must not cross fork(): a forked worker opens its own
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, sid: str) -> Optional[Tuple[str, float]]:
+        """Returns (data, expires) for a live session, or None"""
+        row = self._connection().execute(
+            'SELECT data, expires FROM sessions WHERE sid = ?', (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= time.time():
+            self.delete(sid)
+            return None
+        return row[0], row[1]
+
+    def set(self, sid: str, data: str, expires: float) -> None:
+        """Inserts or replaces a session body"""
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)',
+            (sid, data, expires)
+        )
+        self._writes += 1
+        if self._writes % self.purge_interval == 0:
+            connection.execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),))
+
+    def delete(self, sid: str) -> None:
+        """Removes a session body (visible to every worker)"""
+        self._connection().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+
+class LRUSessionStore:
+    """
+    Hot in-process LRU in front of a durable backend.
+
+    Cached entries are trusted for at most `lru_ttl` seconds, after which they
+    are re-read from the backend so logouts done by other workers are seen.
+    """
+
+    def __init__(self, backend: SQLiteSessionBackend, maxsize: int = 1024, lru_ttl: float = 2.0):
+        self.backend = backend
+        self.maxsize = max(maxsize, 1)
+        self.lru_ttl = lru_ttl
+        self.hits = 0
+        self.misses = 0
+        self._items: 'OrderedDict[str, Tuple[str, float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> Optional[Tuple[str, float]]:
+        """Returns (data, expires) from the LRU when fresh, else from the backend"""
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(sid)
+            if entry is not None and now - entry[2] < self.lru_ttl and entry[1] > now:
+                self._items.move_to_end(sid)
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+
+        record = self.backend.get(sid)
+        with self._lock:
+            if record is None:
+                self._items.pop(sid, None)
+            else:
+                self._remember(sid, record[0], record[1], now)
+        return record
+
+    def set(self, sid: str, data: str, expires: float) -> None:
+        """Writes through to the backend and refreshes the LRU"""
+        self.backend.set(sid, data, expires)
+        with self._lock:
+            self._remember(sid, data, expires, time.time())
+
+    def delete(self, sid: str) -> None:
+        """Removes a session from the LRU and the backend"""
+        with self._lock:
+            self._items.pop(sid, None)
+        self.backend.delete(sid)
+
+    def _remember(self, sid: str, data: str, expires: float, fetched_at: float) -> None:
+        self._items[sid] = (data, expires, fetched_at)
+        self._items.move_to_end(sid)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and current occupancy"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._items), 'maxsize': self.maxsize}
+
+# ========== FLASK SESSION INTERFACE ==========
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session body kept on the server; the cookie only carries its opaque id"""
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, sid: Optional[str] = None,
+                 new: bool = False, expires: float = 0.0, store: Optional['LRUSessionStore'] = None):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires = expires
+        self.store = store
+        self.modified = False
+        self.accessed = False
+
+    def regenerate(self) -> None:
+        """
+        Moves the body to a fresh id and deletes the old record. Called on login,
+        so an id issued before authentication (session fixation) never carries
+        the user.
+        """
+        if not self.new and self.store is not None:
+            self.store.delete(self.sid)
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.modified = True
+        self.accessed = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Stores session bodies in an LRUSessionStore and puts a random id in the cookie.
+    Unmodified sessions are only rewritten when more than half of their lifetime
+    has elapsed, so most requests never touch SQLite.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store: LRUSessionStore):
+        self.store = store
+
+    @staticmethod
+    def _generate_sid() -> str:
+        return secrets.token_urlsafe(32)
+
+    def load(self, sid: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Returns (data, expires) of a live session by id alone, without a Flask request"""
+        record = self.store.get(sid)
+        if record is None:
+            return None
+        return self.serializer.loads(record[0]), record[1]
+
+    def open_session(self, app: Flask, request: Request) -> ServerSideSession:
+        # Static files never use the session: no store lookup, no refresh, no Vary: Cookie
+        if app.static_url_path and request.path.startswith(app.static_url_path + '/'):
+            return self.make_null_session(app)
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            record = self.load(sid)
+            if record is not None:
+                data, expires = record
+                return ServerSideSession(data, sid=sid, expires=expires, store=self.store)
+        return ServerSideSession(sid=self._generate_sid(), new=True, store=self.store)
+
+    def save_session(self, app: Flask, session: ServerSideSession, response: Response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        # Emptied session (e.g. logout): drop it server-side so every worker sees it
+        if not session:
+            if session.modified:
+                if not session.new:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        stale = session.expires - now < lifetime / 2
+
+        if not (session.modified or stale):
+            return
+
+        expires = now + lifetime
+        self.store.set(session.sid, self.serializer.dumps(dict(session)), expires)
+        session.expires = expires
+
+        cookie_expires = self.get_expiration_time(app, session)
+        response.set_cookie(name, session.sid, expires=cookie_expires, httponly=httponly,
+                            domain=domain, path=path, secure=secure, samesite=samesite)
+        response.vary.add('Cookie')
+
+# ========== SETUP ==========
+
+def init_server_session(app: Flask) -> None:
+    """Installs the server-side session interface unless SESSION_STORE=cookie"""
+    for key, value in get_session_store_config().items():
+        app.config.setdefault(key, value)
+
+    if app.config['SESSION_STORE'] == 'cookie':
+        return
+
+    db_path = app.config['SESSION_DB_PATH'] or os.path.join(app.instance_path, 'sessions.sqlite3')
+    backend = SQLiteSessionBackend(db_path, app.config['SESSION_PURGE_INTERVAL'])
+    store = LRUSessionStore(backend, app.config['SESSION_LRU_SIZE'], app.config['SESSION_LRU_TTL'])
+    app.session_interface = ServerSideSessionInterface(store)
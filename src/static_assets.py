@@ -0,0 +1,351 @@
+from typing import Any, Dict, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+
+from flask import Flask, Response, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz variants are built
+    brotli = None
+
+logger = logging.getLogger('static_assets')
+
+# ========== STATIC ASSETS CONFIGURATION ==========
+
+def get_static_assets_config() -> Dict[str, Any]:
+    """Gets static asset pipeline configuration from environment variables or defaults"""
+    return {
+        # Build output, relative to the static folder; the manifest lives inside it
+        'STATIC_DIST_DIR': os.getenv('STATIC_DIST_DIR', 'dist'),
+        'STATIC_MANIFEST_ENABLED': os.getenv('STATIC_MANIFEST_ENABLED', 'true').lower() == 'true',
+        # Fingerprinted files never change under the same name
+        'STATIC_IMMUTABLE_MAX_AGE': int(os.getenv('STATIC_IMMUTABLE_MAX_AGE', str(365 * 24 * 3600))),
+    }
+
+# Sources built by build_assets(), by name under the static folder
+STATIC_SOURCES = ['main.css', 'navbar.css', 'navbar.js', 'components.js']
+SERVICE_WORKER = 'sw.js'
+MANIFEST_FILE = 'manifest.json'
+
+# Precompressed variants, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# ========== MINIFICATION ==========
+
+_STRING_QUOTES = '\'"'
+_CSS_PUNCTUATION = '{};,>'
+# A '/' after one of these starts a regex literal rather than a division
+_JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+                      'throw', 'instanceof', 'yield', 'await'}
+
+
+def _read_string(source: str, start: int) -> int:
+    """Index just past the string literal opening at `start`"""
+    quote = source[start]
+    i = start + 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+def minify_css(source: str) -> str:
+    """Drops comments and the whitespace around braces, semicolons, commas and after colons"""
+    out: List[str] = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in _STRING_QUOTES:
+            end = _read_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = len(source) if end < 0 else end + 2
+        elif char.isspace():
+            while i < len(source) and source[i].isspace():
+                i += 1
+            previous = out[-1][-1:] if out else ''
+            following = source[i:i + 1]
+            if previous and following and previous not in _CSS_PUNCTUATION + ':' and following not in _CSS_PUNCTUATION:
+                out.append(' ')
+        else:
+            if char == '}' and out and out[-1] == ';':
+                out.pop()
+            out.append(char)
+            i += 1
+    return ''.join(out).strip()
+
+def minify_js(source: str) -> str:
+    """
+    Drops comments, indentation and blank lines, and collapses runs of spaces.
+    Line breaks are kept, so automatic semicolon insertion still sees the same
+    code; strings, template literals and regex literals are copied verbatim.
+    """
+    out: List[str] = []
+    # Brace depth of each open template literal's ${...}; the literal resumes when it drops to zero
+    templates: List[int] = []
+    last_token = ''
+    i = 0
+
+    def space(newline: bool) -> None:
+        """Whitespace or a comment: one line break or one space, none at the start of a line"""
+        if not out or out[-1] == '\n':
+            return
+        if out[-1] == ' ':
+            if newline:
+                out[-1] = '\n'
+            return
+        out.append('\n' if newline else ' ')
+
+    def copy_template(start: int) -> int:
+        """Copies template literal text from `start` up to its end or the next ${, returning the index after it"""
+        j = start
+        while j < len(source):
+            if source[j] == '\\':
+                j += 2
+            elif source[j] == '`':
+                out.append(source[start:j + 1])
+                templates.pop()
+                return j + 1
+            elif source.startswith('${', j):
+                out.append(source[start:j + 2])
+                templates[-1] = 1
+                return j + 2
+            else:
+                j += 1
+        out.append(source[start:])
+        return j
+
+    while i < len(source):
+        char = source[i]
+        if char in _STRING_QUOTES:
+            end = _read_string(source, i)
+            out.append(source[i:end])
+            last_token, i = 'string', end
+        elif char == '`':
+            templates.append(0)
+            out.append('`')
+            i = copy_template(i + 1)
+            last_token = 'string'
+        elif char == '}' and templates and templates[-1] == 1:
+            templates[-1] = 0
+            out.append('}')
+            i = copy_template(i + 1)
+            last_token = 'string'
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end < 0 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            comment = source[i:] if end < 0 else source[i:end + 2]
+            space('\n' in comment)
+            i += len(comment)
+        elif char == '/' and (last_token in _JS_REGEX_AFTER or last_token in _JS_REGEX_KEYWORDS or not last_token):
+            j, in_class = i + 1, False
+            while j < len(source) and source[j] != '\n' and (in_class or source[j] != '/'):
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                j += 1
+            while j + 1 < len(source) and source[j + 1].isalpha():
+                j += 1
+            out.append(source[i:j + 1])
+            last_token, i = 'regex', j + 1
+        elif char.isspace():
+            j = i
+            while j < len(source) and source[j].isspace():
+                j += 1
+            space('\n' in source[i:j])
+            i = j
+        else:
+            match = re.match(r'[\w$]+', source[i:i + 256])
+            token = match.group(0) if match else char
+            if templates and not match:
+                if char == '{':
+                    templates[-1] += 1
+                elif char == '}':
+                    templates[-1] -= 1
+            out.append(token)
+            last_token, i = token, i + len(token)
+
+    return ''.join(out).strip()
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+def minified_name(name: str) -> str:
+    """main.css -> main.min.css: the committed copy templates link to, served when there is no build"""
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.min{ext}'
+
+# ========== BUILD ==========
+
+def fingerprint(name: str, content: bytes) -> str:
+    """main.css -> main.<8 hex of the content's sha256>.css"""
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:8]}{ext}'
+
+def compress(content: bytes) -> Dict[str, bytes]:
+    """Precompressed variants of a file, keyed by encoding; only those smaller than the original"""
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(content)}
+
+def _write(path: str, content: bytes) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as out_file:
+        out_file.write(content)
+    os.replace(tmp_path, path)
+
+def render_service_worker(source: str, precache: List[str], version: str) -> str:
+    """Fills the service worker's STATIC_ASSETS list and versions its cache names with the build"""
+    assets = ',\n'.join(f"  '{url}'" for url in precache)
+    source = re.sub(r'const STATIC_ASSETS = \[.*?\];', lambda _: f'const STATIC_ASSETS = [\n{assets}\n];',
+                    source, count=1, flags=re.S)
+    return re.sub(r"(const (?:STATIC_)?CACHE_NAME = '[\w-]+?)(-v[\w]+)?';", rf"\1-{version}';", source)
+
+def build_assets(static_folder: str, static_url_path: str = '/static', dist_dir: str = 'dist',
+                 sources: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Minifies each source, writes it under `dist_dir` with a content-hashed name
+    next to its .gz (and .br) variants, then the service worker and the
+    manifest mapping source names to built files. Files of earlier builds are
+    removed once the new manifest is in place.
+    """
+    out_dir = os.path.join(static_folder, dist_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    previous = set(os.listdir(out_dir))
+    assets: Dict[str, Dict[str, Any]] = {}
+
+    for name in sources or STATIC_SOURCES:
+        with open(os.path.join(static_folder, name), encoding='utf-8') as source_file:
+            source = source_file.read()
+        minify = MINIFIERS.get(os.path.splitext(name)[1])
+        content = (minify(source) if minify else source).encode('utf-8')
+        built = fingerprint(name, content)
+        _write(os.path.join(out_dir, built), content)
+
+        variants = compress(content)
+        for encoding, suffix in ENCODINGS:
+            if encoding in variants:
+                _write(os.path.join(out_dir, built + suffix), variants[encoding])
+        assets[name] = {
+            'file': f'{dist_dir}/{built}',
+            'bytes': len(source.encode('utf-8')),
+            'minified': len(content),
+            **{encoding: len(body) for encoding, body in variants.items()},
+        }
+
+    version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+    service_worker = None
+    sw_path = os.path.join(static_folder, SERVICE_WORKER)
+    if os.path.exists(sw_path):
+        with open(sw_path, encoding='utf-8') as sw_file:
+            precache = [f"{static_url_path}/{asset['file']}" for asset in assets.values()]
+            content = render_service_worker(sw_file.read(), precache, version).encode('utf-8')
+        service_worker = f'{dist_dir}/{SERVICE_WORKER}'
+        _write(os.path.join(out_dir, SERVICE_WORKER), content)
+
+    manifest = {'version': version, 'assets': assets, 'service_worker': service_worker}
+    _write(os.path.join(out_dir, MANIFEST_FILE), json.dumps(manifest, indent=2).encode('utf-8'))
+
+    current = {MANIFEST_FILE, SERVICE_WORKER} | {
+        os.path.basename(asset['file']) + suffix for asset in assets.values() for suffix in ('', '.gz', '.br')}
+    for stale in previous - current:
+        os.remove(os.path.join(out_dir, stale))
+    return manifest
+
+# ========== SERVING ==========
+
+def load_manifest(static_folder: str, dist_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(static_folder, dist_dir, MANIFEST_FILE)
+    try:
+        with open(path, encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable static manifest %s: %s", path, e)
+        return None
+
+def negotiate_encoding(filename: str, available: List[str]) -> Tuple[str, Optional[str]]:
+    """The built variant of `filename` the client accepts, in order of preference: (file, encoding)"""
+    for encoding, suffix in ENCODINGS:
+        if encoding in available and request.accept_encodings.quality(encoding) > 0:
+            return filename + suffix, encoding
+    return filename, None
+
+
+class StaticAssets:
+    """
+    Serves the output of build_assets(): url_for('static', filename='main.min.css')
+    (or 'main.css') resolves to the fingerprinted file, which is sent precompressed when the
+    client accepts it and cached as immutable for a year. /static/sw.js is the
+    generated service worker. Without a manifest, Flask's static files are
+    served unchanged, including the committed *.min.* copies.
+    """
+
+    def __init__(self, app: Flask, manifest: Dict[str, Any], max_age: int):
+        self.static_folder = app.static_folder
+        self.manifest = manifest
+        self.max_age = max_age
+        self.urls = {name: asset['file'] for name, asset in manifest['assets'].items()}
+        self.urls.update({minified_name(name): built for name, built in list(self.urls.items())})
+        # Built file -> encodings it was precompressed in
+        self.built = {asset['file']: [encoding for encoding, _ in ENCODINGS if encoding in asset]
+                      for asset in manifest['assets'].values()}
+        self._send_static_file = app.send_static_file
+
+    def url_defaults(self, endpoint: str, values: Dict[str, Any]) -> None:
+        if endpoint == 'static' and values.get('filename') in self.urls:
+            values['filename'] = self.urls[values['filename']]
+
+    def serve(self, filename: str) -> Response:
+        if filename == SERVICE_WORKER and self.manifest.get('service_worker'):
+            response = send_from_directory(self.static_folder, self.manifest['service_worker'], max_age=0)
+            response.cache_control.no_cache = True
+            return response
+        if filename not in self.built:
+            return self._send_static_file(filename)
+
+        path, encoding = negotiate_encoding(filename, self.built[filename])
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(self.static_folder, path, mimetype=mimetype, max_age=self.max_age)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+# ========== SETUP ==========
+
+def init_static_assets(app: Flask) -> Optional[StaticAssets]:
+    """Serves static files through the build manifest, when `python build_assets.py` has produced one"""
+    for key, value in get_static_assets_config().items():
+        app.config.setdefault(key, value)
+
+    if not app.config['STATIC_MANIFEST_ENABLED'] or not app.static_folder:
+        return None
+    manifest = load_manifest(app.static_folder, app.config['STATIC_DIST_DIR'])
+    if manifest is None:
+        if app.config.get('TEMPLATE_MODE') == 'production':
+            logger.warning("No static build in %s: serving the committed *.min.* files without fingerprints; "
+                           "run `python build_assets.py` before starting", app.config['STATIC_DIST_DIR'])
+        return None
+
+    assets = StaticAssets(app, manifest, app.config['STATIC_IMMUTABLE_MAX_AGE'])
+    app.url_defaults(assets.url_defaults)
+    app.view_functions['static'] = assets.serve
+    app.extensions['static_assets'] = assets
+    logger.info("Serving %d built static assets (build %s)", len(assets.urls), manifest['version'])
+    return assets
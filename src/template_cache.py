@@ -0,0 +1,129 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import os
+import time
+
+from flask import Flask
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, TemplateNotFound, TemplateSyntaxError
+
+logger = logging.getLogger('templates')
+
+# ========== TEMPLATE CACHE CONFIGURATION ==========
+
+def get_template_cache_config() -> Dict[str, Any]:
+    """Gets production template mode configuration from environment variables or defaults"""
+    return {
+        # production: indexed loader, on-disk bytecode cache, no auto-reload
+        'TEMPLATE_MODE': os.getenv('TEMPLATE_MODE', 'development').lower(),
+        'TEMPLATE_CACHE_DIR': os.getenv('TEMPLATE_CACHE_DIR', ''),
+        'TEMPLATE_PRECOMPILE': os.getenv('TEMPLATE_PRECOMPILE', 'true').lower() == 'true',
+    }
+
+# ========== INDEXED LOADER ==========
+
+def template_folders(app: Flask) -> List[str]:
+    """Template folders in Flask's lookup order: the app's first, then each blueprint's in registration order"""
+    loaders = [app.jinja_loader] + [blueprint.jinja_loader for blueprint in app.iter_blueprints()]
+    return [os.path.abspath(path) for loader in loaders if loader is not None for path in loader.searchpath]
+
+def build_template_index(folders: List[str]) -> Dict[str, str]:
+    """Template name -> file path; a name found in several folders resolves to the first one"""
+    index: Dict[str, str] = {}
+    for folder in folders:
+        for directory, _, filenames in os.walk(folder):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, folder).replace(os.sep, '/')
+                index.setdefault(name, path)
+    return index
+
+
+class IndexedTemplateLoader(BaseLoader):
+    """
+    Resolves template names through an index built once at startup instead of
+    trying every app and blueprint folder on each lookup, with the same
+    precedence as Flask's dispatching loader. Templates added later need a restart.
+    """
+
+    def __init__(self, folders: List[str]):
+        self.folders = folders
+        self.index = build_template_index(folders)
+
+    def get_source(self, environment: Environment, template: str) -> Tuple[str, str, Callable[[], bool]]:
+        path = self.index.get(template)
+        if path is None:
+            raise TemplateNotFound(template)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, encoding='utf-8') as source_file:
+                source = source_file.read()
+        except OSError:
+            raise TemplateNotFound(template)
+
+        def uptodate() -> bool:
+            try:
+                return os.path.getmtime(path) == mtime
+            except OSError:
+                return False
+
+        return source, path, uptodate
+
+    def list_templates(self) -> List[str]:
+        return sorted(self.index)
+
+# ========== PRECOMPILATION ==========
+
+def precompile_templates(app: Flask, names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Loads every template into the environment's cache (and the bytecode cache,
+    when configured). Returns the milliseconds each one took; templates that do
+    not compile are reported under 'errors' instead of failing startup.
+    """
+    env = app.jinja_env
+    times: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    started = time.perf_counter()
+    for name in names or env.list_templates():
+        template_started = time.perf_counter()
+        try:
+            env.get_template(name)
+        except (TemplateSyntaxError, UnicodeDecodeError) as e:
+            errors[name] = str(e)
+            continue
+        times[name] = round((time.perf_counter() - template_started) * 1000, 2)
+
+    total = (time.perf_counter() - started) * 1000
+    slowest = sorted(times.items(), key=lambda item: -item[1])[:5]
+    logger.info("Precompiled %d templates in %.1f ms (slowest: %s)", len(times), total,
+                ', '.join(f'{name} {ms:.1f} ms' for name, ms in slowest) or 'n/a')
+    for name, error in errors.items():
+        logger.warning("Template %s does not compile: %s", name, error)
+    return {'templates': times, 'errors': errors, 'total_ms': round(total, 2)}
+
+# ========== SETUP ==========
+
+def init_template_cache(app: Flask) -> None:
+    """
+    Switches Jinja to production mode unless TEMPLATE_MODE=development. Must run
+    after every blueprint is registered, since the loader index is built here.
+    """
+    for key, value in get_template_cache_config().items():
+        app.config.setdefault(key, value)
+
+    if app.config['TEMPLATE_MODE'] != 'production':
+        return
+
+    # Shared by every worker process; Jinja writes each entry atomically and
+    # keys it on the template source, so a deploy recompiles only what changed
+    cache_dir = app.config['TEMPLATE_CACHE_DIR'] or os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    env = app.jinja_env
+    env.auto_reload = False
+    env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    env.loader = IndexedTemplateLoader(template_folders(app))
+
+    if app.config['TEMPLATE_PRECOMPILE']:
+        # With a preloading server this runs once in the master and workers inherit the compiled templates
+        app.extensions['template_compile_times'] = precompile_templates(app)
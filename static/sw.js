@@ -6,15 +6,17 @@
 const CACHE_NAME = 'etl-app-v2';
 const STATIC_CACHE_NAME = 'etl-static-v2';
 
-// Assets to cache immediately
+// Assets to cache immediately (build_assets.py fills in the fingerprinted files from the manifest)
 const STATIC_ASSETS = [
-  '/static/main.css',
-  '/static/navbar.css',
-  '/static/fontawesome-subset.css',
-  '/static/navbar.js',
-  '/static/components.js'
+  '/static/main.min.css',
+  '/static/navbar.min.css',
+  '/static/navbar.min.js',
+  '/static/components.min.js'
 ];
 
+// Fingerprinted build output: a cached copy never goes stale
+const IMMUTABLE = '/static/dist/';
+
 // Network-first resources (always try network first)
 const NETWORK_FIRST = [
   '/api/',
@@ -68,8 +70,8 @@ self.addEventListener('fetch', event => {
   const request = event.request;
   const url = new URL(request.url);
   
-  // Skip non-GET requests
-  if (request.method !== 'GET') {
+  // Skip non-GET requests and event streams
+  if (request.method !== 'GET' || request.headers.get('Accept') === 'text/event-stream') {
     return;
   }
   
@@ -121,6 +123,10 @@ async function cacheFirst(request) {
   const cachedResponse = await caches.match(request);
   
   if (cachedResponse) {
+    if (new URL(request.url).pathname.startsWith(IMMUTABLE)) {
+      return cachedResponse;
+    }
+
     // Update cache in background
     fetch(request).then(response => {
       if (response.ok) {
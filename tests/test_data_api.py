@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    os.environ['SESSION_DB_PATH'] = str(tmp_path_factory.mktemp('sessions') / 'sessions.sqlite3')
+    os.environ.setdefault('TEMPLATE_MODE', 'development')
+    from fastapi.testclient import TestClient
+    from asgi import application
+    return TestClient(application)
+
+
+def test_data_api_reads_the_session_of_a_flask_login(client):
+    client.cookies.clear()
+    assert client.get('/api/lesxon/download/jobs').status_code == 401
+
+    login = client.post('/login', data={'email': 'test@example.com', 'password': 'password123'},
+                        follow_redirects=False)
+    assert login.status_code == 302
+
+    response = client.get('/api/lesxon/download/jobs')
+    assert response.status_code == 200
+    assert 'jobs' in response.json()
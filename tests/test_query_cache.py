@@ -0,0 +1,23 @@
+from blueprints.lesxon.src.query_cache import QueryCache, normalize_sql, read_tables, written_table
+
+
+def test_read_tables_covers_every_item_of_a_from_list():
+    assert read_tables(normalize_sql('select * from a, b')) == {'a', 'b'}
+    assert read_tables(normalize_sql('SELECT * FROM a AS x, public.b y JOIN c ON c.id = x.id')) == {'a', 'b', 'c'}
+
+
+def test_read_tables_is_unsure_about_derived_tables_and_functions():
+    assert read_tables(normalize_sql('select * from (select * from a) s')) is None
+    assert read_tables(normalize_sql('select * from generate_series(1, 3)')) is None
+    assert read_tables(normalize_sql('select * from a, lateral f(a.x)')) is None
+
+
+def test_write_to_second_table_of_from_list_invalidates_entry(tmp_path):
+    cache = QueryCache(1024 * 1024, 1024 * 1024, 300, str(tmp_path))
+    query = normalize_sql('select * from a, b')
+    key = cache.key(query, None, 100, 'json')
+    cache.put(key, b'old rows', cache.versions(read_tables(query)))
+    assert cache.get(key) == b'old rows'
+
+    cache.invalidate(written_table(normalize_sql('insert into b values (1)')))
+    assert cache.get(key) is None
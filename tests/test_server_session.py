@@ -0,0 +1,32 @@
+import pytest
+
+flask = pytest.importorskip('flask')
+
+from src.server_session import init_server_session
+
+
+def test_regenerate_moves_the_session_to_a_new_id(tmp_path):
+    app = flask.Flask(__name__)
+    app.config['SESSION_DB_PATH'] = str(tmp_path / 'sessions.sqlite3')
+    init_server_session(app)
+
+    @app.route('/visit')
+    def visit():
+        flask.session['visits'] = 1
+        return ''
+
+    @app.route('/login')
+    def login():
+        flask.session.regenerate()
+        flask.session['user'] = {'user': 'test'}
+        return ''
+
+    client = app.test_client()
+    client.get('/visit')
+    before = client.get_cookie('session').value
+    client.get('/login')
+    after = client.get_cookie('session').value
+
+    assert after != before
+    assert app.session_interface.load(before) is None
+    assert app.session_interface.load(after)[0] == {'visits': 1, 'user': {'user': 'test'}}